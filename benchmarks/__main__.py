@@ -0,0 +1,94 @@
+"""
+Hot-path benchmark suite.
+
+    python -m benchmarks run --out benchmarks/results/before.json
+    # ... change code ...
+    python -m benchmarks run --out benchmarks/results/after.json
+    python -m benchmarks compare benchmarks/results/before.json benchmarks/results/after.json
+
+`compare` exits with status 1 when any case got slower than the threshold
+(default 10%), so it can gate a CI job against a committed baseline.
+Run `python -m benchmarks list` for the case names; `--only` takes prefixes.
+"""
+import argparse
+import logging
+import random
+import sys
+import tempfile
+import time
+from benchmarks import cases  # noqa: F401  (registers the cases)
+from benchmarks.harness import CASES, compare, environment, format_us, load, save, time_op
+from src.utils.config_loader import load_config
+
+def run(names, scale=1.0, repeats=5, min_time=0.2, seed=7) -> dict:
+    results = {"environment": environment(), "scale": scale, "cases": {}}
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        for name in names:
+            started = time.perf_counter()
+            op = CASES[name](workdir, random.Random(seed), scale)
+            setup_sec = time.perf_counter() - started
+            stats = time_op(op, repeats=repeats, min_time=min_time)
+            stats["setup_sec"] = setup_sec
+            results["cases"][name] = stats
+            print(f"{name:<32} {format_us(stats['median_sec']):>14} us  (min {format_us(stats['min_sec'])})",
+                  flush=True)
+    return results
+
+def _select(only):
+    if not only:
+        return sorted(CASES)
+    names = sorted(n for n in CASES if any(n.startswith(prefix) for prefix in only))
+    if not names:
+        raise SystemExit(f"No cases match {only}; see `python -m benchmarks list`")
+    return names
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Time the cases and write a JSON result file")
+    run_parser.add_argument("--out", default="benchmarks/results/latest.json")
+    run_parser.add_argument("--only", nargs="+", metavar="PREFIX", help="Only cases starting with these prefixes")
+    run_parser.add_argument("--scale", type=float, default=1.0, help="Data size relative to production (e.g. 0.1)")
+    run_parser.add_argument("--repeats", type=int, default=5)
+    run_parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timed repeat")
+
+    cmp_parser = sub.add_parser("compare", help="Compare a result file against a baseline")
+    cmp_parser.add_argument("baseline")
+    cmp_parser.add_argument("current")
+    cmp_parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown (0.10 = 10%%)")
+    cmp_parser.add_argument("--stat", default="median_sec", choices=["median_sec", "min_sec", "max_sec"])
+
+    sub.add_parser("list", help="List the case names")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        print("\n".join(sorted(CASES)))
+        return 0
+
+    if args.command == "run":
+        load_config()
+        # The code under test logs at INFO per call; keep that out of the timings
+        logging.disable(logging.WARNING)
+        results = run(_select(args.only), scale=args.scale, repeats=args.repeats, min_time=args.min_time)
+        save(results, args.out)
+        print(f"Wrote {args.out}")
+        return 0
+
+    baseline, current = load(args.baseline), load(args.current)
+    if baseline.get("scale") != current.get("scale"):
+        print(f"warning: comparing scale {baseline.get('scale')} against {current.get('scale')}", file=sys.stderr)
+    rows = compare(baseline, current, threshold=args.threshold, stat=args.stat)
+    print(f"{'case':<32} {'baseline us':>14} {'current us':>14} {'change':>8}  status")
+    for row in rows:
+        change = "-" if row["change"] is None else f"{row['change'] * 100:+.1f}%"
+        print(f"{row['case']:<32} {format_us(row['baseline']):>14} {format_us(row['current']):>14} "
+              f"{change:>8}  {row['status']}")
+    regressions = [row["case"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Entity extraction benchmark.
+
+Times per-article extraction against entity maps growing from the S&P 500
+towards Russell 3000 size. The synthetic map starts from config/entities.yaml
+and is padded with generated company names; articles mention a few of them.
+
+    python -m benchmarks.bench_entities
+    python -m benchmarks.bench_entities --sizes 500 1000 3000 --articles 200
+"""
+import argparse
+import random
+import re
+import time
+import yaml
+from src.analysis.matcher import AliasMatcher
+
+WORDS = [
+    "acme", "global", "united", "pacific", "summit", "vertex", "harbor", "north",
+    "atlas", "crescent", "pioneer", "liberty", "meridian", "sterling", "keystone",
+    "granite", "horizon", "beacon", "cobalt", "evergreen", "frontier", "quantum",
+]
+SUFFIXES = ["Holdings", "Corporation", "Group", "Industries", "Systems", "Energy", "Bancorp", "Inc."]
+FILLER = (
+    "shares moved after the company reported quarterly results and raised guidance "
+    "while analysts pointed to margins, demand and the broader market backdrop"
+).split()
+
+def load_entities(path="config/entities.yaml"):
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f).get("entities", {})
+
+def synthetic_entities(size, base, rng):
+    entities = dict(list(base.items())[:size])
+    i = 0
+    while len(entities) < size:
+        name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {rng.choice(SUFFIXES)}"
+        entities.setdefault(name, f"SYN{i}")
+        i += 1
+    return entities
+
+def synthetic_articles(entities, count, rng, mentions=3, length=120):
+    names = list(entities)
+    articles = []
+    for _ in range(count):
+        words = [rng.choice(FILLER) for _ in range(length)]
+        for name in rng.sample(names, mentions):
+            words.insert(rng.randrange(len(words)), name)
+        articles.append(" ".join(words))
+    return articles
+
+def regex_extract(entities, text):
+    """Previous implementation: one re.search per name."""
+    t = text.lower()
+    found = set()
+    for name, ticker in entities.items():
+        if re.search(r"\b" + re.escape(name.lower()) + r"\b", t):
+            found.add(ticker)
+    return list(found)
+
+def time_per_article(fn, articles):
+    start = time.perf_counter()
+    for text in articles:
+        fn(text)
+    return (time.perf_counter() - start) / len(articles)
+
+def run(sizes, articles_per_size, seed=7, include_regex=True):
+    rng = random.Random(seed)
+    base = load_entities()
+    rows = []
+    for size in sizes:
+        entities = synthetic_entities(size, base, rng)
+        articles = synthetic_articles(entities, articles_per_size, rng)
+        build_start = time.perf_counter()
+        matcher = AliasMatcher(entities)
+        build_sec = time.perf_counter() - build_start
+        row = {
+            "entities": size,
+            "build_ms": build_sec * 1000,
+            "automaton_us": time_per_article(matcher.tickers, articles) * 1e6,
+        }
+        if include_regex:
+            row["regex_us"] = time_per_article(lambda t: regex_extract(entities, t), articles) * 1e6
+        rows.append(row)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000, 3000])
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--no-regex", action="store_true", help="Skip the per-name regex baseline")
+    args = parser.parse_args()
+
+    rows = run(args.sizes, args.articles, include_regex=not args.no_regex)
+    header = f"{'entities':>8} {'build ms':>10} {'automaton us/article':>22}"
+    if not args.no_regex:
+        header += f" {'regex us/article':>18}"
+    print(header)
+    for row in rows:
+        line = f"{row['entities']:>8} {row['build_ms']:>10.1f} {row['automaton_us']:>22.1f}"
+        if "regex_us" in row:
+            line += f" {row['regex_us']:>18.1f}"
+        print(line)
+
+if __name__ == "__main__":
+    main()
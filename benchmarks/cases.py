@@ -0,0 +1,164 @@
+"""
+Hot-path cases with synthetic data at production sizes (scale=1.0).
+
+Sizes follow the live defaults: the S&P 500 entity map in
+config/entities.yaml, full order and signal histories (MAX_ORDER_HISTORY /
+MAX_SIGNAL_HISTORY), 5000 processed news ids, and a log file of a few
+hundred thousand lines. A smaller scale shrinks the data for quick runs.
+"""
+import datetime
+import hashlib
+import json
+import os
+import random
+from benchmarks.bench_entities import FILLER, synthetic_articles
+from benchmarks.harness import case
+from src.analysis.extractor import EntityExtractor
+from src.analysis.sentiment import SentimentAnalyzer
+from src.models import NewsItem
+from src.signals.engine import SignalEngine
+from src.utils import state_manager as state_module
+from src.utils.config_loader import get_entities
+from src.utils.log_reader import LogReader
+
+HEADLINE_WORDS = [
+    "beats", "misses", "surges", "plunges", "record", "weak", "strong", "guidance", "lawsuit",
+    "upgrade", "downgrade", "excellent", "disappointing", "growth", "recall", "profit", "loss",
+]
+LOG_LOGGERS = ["Main", "NewsFetcher", "SignalEngine", "RiskManager", "Broker", "StateManager"]
+
+def _sized(n: int, scale: float) -> int:
+    return max(1, int(n * scale))
+
+def _cycle(items):
+    """Zero-argument op over `items` in turn, so one input can't warm a cache for the rest."""
+    state = {"i": 0}
+    def next_item():
+        item = items[state["i"] % len(items)]
+        state["i"] += 1
+        return item
+    return next_item
+
+def _headline(rng) -> str:
+    words = [rng.choice(FILLER) for _ in range(12)] + rng.sample(HEADLINE_WORDS, 3)
+    rng.shuffle(words)
+    return " ".join(words)
+
+@case("entities.extract")
+def entities_extract(workdir, rng, scale):
+    extractor = EntityExtractor()
+    articles = synthetic_articles(get_entities(), _sized(200, scale), rng)
+    next_text = _cycle(articles)
+    return lambda: extractor.extract(next_text())
+
+@case("sentiment.analyze")
+def sentiment_analyze(workdir, rng, scale):
+    analyzer = SentimentAnalyzer()
+    texts = [f"{_headline(rng)} . {_headline(rng)} {_headline(rng)}" for _ in range(_sized(200, scale))]
+    next_text = _cycle(texts)
+    return lambda: analyzer.analyze(next_text())
+
+@case("signal.generate_signal")
+def signal_generate(workdir, rng, scale):
+    engine = SignalEngine()
+    tickers = sorted(set(get_entities().values())) or ["AAPL"]
+    items = []
+    for i in range(_sized(1000, scale)):
+        item = NewsItem(id=f"n{i}", title=_headline(rng), content="", source="bench", url="",
+                        published_at="2026-01-01T00:00:00")
+        item.sentiment_score = rng.uniform(-1.0, 1.0)
+        item.entities = rng.sample(tickers, min(len(tickers), rng.randint(1, 3)))
+        items.append(item)
+    next_item = _cycle(items)
+    return lambda: engine.generate_signal(next_item())
+
+def _full_state(workdir, rng, scale, name):
+    """A JSON-backend StateManager with order, signal and processed-news histories at their caps."""
+    path = os.path.join(workdir, name, "state.json")
+    manager = state_module.StateManager(path, snapshot_every=10 ** 9)
+    tickers = sorted(set(get_entities().values())) or ["AAPL"]
+    start = datetime.datetime(2026, 1, 1)
+    with manager.transaction():
+        for i in range(_sized(manager.max_order_history, scale)):
+            ts = (start + datetime.timedelta(minutes=i)).isoformat()
+            manager.add_order({"order_id": hashlib.sha1(f"o{i}".encode()).hexdigest(), "symbol": rng.choice(tickers),
+                               "action": rng.choice(["BUY", "SELL"]), "quantity": rng.randint(1, 100),
+                               "price": round(rng.uniform(10, 500), 2), "status": "FILLED", "timestamp": ts})
+        for i in range(_sized(manager.max_signal_history, scale)):
+            manager.add_signal({"id": hashlib.sha1(f"s{i}".encode()).hexdigest(), "asset": rng.choice(tickers),
+                                "action": "BUY", "confidence": rng.random(), "reasons": ["Sentiment Score: 0.80"],
+                                "source_news_id": f"n{i}",
+                                "generated_at": (start + datetime.timedelta(minutes=i)).isoformat()})
+        for i in range(_sized(manager.max_processed_news, scale)):
+            manager.mark_news_processed(hashlib.sha1(f"n{i}".encode()).hexdigest())
+        manager.update_portfolio(100000.0, {t: float(rng.randint(1, 50)) for t in tickers[:50]})
+    manager.save_state()
+    return manager
+
+@case("state.save_state")
+def state_save(workdir, rng, scale):
+    manager = _full_state(workdir, rng, scale, "save")
+    return manager.save_state
+
+@case("state.load_state.cold")
+def state_load_cold(workdir, rng, scale):
+    # What a freshly started API or dashboard process pays
+    path = _full_state(workdir, rng, scale, "load").state_file
+    return lambda: state_module.StateManager(path)
+
+@case("state.load_state.unchanged")
+def state_load_unchanged(workdir, rng, scale):
+    # A poller's load_state() when nothing was written since its last read
+    return _full_state(workdir, rng, scale, "poll").load_state
+
+@case("state.order_exists")
+def state_order_exists(workdir, rng, scale):
+    manager = _full_state(workdir, rng, scale, "exists")
+    known = [o["order_id"] for o in manager.get_orders(limit=None)]
+    # Half hits, half misses
+    ids = [rng.choice(known) if i % 2 else hashlib.sha1(f"missing{i}".encode()).hexdigest() for i in range(1000)]
+    next_id = _cycle(ids)
+    return lambda: manager.order_exists(next_id())
+
+def _log_file(workdir, rng, scale) -> str:
+    path = os.path.join(workdir, "trading.log")
+    if os.path.exists(path):
+        return path
+    start = datetime.datetime(2026, 1, 1)
+    levels = ["INFO"] * 17 + ["WARNING"] * 2 + ["ERROR"]
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(_sized(300_000, scale)):
+            f.write(json.dumps({
+                "timestamp": (start + datetime.timedelta(seconds=i)).isoformat(),
+                "level": rng.choice(levels),
+                "logger": rng.choice(LOG_LOGGERS),
+                "message": f"Analyzed '{_headline(rng)}': Sentiment=0.42, Entities=['AAPL']",
+                "host": "bench", "pid": 1,
+            }) + "\n")
+    return path
+
+# /api/logs is a thin mapping over LogReader.query; these are its common requests
+
+@case("logs.query.latest")
+def logs_latest(workdir, rng, scale):
+    reader = LogReader(_log_file(workdir, rng, scale))
+    return lambda: reader.query(limit=100)
+
+@case("logs.query.errors")
+def logs_errors(workdir, rng, scale):
+    reader = LogReader(_log_file(workdir, rng, scale))
+    return lambda: reader.query(limit=100, level="ERROR")
+
+@case("logs.query.search")
+def logs_search(workdir, rng, scale):
+    reader = LogReader(_log_file(workdir, rng, scale))
+    return lambda: reader.query(limit=50, q="lawsuit")
+
+@case("logs.query.time_range")
+def logs_time_range(workdir, rng, scale):
+    path = _log_file(workdir, rng, scale)
+    reader = LogReader(path)
+    # An hour-long window in the middle of the file
+    middle = datetime.datetime(2026, 1, 1) + datetime.timedelta(seconds=_sized(300_000, scale) // 2)
+    since, until = middle.isoformat(), (middle + datetime.timedelta(hours=1)).isoformat()
+    return lambda: reader.query(limit=100, since=since, until=until)
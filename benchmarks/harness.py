@@ -0,0 +1,107 @@
+"""
+Timing, result files and baseline comparison for the hot-path suite.
+
+A case is a function registered with @case that builds its synthetic data
+and returns a zero-argument callable doing one operation. Each case is run
+in repeats of enough calls to last at least min_time seconds; the per-call
+time of every repeat is kept so a comparison can use the median.
+"""
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from typing import Callable, Dict, List, Optional
+
+CASES: Dict[str, Callable] = {}
+
+def case(name: str):
+    """Registers a setup function `fn(workdir, rng, scale) -> op` under `name`."""
+    def register(fn):
+        CASES[name] = fn
+        return fn
+    return register
+
+def time_op(op: Callable, repeats: int = 5, min_time: float = 0.2) -> dict:
+    """Per-call seconds for `op`: min, median and max over `repeats` timed loops."""
+    op()  # warm-up: caches, lazy imports, page cache
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            op()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 2 if elapsed < min_time / 10 else max(2, int(min_time / max(elapsed, 1e-9)) + 1)
+
+    samples = [elapsed / number]
+    for _ in range(repeats - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            op()
+        samples.append((time.perf_counter() - started) / number)
+    return {
+        "min_sec": min(samples),
+        "median_sec": statistics.median(samples),
+        "max_sec": max(samples),
+        "calls_per_repeat": number,
+        "repeats": repeats,
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+def environment() -> dict:
+    return {
+        "created_at": datetime.datetime.utcnow().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+def save(results: dict, path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10, stat: str = "median_sec") -> List[dict]:
+    """
+    One row per case in either run. `change` is current/baseline - 1;
+    status is "regression" past +threshold, "improvement" past -threshold,
+    "ok" in between, or "missing"/"new" for cases only one run has.
+    """
+    base_cases = baseline.get("cases", {})
+    cur_cases = current.get("cases", {})
+    rows = []
+    for name in sorted(set(base_cases) | set(cur_cases)):
+        base = base_cases.get(name, {}).get(stat)
+        cur = cur_cases.get(name, {}).get(stat)
+        if base is None or cur is None:
+            rows.append({"case": name, "baseline": base, "current": cur, "change": None,
+                         "status": "new" if base is None else "missing"})
+            continue
+        change = cur / base - 1.0 if base > 0 else 0.0
+        if change > threshold:
+            status = "regression"
+        elif change < -threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({"case": name, "baseline": base, "current": cur, "change": change, "status": status})
+    return rows
+
+def format_us(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds * 1e6:,.1f}"
@@ -0,0 +1,205 @@
+"""
+Synthetic news feeds served over HTTP as RSS, standing in for the real
+sources in news_sources.rss.
+
+Entries are generated at a fixed rate (items/sec across all feeds) and
+mention companies from config/entities.yaml with a mix of positive,
+negative and neutral wording. Each feed serves its latest `window`
+entries with an ETag, so NewsFetcher's conditional GETs, parsing and
+dedup all run as they do against real feeds.
+
+    python -m benchmarks.loadgen --rate 50 --feeds 4 --port 8099
+
+then point news_sources.rss at the printed URLs.
+"""
+import argparse
+import collections
+import datetime
+import hashlib
+import random
+import threading
+import time
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+from benchmarks.bench_entities import load_entities
+
+# Phrasings spread over TextBlob's polarity range, so some items clear the trading thresholds and most don't
+POSITIVE = [
+    "posts excellent quarterly results", "shares jump on great demand", "reports strong growth in sales",
+    "raises guidance on strong demand", "wins major contract", "beats earnings estimates",
+]
+NEGATIVE = [
+    "reports terrible quarter", "shares plunge on bad news", "warns of poor demand",
+    "cuts guidance amid weak demand", "misses estimates on weak sales", "posts disappointing results",
+]
+NEUTRAL = [
+    "schedules annual shareholder meeting", "to present at industry conference",
+    "files quarterly report", "names new board member", "confirms dividend date",
+]
+MARKET = ["Stocks drift as investors await inflation data", "Treasury yields hold steady ahead of auction",
+          "Oil prices little changed in quiet trade"]
+
+class SyntheticNews:
+    """
+    Deterministic stream of headline/summary pairs. Roughly a quarter of
+    items name no company, most name one and some compare two; sentiment
+    is split between positive, negative and neutral wording.
+    """
+    def __init__(self, entities: Optional[Dict[str, str]] = None, seed: int = 7):
+        names = list(entities if entities is not None else load_entities())
+        self.names = names or ["Apple"]
+        self.rng = random.Random(seed)
+
+    def next(self):
+        rng = self.rng
+        mentions = rng.choices([0, 1, 2], weights=[25, 55, 20])[0]
+        tone = rng.choices([POSITIVE, NEGATIVE, NEUTRAL], weights=[35, 35, 30])[0]
+        if mentions == 0:
+            title = rng.choice(MARKET)
+            summary = f"{title}. Analysts said the session lacked a clear catalyst."
+        else:
+            companies = rng.sample(self.names, mentions)
+            title = f"{companies[0]} {rng.choice(tone)}"
+            summary = f"{title}, the company said on {rng.choice(['Monday', 'Tuesday', 'Thursday'])}."
+            if mentions == 2:
+                summary += f" Rival {companies[1]} {rng.choice(NEUTRAL)}."
+        return title, summary
+
+class SyntheticFeedServer:
+    """
+    Local RSS server for `feeds` feeds publishing `rate` entries per second
+    in total. Entries appear on schedule whether or not anyone polls;
+    published_at() tells when an item (by NewsFetcher's id) became
+    available, for latency measurements.
+    """
+    def __init__(self, rate: float = 10.0, feeds: int = 3, window: int = 100, host: str = "127.0.0.1",
+                 port: int = 0, seed: int = 7, entities: Optional[Dict[str, str]] = None):
+        self.rate = rate
+        self.feeds = feeds
+        self.window = window
+        self.news = SyntheticNews(entities, seed=seed)
+        self._entries = [collections.deque(maxlen=window) for _ in range(feeds)]
+        self._published: Dict[str, float] = {}
+        self._generated = 0
+        self._started = None
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def sources(self) -> List[dict]:
+        """Entries for news_sources.rss."""
+        return [{"name": f"Synthetic {i}", "url": f"{self.url}/feed/{i}.xml"} for i in range(self.feeds)]
+
+    def start(self):
+        self._started = time.time()
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="loadgen", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread = None
+        self._httpd.server_close()
+
+    @property
+    def generated(self) -> int:
+        with self._lock:
+            self._advance()
+            return self._generated
+
+    def published_at(self, item_id: str) -> Optional[float]:
+        return self._published.get(item_id)
+
+    def _advance(self):
+        """Publishes every entry due by now (caller holds the lock)."""
+        due = int((time.time() - self._started) * self.rate)
+        # A backlog beyond what the feeds can show would never be seen anyway
+        skip = max(0, due - self._generated - self.window * self.feeds)
+        self._generated += skip
+        while self._generated < due:
+            seq = self._generated
+            when = self._started + seq / self.rate
+            title, summary = self.news.next()
+            link = f"https://synthetic.example/news/{seq}"
+            self._published[hashlib.md5(link.encode("utf-8")).hexdigest()] = when
+            self._entries[seq % self.feeds].append((seq, when, title, summary, link))
+            self._generated += 1
+
+    def render(self, feed: int):
+        """(etag, RSS body) for one feed."""
+        with self._lock:
+            self._advance()
+            entries = list(self._entries[feed])
+        etag = f'"{feed}-{entries[-1][0] if entries else -1}"'
+        items = "".join(
+            f"<item><title>{escape(title)}</title><link>{escape(link)}</link><guid>{escape(link)}</guid>"
+            f"<description>{escape(summary)}</description>"
+            f"<pubDate>{format_datetime(datetime.datetime.fromtimestamp(when, datetime.timezone.utc), usegmt=True)}"
+            f"</pubDate></item>"
+            for _, when, title, summary, link in reversed(entries)
+        )
+        body = (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                f"<title>Synthetic {feed}</title><link>{self.url}</link><description>Load test feed</description>"
+                f"{items}</channel></rss>")
+        return etag, body.encode("utf-8")
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                name = self.path.rsplit("/", 1)[-1]
+                try:
+                    feed = int(name.split(".", 1)[0])
+                    if not 0 <= feed < server.feeds:
+                        raise ValueError(name)
+                except ValueError:
+                    self.send_error(404)
+                    return
+                etag, body = server.render(feed)
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=10.0, help="Entries per second across all feeds")
+    parser.add_argument("--feeds", type=int, default=3)
+    parser.add_argument("--window", type=int, default=100, help="Entries each feed shows")
+    parser.add_argument("--port", type=int, default=8099)
+    args = parser.parse_args(argv)
+
+    server = SyntheticFeedServer(rate=args.rate, feeds=args.feeds, window=args.window, port=args.port).start()
+    print("news_sources:\n  rss:")
+    for source in server.sources():
+        print(f"  - name: {source['name']}\n    url: {source['url']}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
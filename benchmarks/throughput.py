@@ -0,0 +1,177 @@
+"""
+End-to-end throughput harness: runs TradingBot against synthetic feeds.
+
+    python -m benchmarks.throughput --rate 20 --duration 60
+    python -m benchmarks.throughput --rate 200 --feeds 8 --pipeline --interval 5
+
+The bot runs unmodified with the repo's config in a scratch directory
+(state, caches and logs stay there), with news_sources.rss pointed at a
+local SyntheticFeedServer and paper fills enabled. Only price lookups are
+replaced, by SyntheticMarketData, so no network is used. Reports items/sec,
+per-item latency from publication on the feed to being marked processed
+(p50/p99, so it includes waiting for the next tick), and RSS growth.
+Raise --rate until processed/sec stops following it to find capacity.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+import yaml
+from benchmarks.loadgen import SyntheticFeedServer
+from src.ingestion.market_data import MarketDataFetcher
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class SyntheticMarketData(MarketDataFetcher):
+    """MarketDataFetcher with its cache and batching, answering from a random walk after `latency_sec`."""
+    def __init__(self, latency_sec: float = 0.0, seed: int = 7):
+        super().__init__()
+        self.latency_sec = latency_sec
+        self._rng = random.Random(seed)
+        self._prices = {}
+
+    def _fetch_price(self, symbol):
+        return self._fetch_prices([symbol])[symbol]
+
+    def _fetch_prices(self, symbols):
+        if self.latency_sec:
+            time.sleep(self.latency_sec)
+        for sym in symbols:
+            price = self._prices.get(sym) or self._rng.uniform(20, 500)
+            self._prices[sym] = round(price * (1 + self._rng.gauss(0, 0.002)), 2)
+        return {sym: self._prices[sym] for sym in symbols}
+
+def rss_bytes() -> int:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    # Peak rather than current where /proc is unavailable (kilobytes on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def prepare_workdir(workdir, sources, args):
+    """Writes the repo config, adjusted for the run, into workdir/config."""
+    with open(os.path.join(REPO_ROOT, "config", "config.yaml")) as f:
+        config = yaml.safe_load(f)
+    config.setdefault("news_sources", {})["rss"] = sources
+    # Let the feed scheduler poll the (busy) synthetic feeds as often as every tick
+    config["news_sources"].setdefault("schedule", {})["min_interval_sec"] = args.interval
+    config.setdefault("system", {}).update(tick_interval_sec=args.interval, dry_run=False, mode="paper")
+    config.setdefault("pipeline", {})["enabled"] = args.pipeline
+    config.setdefault("state", {})["backend"] = args.backend
+    for name in ("config", "data", "logs"):
+        os.makedirs(os.path.join(workdir, name), exist_ok=True)
+    with open(os.path.join(workdir, "config", "config.yaml"), "w") as f:
+        yaml.safe_dump(config, f)
+    shutil.copy(os.path.join(REPO_ROOT, "config", "entities.yaml"), os.path.join(workdir, "config", "entities.yaml"))
+
+def run(args) -> dict:
+    server = SyntheticFeedServer(rate=args.rate, feeds=args.feeds, window=args.window, seed=args.seed)
+    workdir = tempfile.mkdtemp(prefix="throughput-")
+    prepare_workdir(workdir, server.sources(), args)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        # Imported here: src.main loads config and sets up logging relative to the working directory
+        from src.main import TradingBot
+        bot = TradingBot()
+        bot.market_data = SyntheticMarketData(latency_sec=args.price_latency_ms / 1000.0, seed=args.seed)
+        bot.risk_manager.set_market_data(bot.market_data)
+        bot.broker.set_market_data(bot.market_data)
+
+        latencies = []
+        mark_processed = bot.state_manager.mark_news_processed
+        def timed_mark(news_id):
+            mark_processed(news_id)
+            published = server.published_at(news_id)
+            if published is not None:
+                latencies.append(time.time() - published)
+        bot.state_manager.mark_news_processed = timed_mark
+
+        rss_start = rss_bytes()
+        rss_samples = [rss_start]
+        server.start()
+        started = time.monotonic()
+        runner = threading.Thread(target=bot.run, name="bot", daemon=True)
+        runner.start()
+        while time.monotonic() - started < args.duration:
+            time.sleep(min(1.0, args.duration))
+            rss_samples.append(rss_bytes())
+        generated = server.generated
+        processed = len(latencies)
+        elapsed = time.monotonic() - started
+
+        bot.running = False
+        runner.join(timeout=args.interval + 30)
+        bot.sentiment_analyzer.close()
+        if bot.analysis_cache:
+            bot.analysis_cache.close()
+        bot.state_manager.save_state()
+        orders = bot.state_manager.count_orders()
+    finally:
+        server.stop()
+        os.chdir(cwd)
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    lat = np.array(latencies) if latencies else np.array([np.nan])
+    return {
+        "rate": args.rate,
+        "feeds": args.feeds,
+        "pipeline": args.pipeline,
+        "backend": args.backend,
+        "duration_sec": elapsed,
+        "generated": generated,
+        "processed": processed,
+        "backlog": generated - processed,
+        "orders": orders,
+        "items_per_sec": processed / elapsed,
+        "latency_p50_sec": float(np.percentile(lat, 50)),
+        "latency_p99_sec": float(np.percentile(lat, 99)),
+        "latency_max_sec": float(np.max(lat)),
+        "rss_start_mb": rss_start / 2 ** 20,
+        "rss_end_mb": rss_samples[-1] / 2 ** 20,
+        "rss_peak_mb": max(rss_samples) / 2 ** 20,
+        "rss_growth_mb": (rss_samples[-1] - rss_start) / 2 ** 20,
+        "workdir": workdir if args.keep else None,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=20.0, help="Synthetic entries per second across all feeds")
+    parser.add_argument("--feeds", type=int, default=3)
+    parser.add_argument("--window", type=int, default=200, help="Entries each feed shows")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to run")
+    parser.add_argument("--interval", type=float, default=2.0, help="system.tick_interval_sec for the run")
+    parser.add_argument("--pipeline", action="store_true", help="Run the staged PipelineRunner instead of the loop")
+    parser.add_argument("--backend", default="json", choices=["json", "sqlite"], help="state.backend")
+    parser.add_argument("--price-latency-ms", type=float, default=0.0, help="Simulated price provider latency")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory (state, logs)")
+    parser.add_argument("--out", help="Also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    for key, value in report.items():
+        print(f"{key:<18} {value:.3f}" if isinstance(value, float) else f"{key:<18} {value}")
+    if report["backlog"] > args.rate * (args.interval + 1):
+        print(f"Not keeping up: {report['backlog']} items behind after {report['duration_sec']:.0f}s")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from src.utils.config_loader import get_config
+from src.utils.logger import get_logger
+
+logger = get_logger("AnalysisCache")
+
+_MISS = object()
+
+def content_key(text: str) -> str:
+    """Hash of the normalized text (unicode NFKC, whitespace collapsed)."""
+    normalized = " ".join(unicodedata.normalize("NFKC", text or "").split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+class AnalysisCache:
+    """
+    Content-addressed cache for analysis results (sentiment scores, entities).
+
+    Entries are keyed by (kind, hash of normalized text) and carry a version
+    string; a lookup with a different version is a miss, which is how results
+    are invalidated when e.g. the entity map changes. An in-memory LRU sits in
+    front of an optional SQLite file so warm restarts keep their results.
+    """
+    def __init__(self, max_entries: int = 20000, path: Optional[str] = None, max_persisted: int = 200000):
+        self.max_entries = max_entries
+        self.max_persisted = max_persisted
+        self.path = path
+        self._lru: "OrderedDict[Tuple[str, str], Tuple[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._writes_since_prune = 0
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self._open(path)
+
+    @classmethod
+    def from_config(cls) -> Optional["AnalysisCache"]:
+        if not get_config("analysis.cache.enabled", True):
+            return None
+        return cls(
+            max_entries=get_config("analysis.cache.max_entries", 20000),
+            path=get_config("analysis.cache.path", "data/analysis_cache.db"),
+            max_persisted=get_config("analysis.cache.max_persisted", 200000)
+        )
+
+    def _open(self, path: str):
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache ("
+                " kind TEXT NOT NULL, key TEXT NOT NULL, version TEXT NOT NULL,"
+                " value TEXT NOT NULL, updated REAL NOT NULL, PRIMARY KEY (kind, key))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_analysis_cache_updated ON analysis_cache (updated)")
+            self._db.commit()
+        except Exception as e:
+            logger.error(f"Failed to open analysis cache {path}, using memory only: {e}")
+            self._db = None
+
+    def get(self, kind: str, text: str, version: str = "") -> Any:
+        """Returns the cached value, or None on a miss."""
+        value = self._get(kind, content_key(text), version)
+        return None if value is _MISS else value
+
+    def get_many(self, kind: str, texts: Iterable[str], version: str = "") -> Dict[str, Any]:
+        """Returns {text: value} for the texts that are cached."""
+        found = {}
+        for text in texts:
+            if text in found:
+                continue
+            value = self._get(kind, content_key(text), version)
+            if value is not _MISS:
+                found[text] = value
+        return found
+
+    def put(self, kind: str, text: str, value: Any, version: str = ""):
+        self.put_many(kind, [(text, value)], version)
+
+    def put_many(self, kind: str, pairs: List[Tuple[str, Any]], version: str = ""):
+        rows = []
+        now = time.time()
+        with self._lock:
+            for text, value in pairs:
+                key = content_key(text)
+                self._remember((kind, key), version, value)
+                rows.append((kind, key, version, json.dumps(value), now))
+        if self._db is None or not rows:
+            return
+        try:
+            with self._lock:
+                with self._db:
+                    self._db.executemany("INSERT OR REPLACE INTO analysis_cache VALUES (?, ?, ?, ?, ?)", rows)
+                self._writes_since_prune += len(rows)
+                if self._writes_since_prune >= 1000:
+                    self._prune()
+        except Exception as e:
+            logger.error(f"Failed to persist analysis cache entries: {e}")
+
+    def purge(self, kind: str, keep_version: str):
+        """Drops persisted entries of `kind` whose version is not `keep_version`."""
+        with self._lock:
+            for k in [k for k, (v, _) in self._lru.items() if k[0] == kind and v != keep_version]:
+                del self._lru[k]
+            if self._db is not None:
+                with self._db:
+                    deleted = self._db.execute(
+                        "DELETE FROM analysis_cache WHERE kind = ? AND version != ?", (kind, keep_version)
+                    ).rowcount
+                if deleted:
+                    logger.info(f"Invalidated {deleted} cached {kind} results")
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _get(self, kind: str, key: str, version: str) -> Any:
+        with self._lock:
+            entry = self._lru.get((kind, key))
+            if entry is not None and entry[0] == version:
+                self._lru.move_to_end((kind, key))
+                self.hits += 1
+                return entry[1]
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT version, value FROM analysis_cache WHERE kind = ? AND key = ?", (kind, key)
+                ).fetchone()
+                if row is not None and row[0] == version:
+                    value = json.loads(row[1])
+                    self._remember((kind, key), version, value)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return _MISS
+
+    def _remember(self, lru_key, version, value):
+        self._lru[lru_key] = (version, value)
+        self._lru.move_to_end(lru_key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def _prune(self):
+        """Keeps the persisted store at max_persisted rows, dropping the least recently written."""
+        self._writes_since_prune = 0
+        with self._db:
+            self._db.execute(
+                "DELETE FROM analysis_cache WHERE updated < ("
+                " SELECT updated FROM analysis_cache ORDER BY updated DESC LIMIT 1 OFFSET ?)",
+                (self.max_persisted,)
+            )
@@ -1,33 +1,44 @@
+import hashlib
+import json
 from typing import List
+from src.analysis.matcher import AliasMatcher
+from src.infra import metrics
 from src.utils.config_loader import get_entities
 from src.utils.logger import get_logger
 
 logger = get_logger("EntityExtractor")
 
+ENTITY_SECONDS = metrics.histogram("entity_extraction_seconds", "Time to extract tickers from one text")
+
 class EntityExtractor:
-    def __init__(self):
-        self.entity_map = get_entities()
+    def __init__(self, cache=None, entity_map=None):
+        self.entity_map = get_entities() if entity_map is None else entity_map
         # map: "Apple" -> "AAPL"
-        # We can also do reverse mapping or simple contains check
-        # For efficiency, we iterate over keys (Apple) in text
-    
+        # All names are compiled into one automaton and matched in a single pass
+        self.matcher = AliasMatcher(self.entity_map)
+
+        # Cached results are tied to this exact entity map; edits to entities.yaml invalidate them
+        self.cache = cache
+        self.cache_version = hashlib.sha1(
+            json.dumps(self.entity_map, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        if self.cache is not None:
+            self.cache.purge("entities", self.cache_version)
+
     def extract(self, text: str) -> List[str]:
         """
         Returns list of Tickers found in text.
         """
-        found_tickers = set()
         if not text:
             return []
-        
-        text_lower = text.lower()
-        
-        for name, ticker in self.entity_map.items():
-            # Simple substring match
-            # "Apple" in "Apple releases new iPhone" -> Match
-            # "Gold" in "Golden Globes" -> Match (False positive risk)
-            # Better: check word boundaries or ignore case carefully
-            # For MVP: simple lower case substring
-            if name.lower() in text_lower:
-                found_tickers.add(ticker)
-                
-        return list(found_tickers)
+        with ENTITY_SECONDS.time():
+            if self.cache is not None:
+                cached = self.cache.get("entities", text, self.cache_version)
+                if cached is not None:
+                    return cached
+
+            # Whole-word, longest-match: "Gold" no longer matches "Golden Globes"
+            tickers = self.matcher.tickers(text)
+            if self.cache is not None:
+                self.cache.put("entities", text, tickers, self.cache_version)
+            return tickers
@@ -0,0 +1,118 @@
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+class AliasMatcher:
+    """
+    Multi-pattern matcher for entity aliases (Aho-Corasick automaton).
+
+    All aliases are compiled once into a single trie with failure links, so
+    a text is scanned in one pass regardless of how many aliases exist.
+    Matching is case-insensitive, only accepts matches on word boundaries
+    and resolves overlaps leftmost-longest, e.g. "Alphabet Inc. (Class A)"
+    wins over "Alphabet".
+    """
+    def __init__(self, aliases: Dict[str, Iterable[str]]):
+        """
+        aliases: alias -> ticker or list of tickers.
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._patterns: List[Tuple[str, List[str]]] = []
+        self._index: Dict[str, int] = {}
+
+        for alias, tickers in aliases.items():
+            self._add(alias, tickers)
+        self._build()
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def _add(self, alias: str, tickers):
+        key = alias.lower().strip()
+        if not key:
+            return
+        if isinstance(tickers, str):
+            tickers = [tickers]
+        # Aliases differing only by case share one pattern
+        if key in self._index:
+            existing = self._patterns[self._index[key]][1]
+            existing.extend(t for t in tickers if t not in existing)
+            return
+
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._index[key] = len(self._patterns)
+        self._out[node].append(len(self._patterns))
+        self._patterns.append((key, list(tickers)))
+
+    def _build(self):
+        """Computes failure links breadth-first and merges outputs along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                state = self._fail[node]
+                while state and ch not in self._goto[state]:
+                    state = self._fail[state]
+                target = self._goto[state].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Returns non-overlapping (start, end, alias) matches in text order.
+        """
+        if not text:
+            return []
+        t = text.lower()
+        n = len(t)
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self._patterns
+
+        candidates = []
+        node = 0
+        for i, ch in enumerate(t):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pid in out[node]:
+                alias = patterns[pid][0]
+                start = i - len(alias) + 1
+                end = i + 1
+                # Word boundaries only matter where the alias itself starts/ends with a word char
+                if start > 0 and _is_word_char(alias[0]) and _is_word_char(t[start - 1]):
+                    continue
+                if end < n and _is_word_char(alias[-1]) and _is_word_char(t[end]):
+                    continue
+                candidates.append((start, end, pid))
+
+        # Leftmost-longest, non-overlapping
+        candidates.sort(key=lambda c: (c[0], c[0] - c[1]))
+        matches = []
+        last_end = 0
+        for start, end, pid in candidates:
+            if start >= last_end:
+                matches.append((start, end, patterns[pid][0]))
+                last_end = end
+        return matches
+
+    def tickers(self, text: str) -> List[str]:
+        """Returns the distinct tickers of all aliases found in text."""
+        found = []
+        for _, _, alias in self.find(text):
+            for ticker in self._patterns[self._index[alias]][1]:
+                if ticker not in found:
+                    found.append(ticker)
+        return found
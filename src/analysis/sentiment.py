@@ -1,21 +1,116 @@
+import os
+import multiprocessing
+from importlib import metadata
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
 from textblob import TextBlob
+from src.infra import metrics
+from src.utils.config_loader import get_config
 from src.utils.logger import get_logger
 
 logger = get_logger("SentimentAnalyzer")
 
+SENTIMENT_SECONDS = metrics.histogram("sentiment_seconds", "Time to score texts, per call", ["mode"])
+SENTIMENT_TEXTS = metrics.counter("sentiment_texts_total", "Texts scored, by whether the cache had them", ["cache"])
+
+def _polarity(text: str) -> float:
+    try:
+        if not text:
+            return 0.0
+        blob = TextBlob(text)
+        return blob.sentiment.polarity
+    except Exception as e:
+        logger.error(f"Sentiment analysis failed: {e}")
+        return 0.0
+
+def _polarity_chunk(texts: List[str]) -> List[float]:
+    return [_polarity(t) for t in texts]
+
+def _textblob_version() -> str:
+    try:
+        return metadata.version("textblob")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+def _warm_worker():
+    """Pool initializer: loads TextBlob's lexicon once per worker process."""
+    TextBlob("warm up").sentiment
+
 class SentimentAnalyzer:
-    def __init__(self):
-        pass
+    # Cached scores are only reused for the same TextBlob release
+    CACHE_VERSION = f"textblob-{_textblob_version()}"
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.workers = get_config("analysis.sentiment_workers", os.cpu_count() or 1)
+        self.min_batch = get_config("analysis.sentiment_min_batch", 32)
+        self.chunk_size = get_config("analysis.sentiment_chunk_size", 16)
+        self._pool = None
 
     def analyze(self, text: str) -> float:
         """
         Returns sentiment score between -1.0 (Negative) and 1.0 (Positive).
         """
+        with SENTIMENT_SECONDS.time(mode="single"):
+            if self.cache is None:
+                SENTIMENT_TEXTS.inc(cache="off")
+                return _polarity(text)
+            score = self.cache.get("sentiment", text, self.CACHE_VERSION)
+            SENTIMENT_TEXTS.inc(cache="miss" if score is None else "hit")
+            if score is None:
+                score = _polarity(text)
+                self.cache.put("sentiment", text, score, self.CACHE_VERSION)
+            return score
+
+    def analyze_batch(self, texts: List[str]) -> List[float]:
+        """
+        Scores many texts at once, in input order. Large batches are chunked
+        across a warm process pool; small ones are scored inline since pool
+        round trips would cost more than they save.
+        """
+        texts = list(texts)
+        with SENTIMENT_SECONDS.time(mode="batch"):
+            if self.cache is None:
+                SENTIMENT_TEXTS.inc(len(texts), cache="off")
+                return self._score_batch(texts)
+
+            # Only score texts not seen before; duplicates within the batch are scored once
+            scores = self.cache.get_many("sentiment", texts, self.CACHE_VERSION)
+            missing = list(dict.fromkeys(t for t in texts if t not in scores))
+            SENTIMENT_TEXTS.inc(len(missing), cache="miss")
+            SENTIMENT_TEXTS.inc(len(texts) - len(missing), cache="hit")
+            if missing:
+                fresh = dict(zip(missing, self._score_batch(missing)))
+                self.cache.put_many("sentiment", list(fresh.items()), self.CACHE_VERSION)
+                scores.update(fresh)
+            return [scores[t] for t in texts]
+
+    def _score_batch(self, texts: List[str]) -> List[float]:
+        if self.workers <= 1 or len(texts) < self.min_batch:
+            return [_polarity(t) for t in texts]
+
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
         try:
-            if not text:
-                return 0.0
-            blob = TextBlob(text)
-            return blob.sentiment.polarity
+            scores = []
+            for chunk_scores in self._get_pool().map(_polarity_chunk, chunks):
+                scores.extend(chunk_scores)
+            return scores
         except Exception as e:
-            logger.error(f"Sentiment analysis failed: {e}")
-            return 0.0
+            logger.error(f"Batch sentiment failed, falling back to serial: {e}")
+            self.close()
+            return [_polarity(t) for t in texts]
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: the bot also runs inside the Streamlit process, where forking threads is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker
+            )
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,38 @@
+"""
+Offline backtest over archived news and price bars.
+
+    python -m src.backtest --news archive/news.jsonl --prices archive/prices.csv
+"""
+import argparse
+import datetime
+import json
+from src.backtest.data import PriceFeed, load_news
+from src.backtest.engine import BacktestEngine, quiet_logging
+from src.utils.config_loader import load_config
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay archived news through the signal and risk pipeline")
+    parser.add_argument("--news", required=True, help="News archive (.jsonl or .parquet)")
+    parser.add_argument("--prices", required=True, help="Bars with timestamp,symbol,close (.csv or .parquet)")
+    parser.add_argument("--cash", type=float, default=100000.0, help="Starting cash")
+    parser.add_argument("--batch-size", type=int, default=256, help="Items scored per sentiment batch")
+    parser.add_argument("--horizon-hours", type=float, default=24.0, help="Look-ahead for the hit rate")
+    parser.add_argument("--verbose", action="store_true", help="Keep per-item INFO logging")
+    args = parser.parse_args(argv)
+
+    load_config()
+    if not args.verbose:
+        quiet_logging()
+
+    engine = BacktestEngine(
+        PriceFeed.from_file(args.prices),
+        initial_cash=args.cash,
+        batch_size=args.batch_size,
+        hit_horizon=datetime.timedelta(hours=args.horizon_hours)
+    )
+    report = engine.run(load_news(args.news))
+    print(json.dumps(report.to_dict(), indent=2))
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+import datetime
+
+class SimulatedClock:
+    """Backtest time source. Only moves forward, and only when the engine advances it."""
+    def __init__(self, start: datetime.datetime = None):
+        self._now = start or datetime.datetime(1970, 1, 1)
+
+    def now(self) -> datetime.datetime:
+        return self._now
+
+    def advance_to(self, when: datetime.datetime):
+        if when > self._now:
+            self._now = when
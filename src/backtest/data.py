@@ -0,0 +1,125 @@
+import datetime
+import json
+from dataclasses import fields
+from typing import Iterable, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+from src.models import NewsItem
+from src.utils.logger import get_logger
+
+logger = get_logger("BacktestData")
+
+_NEWS_FIELDS = {f.name for f in fields(NewsItem)}
+
+def parse_time(value) -> datetime.datetime:
+    """Naive UTC datetime from an ISO string, epoch seconds or a datetime."""
+    if isinstance(value, datetime.datetime):
+        ts = pd.Timestamp(value)
+    elif isinstance(value, (int, float)):
+        ts = pd.Timestamp(value, unit="s")
+    else:
+        ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts.to_pydatetime()
+
+def _news_item(row: dict) -> NewsItem:
+    row = {k: v for k, v in row.items() if k in _NEWS_FIELDS}
+    row.setdefault("source", "archive")
+    row.setdefault("url", "")
+    row.setdefault("content", row.get("summary") or "")
+    row["published_at"] = parse_time(row["published_at"]).isoformat()
+    return NewsItem(**row)
+
+def load_news(path: str) -> List[NewsItem]:
+    """
+    Reads an archive of news items (JSONL, or Parquet if pyarrow is installed)
+    with at least id, title and published_at, sorted by publication time.
+    """
+    if path.endswith(".parquet"):
+        rows = pd.read_parquet(path).to_dict("records")
+    else:
+        rows = []
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"Skipping malformed line {line_no} in {path}")
+    items = [_news_item(row) for row in rows]
+    items.sort(key=lambda item: item.published_at)
+    return items
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class PriceFeed:
+    """
+    Historical close prices with as-of lookups, standing in for MarketDataFetcher.
+
+    Bars (timestamp, symbol, close) are pivoted once into a forward-filled
+    time x symbol matrix; a lookup is a binary search on the time index plus
+    an array read, and many lookups are answered in one vectorized call.
+    get_current_price() reads at the simulated clock's current time.
+    """
+    def __init__(self, bars: pd.DataFrame, clock=None):
+        bars = bars.copy()
+        bars["timestamp"] = pd.to_datetime(bars["timestamp"], utc=True).dt.tz_localize(None)
+        wide = bars.pivot_table(index="timestamp", columns="symbol", values="close", aggfunc="last").sort_index()
+        self.symbols = {sym: i for i, sym in enumerate(wide.columns)}
+        self.times = wide.index.values.astype("datetime64[ns]").astype(np.int64)
+        self.matrix = wide.ffill().to_numpy(dtype=float)
+        self.clock = clock
+
+    @classmethod
+    def from_file(cls, path: str, clock=None) -> "PriceFeed":
+        """CSV or Parquet with timestamp, symbol and close columns."""
+        if path.endswith(".parquet"):
+            bars = pd.read_parquet(path)
+        else:
+            bars = pd.read_csv(path)
+        return cls(bars, clock=clock)
+
+    @property
+    def start(self) -> Optional[datetime.datetime]:
+        return pd.Timestamp(self.times[0]).to_pydatetime() if len(self.times) else None
+
+    @property
+    def end(self) -> Optional[datetime.datetime]:
+        return pd.Timestamp(self.times[-1]).to_pydatetime() if len(self.times) else None
+
+    def prices_at(self, symbols: List[str], times: List[datetime.datetime]) -> np.ndarray:
+        """Last close at or before each (symbol, time) pair; NaN where there is none."""
+        stamps = np.array([np.datetime64(t, "ns") for t in times], dtype="datetime64[ns]").astype(np.int64)
+        rows = np.searchsorted(self.times, stamps, side="right") - 1
+        cols = np.array([self.symbols.get(s, -1) for s in symbols], dtype=np.int64)
+        valid = (rows >= 0) & (cols >= 0)
+        out = np.full(len(symbols), np.nan)
+        out[valid] = self.matrix[rows[valid], cols[valid]]
+        return out
+
+    def price_at(self, symbol: str, when: datetime.datetime) -> Optional[float]:
+        price = self.prices_at([symbol], [when])[0]
+        return None if np.isnan(price) else float(price)
+
+    # --- MarketDataFetcher interface ---
+
+    def get_current_price(self, symbol: str) -> Optional[float]:
+        return self.price_at(symbol, self.clock())
+
+    def get_prices(self, symbols: list) -> dict:
+        now = self.clock()
+        values = self.prices_at(list(symbols), [now] * len(symbols))
+        return {s: float(v) for s, v in zip(symbols, values) if not np.isnan(v)}
+
+    def prefetch(self, symbols):
+        pass
@@ -0,0 +1,186 @@
+import datetime
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+import numpy as np
+from src.analysis.extractor import EntityExtractor
+from src.analysis.sentiment import SentimentAnalyzer
+from src.backtest.clock import SimulatedClock
+from src.backtest.data import PriceFeed, batched, parse_time
+from src.backtest.state import InMemoryStateManager
+from src.execution.broker import Broker
+from src.execution.risk_manager import RiskManager
+from src.models import NewsItem
+from src.signals.engine import SignalEngine
+from src.utils.logger import get_logger
+
+logger = get_logger("Backtest")
+
+# Tunable settings (config key -> component attribute) that a run can override
+PARAMETERS = {
+    "sentiment_buy_threshold": ("signal_engine", "buy_threshold"),
+    "sentiment_sell_threshold": ("signal_engine", "sell_threshold"),
+    "min_confidence": ("signal_engine", "min_confidence"),
+    "risk_per_trade_pct": ("risk_manager", "risk_per_trade_pct"),
+    "max_position_size_pct": ("risk_manager", "max_pos_size_pct"),
+}
+
+def quiet_logging():
+    """Raises every logger to WARNING; per-item INFO lines would dominate a backtest's run time."""
+    logging.getLogger().setLevel(logging.WARNING)
+    for name in list(logging.Logger.manager.loggerDict):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+@dataclass
+class BacktestReport:
+    start: Optional[str]
+    end: Optional[str]
+    news_items: int
+    signals: int
+    orders: int
+    initial_cash: float
+    final_equity: float
+    pnl: float
+    return_pct: float
+    turnover: float          # traded notional / initial cash
+    hit_rate: Optional[float]  # share of signals the price moved in favour of within hit_horizon
+    elapsed_sec: float
+    daily_loss_breaches: int = 0  # simulated days on which the daily loss limit blocked new positions
+    positions: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+class BacktestEngine:
+    """
+    Replays archived news through the live analysis, signal, risk and broker
+    code against historical prices.
+
+    Time comes from a SimulatedClock that jumps to each item's publication
+    time, state lives in an InMemoryStateManager and prices come from a
+    PriceFeed, so nothing touches the network or data/state.json. Orders
+    fill at the last close at or before the news time.
+
+    `params` overrides the PARAMETERS settings from config for this run.
+    """
+    def __init__(self, prices: PriceFeed, initial_cash: float = 100000.0, batch_size: int = 256,
+                 hit_horizon: datetime.timedelta = datetime.timedelta(days=1),
+                 sentiment_analyzer: SentimentAnalyzer = None, entity_extractor: EntityExtractor = None,
+                 params: dict = None):
+        self.clock = SimulatedClock()
+        self.prices = prices
+        self.prices.clock = self.clock.now
+        self.initial_cash = initial_cash
+        self.batch_size = batch_size
+        self.hit_horizon = hit_horizon
+
+        self.state = InMemoryStateManager(initial_cash)
+        # Built on first analyze(); replay() of pre-analyzed items doesn't need them
+        self.sentiment_analyzer = sentiment_analyzer
+        self.entity_extractor = entity_extractor
+        self.signal_engine = SignalEngine(clock=self.clock.now)
+        self.risk_manager = RiskManager(state_manager=self.state, clock=self.clock.now)
+        self.risk_manager.set_market_data(self.prices)
+        # A breach blocks new positions for the rest of the simulated day instead of stopping the replay
+        self.risk_manager.risk_state.stop_on_daily_loss = False
+        self.broker = Broker(state_manager=self.state, clock=self.clock.now, mode="paper", dry_run=False)
+        self.broker.set_market_data(self.prices)
+        self.broker.set_risk_state(self.risk_manager.risk_state)
+
+        for name, value in (params or {}).items():
+            if name not in PARAMETERS:
+                raise ValueError(f"Unknown backtest parameter: {name}")
+            component, attr = PARAMETERS[name]
+            setattr(getattr(self, component), attr, value)
+
+    def run(self, news: List[NewsItem]) -> BacktestReport:
+        """Analyzes and replays items in publication order (see data.load_news) and reports the result."""
+        started = time.monotonic()
+        self.analyze(news)
+        return self.replay(news, started=started)
+
+    def analyze(self, news: List[NewsItem]):
+        """Sets sentiment_score and entities on every item. Independent of the trading parameters."""
+        if self.sentiment_analyzer is None:
+            self.sentiment_analyzer = SentimentAnalyzer()
+        if self.entity_extractor is None:
+            self.entity_extractor = EntityExtractor()
+        for batch in batched(news, self.batch_size):
+            texts = [f"{item.title} . {item.content or ''}" for item in batch]
+            scores = self.sentiment_analyzer.analyze_batch(texts)
+            for item, text, score in zip(batch, texts, scores):
+                item.sentiment_score = score
+                item.entities = self.entity_extractor.extract(text)
+
+    def replay(self, news: List[NewsItem], started: float = None) -> BacktestReport:
+        """Signals, risk and execution over items that analyze() already enriched."""
+        started = started if started is not None else time.monotonic()
+        signals = []
+        for item in news:
+            self.clock.advance_to(parse_time(item.published_at))
+            signals.extend(self.process_item(item))
+
+        report = self._report(news, signals, time.monotonic() - started)
+        logger.info(f"Backtest done: {report.news_items} items, {report.orders} orders, "
+                    f"P&L {report.pnl:.2f} ({report.return_pct:.2f}%) in {report.elapsed_sec:.1f}s")
+        return report
+
+    def process_item(self, item: NewsItem) -> list:
+        """Signals, risk and execution for one enriched item, as TradingBot.process_item does."""
+        signals = self.signal_engine.generate_signal(item)
+        if signals:
+            # Risk sizes against equity marked at this point in time, as TradingBot marks each tick
+            self.risk_manager.mark()
+        orders = self.risk_manager.evaluate_batch(signals)
+        for sig in signals:
+            self.state.add_signal(sig)
+            order = orders.get(sig.id)
+            if order:
+                self.broker.execute(order)
+        return signals
+
+    def _report(self, news, signals, elapsed) -> BacktestReport:
+        portfolio = self.state.get_portfolio()
+        fills = self.state.get_orders(limit=None, status="FILLED")
+        end = self.prices.end or self.clock.now()
+
+        positions = portfolio["positions"]
+        symbols = list(positions)
+        marks = self.prices.prices_at(symbols, [end] * len(symbols))
+        equity = portfolio["cash"] + float(np.nansum([positions[s] * m for s, m in zip(symbols, marks)]))
+        turnover = sum(abs(o["quantity"] * o["price"]) for o in fills) / self.initial_cash
+
+        return BacktestReport(
+            start=news[0].published_at if news else None,
+            end=news[-1].published_at if news else None,
+            news_items=len(news),
+            signals=len(signals),
+            orders=len(fills),
+            initial_cash=self.initial_cash,
+            final_equity=equity,
+            pnl=equity - self.initial_cash,
+            return_pct=(equity / self.initial_cash - 1.0) * 100.0,
+            turnover=turnover,
+            hit_rate=self._hit_rate(signals),
+            elapsed_sec=elapsed,
+            daily_loss_breaches=self.risk_manager.risk_state.daily_loss_breaches,
+            positions=dict(positions)
+        )
+
+    def _hit_rate(self, signals) -> Optional[float]:
+        """Share of signals whose asset moved their way between the signal and signal + hit_horizon."""
+        if not signals:
+            return None
+        assets = [s.asset for s in signals]
+        times = [parse_time(s.generated_at) for s in signals]
+        before = self.prices.prices_at(assets, times)
+        after = self.prices.prices_at(assets, [t + self.hit_horizon for t in times])
+        direction = np.array([1.0 if s.action == "BUY" else -1.0 for s in signals])
+        # Signals too close to the end of the price data have no outcome yet
+        in_range = np.array([t + self.hit_horizon <= self.prices.end for t in times])
+        known = ~np.isnan(before) & ~np.isnan(after) & in_range
+        if not known.any():
+            return None
+        hits = (after[known] - before[known]) * direction[known] > 0
+        return float(hits.mean())
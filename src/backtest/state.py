@@ -0,0 +1,41 @@
+import copy
+import threading
+from contextlib import contextmanager
+from src.utils.state_manager import StateManager
+
+class InMemoryStateManager(StateManager):
+    """
+    StateManager that never touches disk, for backtests.
+
+    Commits are appended to an in-memory log instead of the journal, and
+    history is not capped. Transactions keep their all-or-nothing semantics:
+    a rollback rebuilds state from the initial state plus the committed log.
+    """
+    def __init__(self, initial_cash: float = 100000.0):
+        self._initial = {"portfolio": {"cash": initial_cash, "positions": {}}}
+        self._log = []
+        super().__init__(state_file=":memory:", journal=False)
+        self.max_order_history = float("inf")
+        self.max_signal_history = float("inf")
+        self._read_from_disk()
+
+    @contextmanager
+    def _lock(self, shared=False):
+        with self._mutex:
+            yield
+
+    def load_state(self):
+        pass
+
+    def save_state(self):
+        self._flush()
+
+    def _read_from_disk(self):
+        self.state = copy.deepcopy(self._initial)
+        self._normalize()
+        for record in self._log:
+            self._apply(record)
+
+    def _flush(self):
+        self._log.extend(self._txn_records)
+        self._txn_records = []
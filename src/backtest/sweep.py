@@ -0,0 +1,153 @@
+"""
+Parameter sweep: many backtests over one dataset with different trading and
+risk settings.
+
+    python -m src.backtest.sweep --news archive/news.jsonl --prices archive/prices.csv \\
+        --param sentiment_buy_threshold=0.3,0.5,0.7 --param min_confidence=0.5,0.7,0.9
+
+Sentiment and entities do not depend on the swept settings, so the archive is
+analyzed once up front; each combination then only replays signals, risk and
+execution. The analyzed items and the price feed are handed to each pool
+worker once (via the pool initializer), not once per combination.
+"""
+import argparse
+import datetime
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+import pandas as pd
+from src.backtest.data import PriceFeed, load_news
+from src.backtest.engine import PARAMETERS, BacktestEngine, quiet_logging
+from src.models import NewsItem
+from src.utils.config_loader import load_config
+from src.utils.logger import get_logger
+
+logger = get_logger("Sweep")
+
+RESULT_COLUMNS = ["pnl", "return_pct", "orders", "signals", "turnover", "hit_rate", "daily_loss_breaches"]
+
+# Per-process inputs, set once by _init_worker
+_shared = {}
+
+def _check_names(space: dict):
+    unknown = set(space) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)} (known: {sorted(PARAMETERS)})")
+
+def grid(space: Dict[str, Sequence]) -> List[dict]:
+    """Every combination of the listed values."""
+    _check_names(space)
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+def random_search(space: Dict[str, object], samples: int, seed: Optional[int] = None) -> List[dict]:
+    """
+    `samples` random combinations. A (low, high) tuple is sampled uniformly,
+    a list is sampled from its values.
+    """
+    _check_names(space)
+    rng = random.Random(seed)
+    combos = []
+    for _ in range(samples):
+        combo = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                combo[name] = rng.uniform(*values)
+            else:
+                combo[name] = rng.choice(list(values))
+        combos.append(combo)
+    return combos
+
+def _init_worker(news, prices, initial_cash, hit_horizon):
+    try:
+        load_config()
+    except FileNotFoundError:
+        pass
+    quiet_logging()
+    _shared.update(news=news, prices=prices, initial_cash=initial_cash, hit_horizon=hit_horizon)
+
+def _run_combo(params: dict) -> dict:
+    engine = BacktestEngine(_shared["prices"], initial_cash=_shared["initial_cash"],
+                            hit_horizon=_shared["hit_horizon"], params=params)
+    report = engine.replay(_shared["news"]).to_dict()
+    return {**params, **{k: report[k] for k in RESULT_COLUMNS}}
+
+def run_sweep(news: List[NewsItem], prices: PriceFeed, combos: List[dict], initial_cash: float = 100000.0,
+              hit_horizon: datetime.timedelta = datetime.timedelta(days=1), workers: Optional[int] = None,
+              rank_by: str = "return_pct", batch_size: int = 256) -> pd.DataFrame:
+    """Backtests every combination and returns the results ranked best first by `rank_by`."""
+    if rank_by not in RESULT_COLUMNS:
+        raise ValueError(f"rank_by must be one of {RESULT_COLUMNS}")
+    started = time.monotonic()
+    BacktestEngine(prices, initial_cash=initial_cash, batch_size=batch_size).analyze(news)
+    logger.info(f"Analyzed {len(news)} items in {time.monotonic() - started:.1f}s")
+
+    workers = workers or os.cpu_count() or 1
+    shared = (news, prices, initial_cash, hit_horizon)
+    if workers == 1 or len(combos) <= 1:
+        _init_worker(*shared)
+        rows = [_run_combo(combo) for combo in combos]
+    else:
+        # Several combinations per task so the IPC round trip isn't paid per run
+        chunksize = max(1, len(combos) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=shared) as pool:
+            rows = list(pool.map(_run_combo, combos, chunksize=chunksize))
+    logger.info(f"Swept {len(combos)} combinations on {workers} worker(s) in {time.monotonic() - started:.1f}s")
+
+    results = pd.DataFrame(rows, columns=list(dict.fromkeys(k for combo in combos for k in combo)) + RESULT_COLUMNS)
+    results = results.sort_values(rank_by, ascending=False, na_position="last", kind="stable").reset_index(drop=True)
+    results.index = results.index + 1
+    results.index.name = "rank"
+    return results
+
+def _parse_param(text: str):
+    """name=v1,v2,... (values) or name=low:high (range, random search only)."""
+    name, _, values = text.partition("=")
+    if not values:
+        raise argparse.ArgumentTypeError(f"Expected name=v1,v2 or name=low:high, got {text!r}")
+    if ":" in values:
+        low, high = values.split(":", 1)
+        return name, (float(low), float(high))
+    return name, [float(v) for v in values.split(",")]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest a grid or random sample of trading and risk settings")
+    parser.add_argument("--news", required=True, help="News archive (.jsonl or .parquet)")
+    parser.add_argument("--prices", required=True, help="Bars with timestamp,symbol,close (.csv or .parquet)")
+    parser.add_argument("--param", action="append", type=_parse_param, default=[], metavar="NAME=VALUES",
+                        help=f"Values (a,b,c) or a range (low:high) for one of: {', '.join(PARAMETERS)}")
+    parser.add_argument("--samples", type=int, help="Random search with this many combinations instead of the full grid")
+    parser.add_argument("--seed", type=int, help="Seed for the random search")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--rank-by", default="return_pct", choices=RESULT_COLUMNS)
+    parser.add_argument("--cash", type=float, default=100000.0, help="Starting cash")
+    parser.add_argument("--horizon-hours", type=float, default=24.0, help="Look-ahead for the hit rate")
+    parser.add_argument("--top", type=int, default=20, help="Rows to print")
+    parser.add_argument("--out", help="Also write the full table to this CSV file")
+    args = parser.parse_args(argv)
+
+    space = dict(args.param)
+    if not space:
+        parser.error("at least one --param is required")
+    if args.samples:
+        combos = random_search(space, args.samples, seed=args.seed)
+    elif any(isinstance(v, tuple) for v in space.values()):
+        parser.error("ranges (low:high) need --samples")
+    else:
+        combos = grid(space)
+
+    load_config()
+    quiet_logging()
+    results = run_sweep(load_news(args.news), PriceFeed.from_file(args.prices), combos,
+                        initial_cash=args.cash, hit_horizon=datetime.timedelta(hours=args.horizon_hours),
+                        workers=args.workers, rank_by=args.rank_by)
+    if args.out:
+        results.to_csv(args.out)
+    print(results.head(args.top).to_string())
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,8 @@
+import datetime
+import time
+from contextlib import nullcontext
+from src.execution.ledger import PositionLedger
+from src.infra import metrics
 from src.models import TradeOrder
 from src.utils.config_loader import get_config
 from src.utils.state_manager import get_state_manager
@@ -5,11 +10,18 @@ from src.utils.logger import get_logger
 
 logger = get_logger("Broker")
 
+ORDER_EXECUTION_SECONDS = metrics.histogram("order_execution_seconds", "Time to execute one order", ["mode"])
+ORDER_EXECUTIONS = metrics.counter("order_executions_total", "Execution attempts by outcome", ["result"])
+
 class Broker:
-    def __init__(self):
-        self.mode = get_config("system.mode", "paper")
-        self.dry_run = get_config("system.dry_run", True)
-        self.state_manager = get_state_manager()
+    def __init__(self, state_manager=None, clock=None, mode=None, dry_run=None):
+        self.mode = mode or get_config("system.mode", "paper")
+        self.dry_run = get_config("system.dry_run", True) if dry_run is None else dry_run
+        # Injectable for backtests; default to the global state and the wall clock
+        self.state_manager = state_manager or get_state_manager()
+        self.clock = clock or datetime.datetime.utcnow
+        self.ledger = PositionLedger(self.state_manager)
+        self.risk_state = None
 
     def execute(self, order: TradeOrder) -> bool:
         """
@@ -17,71 +29,75 @@ class Broker:
         """
         if self.state_manager.is_emergency_stop():
             logger.critical("EMERGENCY STOP ENABLED. Skipping execution.")
+            ORDER_EXECUTIONS.inc(result="blocked")
             return False
 
         # Idempotency Check
         if order.order_id and self.state_manager.order_exists(order.order_id):
             logger.warning(f"Skipping duplicate order {order.order_id}")
+            ORDER_EXECUTIONS.inc(result="duplicate")
             return True # Treat as success
 
         if self.dry_run:
             logger.info(f"[DRY RUN] Would execute: {order.action} {order.quantity} {order.symbol}")
+            ORDER_EXECUTIONS.inc(result="dry_run")
             return True
 
+        started = time.perf_counter()
         if self.mode == "paper":
-            return self._execute_paper(order)
+            success = self._execute_paper(order)
         elif self.mode == "live":
             logger.critical("LIVE TRADING NOT IMPLEMENTED")
-            return False
-        
-        return False
+            success = False
+        else:
+            success = False
+        ORDER_EXECUTION_SECONDS.observe(time.perf_counter() - started, mode=self.mode)
+        ORDER_EXECUTIONS.inc(result="executed" if success else "failed")
+        return success
 
     def reconcile_orders(self):
         """
         Checks for PENDING/SUBMITTED orders on startup and queries broker for actual status.
         """
         logger.info("Reconciling orders...")
-        history = self.state_manager.state.get("order_history", [])
+        pending = self.state_manager.get_orders(limit=None, status=["PENDING", "SUBMITTED"])
         updated = False
-        import datetime
         
-        for i, order in enumerate(history):
+        for order in pending:
             status = order.get("status", "UNKNOWN")
-            if status in ["PENDING", "SUBMITTED"]:
-                order_id = order.get('order_id')
-                logger.info(f"Reconciling order {order_id} (Current Status: {status})")
+            order_id = order.get('order_id')
+            logger.info(f"Reconciling order {order_id} (Current Status: {status})")
+            
+            try:
+                # Query broker for actual status
+                broker_status = self.get_order_status(order_id)
                 
-                try:
-                    # Query broker for actual status
-                    broker_status = self.get_order_status(order_id)
-                    
+                with self.state_manager.transaction():
                     if broker_status == "FILLED":
                         logger.info(f"Order {order_id} was FILLED")
-                        history[i]["status"] = "FILLED"
-                        history[i]["reconciled_at"] = datetime.datetime.utcnow().isoformat()
+                        fields = {"status": "FILLED", "reconciled_at": datetime.datetime.utcnow().isoformat()}
                         
                         # Only apply to portfolio if not already applied
                         if not order.get("applied_to_portfolio"):
                             self._apply_fill_to_portfolio(order)
-                            history[i]["applied_to_portfolio"] = True
-                        updated = True
+                            fields["applied_to_portfolio"] = True
                         
                     elif broker_status == "FAILED":
                         logger.info(f"Order {order_id} FAILED")
-                        history[i]["status"] = "FAILED"
-                        history[i]["reconciled_at"] = datetime.datetime.utcnow().isoformat()
-                        updated = True
+                        fields = {"status": "FAILED", "reconciled_at": datetime.datetime.utcnow().isoformat()}
                         
                     else:
                         # Still PENDING/SUBMITTED - update last check timestamp
-                        history[i]["last_checked_utc"] = datetime.datetime.utcnow().isoformat()
+                        fields = {"last_checked_utc": datetime.datetime.utcnow().isoformat()}
                         logger.info(f"Order {order_id} still {broker_status}")
-                        updated = True
-                        
-                except Exception as e:
-                    logger.error(f"Failed to reconcile order {order_id}: {e}")
-                    # Keep status as is, will retry next startup
-                
+                    
+                    self.state_manager.update_order(order_id, fields)
+                updated = True
+                    
+            except Exception as e:
+                logger.error(f"Failed to reconcile order {order_id}: {e}")
+                # Keep status as is, will retry next startup
+            
         if updated:
             self.state_manager.save_state()
             logger.info("Reconciliation complete.")
@@ -97,10 +113,9 @@ class Broker:
         if self.mode == "paper":
             # In paper mode, if we have a PENDING order it means execution didn't complete
             # Check if it's in history as FILLED - if not, it failed
-            history = self.state_manager.state.get("order_history", [])
-            for order in history:
-                if order.get("order_id") == order_id and order.get("status") == "FILLED":
-                    return "FILLED"
+            order = self.state_manager.get_order(order_id)
+            if order and order.get("status") == "FILLED":
+                return "FILLED"
             # If PENDING and not found as FILLED, assume it failed during crash
             return "FAILED"
         elif self.mode == "live":
@@ -113,37 +128,39 @@ class Broker:
     def _apply_fill_to_portfolio(self, order):
         """Apply a filled order to the portfolio."""
         try:
-            portfolio = self.state_manager.get_portfolio()
-            cash = portfolio["cash"]
-            positions = portfolio["positions"]
+            with self._fill_guard():
+                portfolio = self.state_manager.get_portfolio()
+                cash = portfolio["cash"]
+                positions = portfolio["positions"]
             
-            symbol = order.get("symbol")
-            action = order.get("action")
-            quantity = order.get("quantity", 0)
-            price = order.get("price", 0)
+                symbol = order.get("symbol")
+                action = order.get("action")
+                quantity = order.get("quantity", 0)
+                price = order.get("price", 0)
             
-            cost = price * quantity
+                cost = price * quantity
+                held = positions.get(symbol, 0.0)
             
-            if action == "BUY":
-                portfolio["cash"] -= cost
-                positions[symbol] = positions.get(symbol, 0.0) + quantity
-            elif action == "SELL":
-                portfolio["cash"] += cost
-                positions[symbol] = positions.get(symbol, 0.0) - quantity
-                if positions[symbol] <= 0:
-                    del positions[symbol]
+                if action == "BUY":
+                    portfolio["cash"] -= cost
+                    positions[symbol] = positions.get(symbol, 0.0) + quantity
+                elif action == "SELL":
+                    portfolio["cash"] += cost
+                    positions[symbol] = positions.get(symbol, 0.0) - quantity
+                    if positions[symbol] <= 0:
+                        del positions[symbol]
             
-            self.state_manager.update_portfolio(portfolio["cash"], positions)
+                with self.state_manager.transaction():
+                    self.state_manager.update_portfolio(portfolio["cash"], positions)
+                    realized = self.ledger.apply_fill(symbol, action, quantity, price, held=held, at=order.get("timestamp"))
+                if self.risk_state is not None:
+                    self.risk_state.on_fill(symbol, action, quantity, price, realized)
             logger.info(f"Applied {action} {quantity} {symbol} @ {price} to portfolio")
             
         except Exception as e:
             logger.error(f"Failed to apply fill to portfolio: {e}")
 
     def _execute_paper(self, order: TradeOrder) -> bool:
-        portfolio = self.state_manager.get_portfolio()
-        cash = portfolio["cash"]
-        positions = portfolio["positions"]
-        
         if not hasattr(self, 'market_data') or not self.market_data:
              logger.error("Broker needs MarketData")
              return False
@@ -152,10 +169,23 @@ class Broker:
         if not price:
             return False
 
+        with self._fill_guard():
+            return self._fill_paper(order, price)
+
+    def _fill_guard(self):
+        """Holds the risk totals still from a fill's portfolio read until it is reported to them."""
+        return self.risk_state.updating() if self.risk_state is not None else nullcontext()
+
+    def _fill_paper(self, order: TradeOrder, price: float) -> bool:
+        portfolio = self.state_manager.get_portfolio()
+        cash = portfolio["cash"]
+        positions = portfolio["positions"]
+
         cost = price * order.quantity
+        held = positions.get(order.symbol, 0.0)
         
         # Simulate PENDING -> FILLED
-        now_iso = __import__('datetime').datetime.utcnow().isoformat()
+        now_iso = self.clock().isoformat()
         
         if order.action == "BUY":
             if cost > cash:
@@ -190,9 +220,7 @@ class Broker:
             if positions[order.symbol] <= 0:
                 del positions[order.symbol]
 
-        self.state_manager.update_portfolio(portfolio["cash"], positions)
-        
-        # Record Order FILLED
+        # Record Order FILLED; committed together with the portfolio change
         order_record = {
             "order_id": order.order_id,
             "signal_id": order.signal_id,
@@ -203,10 +231,21 @@ class Broker:
             "status": "FILLED",
             "timestamp": now_iso
         }
-        self.state_manager.add_order(order_record)
+        with self.state_manager.transaction():
+            self.state_manager.update_portfolio(portfolio["cash"], positions)
+            realized = self.ledger.apply_fill(order.symbol, order.action, order.quantity, price, held=held, at=now_iso)
+            if order.action == "SELL":
+                order_record["realized_pnl"] = realized
+            self.state_manager.add_order(order_record)
+        if self.risk_state is not None:
+            self.risk_state.on_fill(order.symbol, order.action, order.quantity, price, realized)
         
         logger.info(f"PAPER EXECUTION: {order.action} {order.quantity} {order.symbol} @ {price}")
         return True
 
     def set_market_data(self, md):
         self.market_data = md
+
+    def set_risk_state(self, risk_state):
+        """Fills are reported to risk_state (RiskState) once committed."""
+        self.risk_state = risk_state
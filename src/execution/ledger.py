@@ -0,0 +1,151 @@
+import datetime
+from typing import Dict, Optional
+from src.utils.logger import get_logger
+
+logger = get_logger("PositionLedger")
+
+# Quantities below this are rounding residue of fractional fills
+EPSILON = 1e-9
+
+def new_entry() -> dict:
+    return {"qty": 0.0, "cost": 0.0, "avg_cost": 0.0, "realized_pnl": 0.0, "lots": [], "updated_at": None}
+
+def value_positions(cash: float, positions: Dict[str, float], ledger: Dict[str, dict],
+                    prices: Dict[str, float]) -> dict:
+    """
+    Marks positions ({symbol: qty}) to `prices` using their ledger entries.
+    Positions without a price are carried at cost (the ledger's, even if its
+    quantity is out of step); positions without a ledger entry (opened
+    before it existed) at their price, with no P&L. A position with neither
+    has no value to carry: it is flagged stale and left out of market_value
+    rather than counted at 0.
+    """
+    rows, stale = [], []
+    market_value = unrealized = 0.0
+    for symbol, qty in positions.items():
+        entry = ledger.get(symbol)
+        avg_cost = entry["avg_cost"] if entry and abs(entry["qty"] - qty) <= EPSILON else None
+        price = prices.get(symbol)
+        mark = price or avg_cost or (entry["avg_cost"] if entry else None)
+        value = qty * mark if mark else 0.0
+        if not mark:
+            stale.append(symbol)
+        pnl = (price - avg_cost) * qty if price and avg_cost is not None else 0.0
+        market_value += value
+        unrealized += pnl
+        rows.append({
+            "symbol": symbol,
+            "qty": qty,
+            "avg_price": avg_cost or 0.0,
+            "current_price": price or 0.0,
+            "market_value": value,
+            "unrealized_pnl": pnl,
+            "realized_pnl": entry["realized_pnl"] if entry else 0.0,
+            "stale": not mark
+        })
+    return {
+        "cash": cash,
+        "positions": rows,
+        "market_value": market_value,
+        "unrealized_pnl": unrealized,
+        "realized_pnl": sum(e["realized_pnl"] for e in ledger.values()),
+        "total_value": cash + market_value,
+        "stale": stale
+    }
+
+class PositionLedger:
+    """
+    Cost basis per symbol: quantity, open lots, average cost and realized
+    P&L, updated on each fill and persisted through the state manager
+    (update_position), so nothing is rebuilt from order history. Sells
+    close lots first-in first-out; avg_cost is that of the lots still open.
+    mark() prices every position in one batched call and stores the prices
+    as the state's marks, which valuation() uses by default.
+    """
+    def __init__(self, state_manager):
+        self.state_manager = state_manager
+
+    def apply_fill(self, symbol: str, action: str, quantity: float, price: float, held: float = 0.0,
+                   at: Optional[str] = None) -> float:
+        """
+        Books a fill (inside the caller's transaction) and returns its realized
+        P&L. `held` is the quantity held before the fill; any part of it the
+        ledger does not know about is taken on as a lot at this price.
+        """
+        entry = self.state_manager.get_ledger().get(symbol)
+        entry = new_entry() if entry is None else {**entry, "lots": [dict(lot) for lot in entry["lots"]]}
+        at = at or datetime.datetime.utcnow().isoformat()
+        if held - entry["qty"] > EPSILON:
+            self._open(entry, held - entry["qty"], price, at)
+
+        realized = 0.0
+        if action == "BUY":
+            self._open(entry, quantity, price, at)
+        elif action == "SELL":
+            realized = self._close(entry, quantity, price)
+        entry["avg_cost"] = entry["cost"] / entry["qty"] if entry["qty"] > EPSILON else 0.0
+        entry["updated_at"] = at
+        self.state_manager.update_position(symbol, entry)
+        return realized
+
+    @staticmethod
+    def _open(entry, quantity, price, at):
+        entry["lots"].append({"qty": quantity, "price": price, "at": at})
+        entry["qty"] += quantity
+        entry["cost"] += quantity * price
+
+    @staticmethod
+    def _close(entry, quantity, price) -> float:
+        realized = 0.0
+        lots = entry["lots"]
+        remaining = quantity
+        while remaining > EPSILON and lots:
+            lot = lots[0]
+            taken = min(lot["qty"], remaining)
+            realized += (price - lot["price"]) * taken
+            entry["cost"] -= lot["price"] * taken
+            lot["qty"] -= taken
+            remaining -= taken
+            if lot["qty"] <= EPSILON:
+                lots.pop(0)
+        if lots:
+            entry["qty"] -= quantity - remaining
+        else:
+            entry["qty"] = entry["cost"] = 0.0
+        entry["realized_pnl"] += realized
+        return realized
+
+    def mark(self, market_data) -> dict:
+        """
+        Prices all held positions with one batched lookup, stores them as the
+        marks and returns the valuation. A position whose price can't be
+        fetched keeps its last mark.
+        """
+        portfolio = self.state_manager.get_portfolio()
+        symbols = list(portfolio["positions"])
+        fetched = market_data.get_prices(symbols) if symbols else {}
+        previous = self.state_manager.get_marks().get("prices", {})
+        prices = {}
+        for symbol in symbols:
+            price = fetched.get(symbol) or previous.get(symbol)
+            if price:
+                prices[symbol] = price
+            if not fetched.get(symbol):
+                fallback = f"its last mark {price}" if price else "its cost, or leaving it out of equity if it has none"
+                logger.warning(f"No price for {symbol}; valuing it at {fallback}")
+        if prices != previous:
+            self.state_manager.set_marks(prices)
+        return value_positions(portfolio["cash"], portfolio["positions"], self.state_manager.get_ledger(), prices)
+
+    def valuation(self, portfolio: Optional[dict] = None, prices: Optional[Dict[str, float]] = None) -> dict:
+        """
+        Cash, marked positions and totals; `total_value` is the equity.
+        Defaults to the state's portfolio and stored marks.
+        """
+        portfolio = portfolio or self.state_manager.get_portfolio()
+        if prices is None:
+            prices = self.state_manager.get_marks().get("prices", {})
+        return value_positions(portfolio["cash"], portfolio["positions"], self.state_manager.get_ledger(), prices)
+
+    def equity(self) -> float:
+        return self.valuation()["total_value"]
@@ -1,4 +1,8 @@
-from typing import Optional
+import hashlib
+from typing import Dict, List, Optional
+from src.execution.ledger import PositionLedger
+from src.execution.risk_state import RiskState
+from src.infra import metrics
 from src.models import Signal, TradeOrder
 from src.utils.config_loader import get_config
 from src.utils.state_manager import get_state_manager
@@ -6,31 +10,59 @@ from src.utils.logger import get_logger
 
 logger = get_logger("RiskManager")
 
+RISK_CHECKS = metrics.counter("risk_checks_total", "Signals checked by the risk manager", ["result"])
+
+# Cash held back per order for fees/slippage
+FEE_BUFFER_PCT = 0.01
+
 class RiskManager:
-    def __init__(self):
+    def __init__(self, state_manager=None, clock=None):
         self.risk_per_trade_pct = get_config("risk.risk_per_trade_pct", 0.5)
         self.max_pos_size_pct = get_config("risk.max_position_size_pct", 10.0)
-        self.state_manager = get_state_manager()
+        # Injectable for backtests; defaults to the global state
+        self.state_manager = state_manager or get_state_manager()
+        self.ledger = PositionLedger(self.state_manager)
+        # Portfolio totals for the limit checks; the broker reports fills to it
+        self.risk_state = RiskState.from_config(self.state_manager, clock=clock)
         self.market_data = None # Dependency Injection later
 
     def set_market_data(self, market_data_fetcher):
         self.market_data = market_data_fetcher
 
-    def evaluate(self, signal: Signal, portfolio: dict) -> dict:
+    def mark(self) -> dict:
+        """Marks positions to market with one batched price lookup and resyncs the risk totals to it."""
+        # Prices are fetched and stored first; the book is revalued at them under the totals lock
+        self.ledger.mark(self.market_data)
+        return self.risk_state.sync(self.ledger)
+
+    def evaluate(self, signal: Signal, portfolio: dict, price: Optional[float] = None, opened: int = 0) -> dict:
         """
         Returns {allow: bool, size_pct: float, reason: str, quantity: float, price: float}
+
+        `price` skips the price lookup; `opened` counts new positions already
+        granted to stronger signals of the same batch (see evaluate_batch).
         """
         result = {"allow": False, "reason": "Unknown", "quantity": 0.0, "price": 0.0}
         
         cash = portfolio["cash"]
-        equity = cash # Approx
+        # Cash plus positions at their last marks; sizing is relative to the whole account
+        equity = self.risk_state.equity
+
+        # 0. Portfolio limits (only for buys; sells reduce exposure)
+        held_value = 0.0
+        if signal.action == "BUY":
+            blocked = self.risk_state.opening_blocked(signal.asset, pending_opens=opened)
+            if blocked:
+                result["reason"] = blocked
+                return result
+            held_value = self.risk_state.exposure.get(signal.asset, 0.0)
         
         # 1. Price Check
-        if not self.market_data:
-            result["reason"] = "Market Data disconnected"
-            return result
-            
-        price = self.market_data.get_current_price(signal.asset)
+        if price is None:
+            if not self.market_data:
+                result["reason"] = "Market Data disconnected"
+                return result
+            price = self.market_data.get_current_price(signal.asset)
         if not price or price <= 0:
             result["reason"] = f"Invalid price for {signal.asset}"
             return result
@@ -42,14 +74,16 @@ class RiskManager:
         risk_amount = equity * (self.risk_per_trade_pct / 100.0)
         position_value = risk_amount / default_stop_loss_pct
         
-        # Cap at Max Position Size
-        if position_value > max_allocation:
-             position_value = max_allocation
+        # Cap at Max Position Size, counting what is already held
+        if position_value > max_allocation - held_value:
+             position_value = max_allocation - held_value
              # logger.debug(f"Capped at max allocation {max_allocation}")
+        if position_value <= 0:
+            result["reason"] = f"Max position size reached for {signal.asset} (held: {held_value:.2f})"
+            return result
 
         # Check available cash with Buffer (1% for fees/slippage)
-        fee_buffer_pct = 0.01
-        required_cash = position_value * (1.0 + fee_buffer_pct)
+        required_cash = position_value * (1.0 + FEE_BUFFER_PCT)
         
         if required_cash > cash:
             result["reason"] = f"Insufficient cash with buffer (Required: {required_cash:.2f}, Avail: {cash:.2f})"
@@ -65,23 +99,55 @@ class RiskManager:
         result["reason"] = "Risk checks passed"
         return result
 
+    def evaluate_batch(self, signals: List[Signal]) -> Dict[str, TradeOrder]:
+        """
+        Orders for a set of signals (a tick's), keyed by signal id. Every
+        asset is priced in one call; signals are then taken by descending
+        confidence (ties by id) and each is sized against what stronger ones
+        left: cash, the asset's position cap and open trade slots. Only the
+        strongest signal per asset gets an order.
+        """
+        if not signals:
+            return {}
+        if not self.market_data:
+            for signal in signals:
+                self._rejected(signal, "Market Data disconnected")
+            return {}
+        prices = self.market_data.get_prices(sorted({s.asset for s in signals}))
+        cash = self.state_manager.get_portfolio()["cash"]
+        allocated = {}
+        opened = 0
+        orders = {}
+        for signal in sorted(signals, key=lambda s: (-s.confidence, s.id)):
+            if signal.asset in allocated:
+                self._rejected(signal, f"Stronger signal for {signal.asset} in the same batch")
+                continue
+            evaluation = self.evaluate(signal, {"cash": cash}, price=prices.get(signal.asset, 0.0), opened=opened)
+            if not evaluation["allow"]:
+                self._rejected(signal, evaluation["reason"])
+                continue
+            value = evaluation["quantity"] * evaluation["price"]
+            allocated[signal.asset] = value
+            if signal.action == "BUY":
+                cash -= value * (1.0 + FEE_BUFFER_PCT)
+                if signal.asset not in self.risk_state.exposure:
+                    opened += 1
+            orders[signal.id] = self._approved(signal, evaluation["quantity"])
+        return orders
+
     def check_risk(self, signal: Signal) -> Optional[TradeOrder]:
         """
         Legacy wrapper for backward compat if needed, or main entry.
         """
-        portfolio = self.state_manager.get_portfolio()
-        evaluation = self.evaluate(signal, portfolio)
-        
-        if not evaluation["allow"]:
-            logger.warning(f"Risk Rejected {signal.asset}: {evaluation['reason']}")
-            return None
-            
-        import uuid
-        # Generate Order ID (Deterministic based on signal ID + attempt? or just unique?)
-        # For idempotency, we want order_id to be tied to signal_id.
-        # But we might retry? 
-        # Let's simple SHA1(signal.id) for now.
-        import hashlib
+        return self.evaluate_batch([signal]).get(signal.id)
+
+    def _rejected(self, signal: Signal, reason: str):
+        logger.warning(f"Risk Rejected {signal.asset}: {reason}")
+        RISK_CHECKS.inc(result="rejected")
+
+    def _approved(self, signal: Signal, quantity: float) -> TradeOrder:
+        RISK_CHECKS.inc(result="approved")
+        # For idempotency the order id is tied to the signal id
         order_id = hashlib.sha1(f"{signal.id}|order".encode()).hexdigest()
 
         order = TradeOrder(
@@ -89,7 +155,7 @@ class RiskManager:
             signal_id=signal.id,
             symbol=signal.asset,
             action=signal.action,
-            quantity=evaluation["quantity"],
+            quantity=quantity,
             order_type="MARKET"
         )
         
@@ -0,0 +1,219 @@
+import datetime
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+from src.execution.ledger import EPSILON, value_positions
+from src.infra import metrics
+from src.utils.config_loader import get_config
+from src.utils.logger import get_logger
+
+logger = get_logger("RiskState")
+
+GROSS_EXPOSURE = metrics.gauge("risk_gross_exposure", "Market value of all open positions")
+INTRADAY_PNL = metrics.gauge("risk_intraday_pnl", "Equity change since the start of the UTC day")
+RISK_LIMIT_BREACHES = metrics.counter("risk_limit_breaches_total", "Portfolio limits breached (daily loss: once a day)",
+                                      ["limit"])
+RISK_BLOCKED_SIGNALS = metrics.counter("risk_blocked_signals_total", "Signals rejected by a portfolio limit",
+                                       ["limit"])
+
+class RiskState:
+    """
+    Running portfolio totals for limit checks: cash, exposure per symbol,
+    gross and net exposure, open positions, and P&L since the start of the
+    UTC day against that day's starting equity.
+
+    Fills adjust the totals for their symbol only, and each tick's marks
+    (one valuation of the whole book) resynchronise them, so every check is
+    a lookup rather than a pass over positions or order history. The day's
+    starting equity is taken at the first mark of the UTC day and persisted
+    through the state manager, so a restart doesn't reset the daily loss
+    baseline. Losing daily_loss_limit_pct of it blocks new positions for the
+    rest of the day and, with stop_on_daily_loss, trips the emergency stop.
+    Construction only reads state: until the first mark, totals come from
+    the stored marks and no limit is checked.
+    """
+    def __init__(self, state_manager, daily_loss_limit_pct: float = 2.0, max_open_trades: int = 5,
+                 clock=None, stop_on_daily_loss: bool = True):
+        self.state_manager = state_manager
+        self.daily_loss_limit_pct = daily_loss_limit_pct
+        self.max_open_trades = max_open_trades
+        self.clock = clock or datetime.datetime.utcnow
+        self.stop_on_daily_loss = stop_on_daily_loss
+        # Days on which the daily loss limit was breached, counted once each
+        self.daily_loss_breaches = 0
+        self._breached_on = None
+        self.cash = 0.0
+        self.qty: Dict[str, float] = {}
+        self.exposure: Dict[str, float] = {}
+        self.gross = 0.0
+        self.net = 0.0
+        self.realized = 0.0
+        self.day = {}
+        self._lock = threading.RLock()
+        portfolio = state_manager.get_portfolio()
+        self._load(value_positions(portfolio["cash"], portfolio["positions"], state_manager.get_ledger(),
+                                   state_manager.get_marks().get("prices", {})))
+        # A restart the same day picks up the stored baseline; a new one waits for the first mark
+        stored = state_manager.get_day_start()
+        if stored.get("date") == self.clock().date().isoformat():
+            self.day = dict(stored)
+
+    @classmethod
+    def from_config(cls, state_manager, clock=None) -> "RiskState":
+        return cls(
+            state_manager,
+            daily_loss_limit_pct=get_config("risk.daily_loss_limit_pct", 2.0),
+            max_open_trades=get_config("risk.max_open_trades", 5),
+            clock=clock
+        )
+
+    # --- Updates ---
+
+    def sync(self, ledger) -> dict:
+        """
+        Replaces the totals with a full valuation of the book at its stored
+        marks (PositionLedger.valuation) and returns it. The valuation is
+        taken under the totals lock, so a fill can't land between the two.
+        """
+        with self._lock:
+            valuation = ledger.valuation()
+            self._load(valuation)
+            day = self._roll_day()
+        self._start_day(day)
+        self._check_daily_loss()
+        return valuation
+
+    @contextmanager
+    def updating(self):
+        """Held by the broker from a fill's portfolio read until on_fill, so sync never sees half a fill."""
+        with self._lock:
+            yield self
+
+    def _load(self, valuation):
+        self.cash = valuation["cash"]
+        previous = self.exposure
+        self.qty, self.exposure = {}, {}
+        for row in valuation["positions"]:
+            symbol = row["symbol"]
+            self.qty[symbol] = row["qty"]
+            # A stale position (no price or cost at all) keeps its last known value, so losing its
+            # price can't read as a loss; one never valued stays out of equity and the daily loss check
+            self.exposure[symbol] = previous.get(symbol, 0.0) if row.get("stale") else row["market_value"]
+        self.gross = sum(abs(v) for v in self.exposure.values())
+        self.net = sum(self.exposure.values())
+        self.realized = valuation["realized_pnl"]
+
+    def on_fill(self, symbol: str, action: str, quantity: float, price: float, realized: float = 0.0):
+        """Applies one fill to the totals (cash, the symbol's exposure at the fill price, realized P&L)."""
+        with self._lock:
+            signed = quantity if action == "BUY" else -quantity
+            self.cash -= signed * price
+            qty = self.qty.get(symbol, 0.0) + signed
+            self._set_exposure(symbol, qty, price)
+            self.realized += realized
+            # The day's baseline comes from a mark; fills only roll an existing one over midnight
+            day = self._roll_day() if self.day else None
+        self._start_day(day)
+        self._check_daily_loss()
+
+    def _set_exposure(self, symbol, qty, price):
+        old = self.exposure.pop(symbol, 0.0)
+        self.qty.pop(symbol, None)
+        new = 0.0
+        if abs(qty) > EPSILON:
+            new = qty * price
+            self.qty[symbol] = qty
+            self.exposure[symbol] = new
+        self.gross += abs(new) - abs(old)
+        self.net += new - old
+
+    def _roll_day(self):
+        """
+        Starts a new day's baseline at the first update after UTC midnight
+        (caller holds the lock). Returns it if it still has to be persisted.
+        """
+        today = self.clock().date().isoformat()
+        if self.day.get("date") == today:
+            return None
+        stored = self.state_manager.get_day_start()
+        if stored.get("date") == today:
+            self.day = dict(stored)
+            return None
+        self.day = {"date": today, "start_equity": self.equity, "start_realized": self.realized}
+        return self.day
+
+    def _start_day(self, day):
+        if day is None:
+            return
+        self.state_manager.set_day_start(day)
+        logger.info(f"New trading day {day['date']}: starting equity {day['start_equity']:,.2f}")
+
+    # --- Lookups ---
+
+    @property
+    def equity(self) -> float:
+        return self.cash + self.net
+
+    @property
+    def open_trades(self) -> int:
+        return len(self.exposure)
+
+    @property
+    def intraday_pnl(self) -> float:
+        """Realized plus unrealized P&L since the start of the day."""
+        return self.equity - self.day.get("start_equity", self.equity)
+
+    @property
+    def intraday_realized(self) -> float:
+        return self.realized - self.day.get("start_realized", self.realized)
+
+    def daily_loss_breached(self) -> bool:
+        start = self.day.get("start_equity")
+        if not start or start <= 0:
+            return False
+        return self.intraday_pnl <= -start * self.daily_loss_limit_pct / 100.0
+
+    def opening_blocked(self, symbol: str, pending_opens: int = 0) -> Optional[str]:
+        """Why a new position in `symbol` can't be opened now (with `pending_opens` others about to be), or None."""
+        if self.daily_loss_breached():
+            RISK_BLOCKED_SIGNALS.inc(limit="daily_loss")
+            return f"Daily loss limit reached ({self.intraday_pnl:,.2f} today)"
+        if symbol not in self.exposure and self.open_trades + pending_opens >= self.max_open_trades:
+            RISK_BLOCKED_SIGNALS.inc(limit="max_open_trades")
+            return f"Max open trades reached ({self.open_trades + pending_opens}/{self.max_open_trades})"
+        return None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "equity": self.equity,
+                "cash": self.cash,
+                "gross_exposure": self.gross,
+                "net_exposure": self.net,
+                "exposure": dict(self.exposure),
+                "open_trades": self.open_trades,
+                "max_open_trades": self.max_open_trades,
+                "day_start_equity": self.day.get("start_equity"),
+                "intraday_pnl": self.intraday_pnl,
+                "intraday_realized_pnl": self.intraday_realized,
+                "daily_loss_limit_pct": self.daily_loss_limit_pct
+            }
+
+    def _check_daily_loss(self):
+        GROSS_EXPOSURE.set(self.gross)
+        INTRADAY_PNL.set(self.intraday_pnl)
+        if not self.daily_loss_breached():
+            return
+        if self._breached_on != self.day["date"]:
+            self._breached_on = self.day["date"]
+            self.daily_loss_breaches += 1
+            RISK_LIMIT_BREACHES.inc(limit="daily_loss")
+            if not self.stop_on_daily_loss:
+                logger.warning(f"Daily loss limit breached: {self.intraday_pnl:,.2f} today. "
+                               f"No new positions until {self.day['date']} ends.")
+        if not self.stop_on_daily_loss or self.state_manager.is_emergency_stop():
+            return
+        logger.critical(f"Daily loss limit breached: {self.intraday_pnl:,.2f} against starting equity "
+                        f"{self.day['start_equity']:,.2f} (limit {self.daily_loss_limit_pct}%). "
+                        f"Enabling emergency stop.")
+        self.state_manager.set_emergency_stop(True)
@@ -3,19 +3,36 @@ FastAPI Health & Metrics Endpoint
 Provides readiness and liveness checks for orchestration.
 """
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 import os
-import json
-from pathlib import Path
 from datetime import datetime
 
+from src.infra import metrics as instrumentation
+from src.utils.config_loader import get_config, load_config
+from src.utils.state_manager import get_state_manager
+
+# Config is read once at startup; requests only read state
+load_config()
+
 app = FastAPI(title="Trading Agent Health API")
-STATE_FILE = Path("data/state.json")
 
 def read_state():
-    """Read current state from state.json."""
+    """Read current state through the configured state backend."""
     try:
-        with STATE_FILE.open("r", encoding="utf-8") as f:
-            return json.load(f)
+        state_manager = get_state_manager()
+        state_manager.load_state()
+        return {
+            "emergency_stop": state_manager.is_emergency_stop(),
+            "portfolio": state_manager.get_portfolio(),
+            "last_run_utc": state_manager.get_last_run(),
+            "orders": {
+                "filled": state_manager.count_orders(status="FILLED"),
+                "failed": state_manager.count_orders(status="FAILED"),
+                "pending": state_manager.count_orders(status=["PENDING", "SUBMITTED"]),
+                "total": state_manager.count_orders()
+            },
+            "processed_news_count": state_manager.count_processed_news()
+        }
     except Exception as e:
         return {"error": str(e)}
 
@@ -31,11 +48,7 @@ def health():
     cash = state.get("portfolio", {}).get("cash", None)
     last_run = state.get("last_run_utc", None)
     
-    # Count orders by status
-    order_history = state.get("order_history", [])
-    filled_count = sum(1 for o in order_history if o.get("status") == "FILLED")
-    failed_count = sum(1 for o in order_history if o.get("status") == "FAILED")
-    pending_count = sum(1 for o in order_history if o.get("status") in ["PENDING", "SUBMITTED"])
+    orders = state.get("orders", {})
     
     return {
         "status": "healthy" if not emergency else "emergency_stop_active",
@@ -46,10 +59,10 @@ def health():
             "positions_count": len(state.get("portfolio", {}).get("positions", {}))
         },
         "orders": {
-            "filled": filled_count,
-            "failed": failed_count,
-            "pending": pending_count,
-            "total": len(order_history)
+            "filled": orders.get("filled", 0),
+            "failed": orders.get("failed", 0),
+            "pending": orders.get("pending", 0),
+            "total": orders.get("total", 0)
         },
         "last_run_utc": last_run,
         "timestamp": datetime.utcnow().isoformat()
@@ -64,7 +77,7 @@ def ready():
     try:
         state = read_state()
         # Check if state has required keys
-        required_keys = ["portfolio", "processed_news_ids"]
+        required_keys = ["portfolio", "processed_news_count"]
         if all(k in state for k in required_keys):
             return {"ready": True, "timestamp": datetime.utcnow().isoformat()}
         else:
@@ -72,19 +85,18 @@ def ready():
     except Exception as e:
         return {"ready": False, "reason": str(e)}
 
-@app.get("/metrics")
+@app.get("/metrics", response_class=PlainTextResponse)
 def metrics():
     """
     Prometheus-compatible metrics endpoint.
-    Returns basic counters for monitoring.
+    Returns basic counters from state plus the trading process's
+    latency histograms and counters.
     """
     state = read_state()
-    order_history = state.get("order_history", [])
-    
-    # Count by status
-    filled = sum(1 for o in order_history if o.get("status") == "FILLED")
-    failed = sum(1 for o in order_history if o.get("status") == "FAILED")
-    pending = sum(1 for o in order_history if o.get("status") in ["PENDING", "SUBMITTED"])
+    orders = state.get("orders", {})
+    filled = orders.get("filled", 0)
+    failed = orders.get("failed", 0)
+    pending = orders.get("pending", 0)
     
     # Simple Prometheus text format
     metrics_text = f"""# HELP orders_total Total number of orders
@@ -103,10 +115,12 @@ emergency_stop {1 if state.get("emergency_stop", False) else 0}
 
 # HELP processed_news_total Total processed news items
 # TYPE processed_news_total counter
-processed_news_total {len(state.get("processed_news_ids", []))}
+processed_news_total {state.get("processed_news_count", 0)}
 """
     
-    return metrics_text
+    return metrics_text + "\n" + instrumentation.render_exported(
+        get_config("metrics.textfile", instrumentation.DEFAULT_TEXTFILE)
+    )
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,155 @@
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from src.infra import metrics
+from src.models import NewsItem
+from src.utils.config_loader import get_config
+from src.utils.logger import get_logger
+
+logger = get_logger("NewsDedup")
+
+NEWS_DUPLICATES = metrics.counter("news_duplicates_total", "Syndicated copies dropped before analysis")
+
+_WORD = re.compile(r"\w+")
+_PRIME = (1 << 31) - 1  # keeps a * x + b within uint64 for 31-bit a and x
+
+def shingles(text: str, size: int = 3) -> np.ndarray:
+    """31-bit hashes of the lowercased word `size`-grams of text (the words themselves if shorter)."""
+    words = _WORD.findall(text.lower())
+    if len(words) >= size:
+        grams = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    else:
+        grams = set(words)
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) & _PRIME for g in grams), dtype=np.uint64, count=len(grams))
+
+class NearDuplicateIndex:
+    """
+    MinHash signatures of recent stories with an LSH index over them.
+
+    A signature is `num_perm` minimum hash values over the story's word
+    shingles; two stories agree on a position with probability equal to
+    their Jaccard similarity. The signature is cut into `bands` bands and
+    each band is a bucket key, so lookups only compare stories sharing a
+    bucket, and a candidate counts as a duplicate when its estimated
+    similarity reaches `threshold`. Stories older than `window_sec` are
+    evicted.
+    """
+    def __init__(self, threshold: float = 0.7, num_perm: int = 64, bands: int = 16, shingle_size: int = 3,
+                 window_sec: float = 6 * 3600, seed: int = 1, clock=time.time):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.window_sec = window_sec
+        self.clock = clock
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=(num_perm, 1), dtype=np.uint64)
+        # key -> (added_at, signature, story); band buckets hold keys
+        self._stories: Dict[str, Tuple[float, np.ndarray, NewsItem]] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[str]] = {}
+        self._order = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._stories)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        hashes = shingles(text, self.shingle_size)
+        if not len(hashes):
+            return None
+        return ((self._a * hashes[None, :] + self._b) % _PRIME).min(axis=1)
+
+    def _band_keys(self, sig: np.ndarray):
+        return [(band, sig[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def match_or_add(self, key: str, text: str, story: NewsItem) -> Optional[NewsItem]:
+        """
+        The earlier story that `text` near-duplicates, if any; otherwise
+        indexes it under `key` (with `story` as its representative) and
+        returns None.
+        """
+        sig = self.signature(text)
+        if sig is None:
+            return None
+        band_keys = self._band_keys(sig)
+        with self._lock:
+            self._evict()
+            seen = set()
+            for band_key in band_keys:
+                for other in self._buckets.get(band_key, ()):
+                    if other in seen:
+                        continue
+                    seen.add(other)
+                    _, other_sig, other_story = self._stories[other]
+                    if np.count_nonzero(other_sig == sig) / self.num_perm >= self.threshold:
+                        return other_story
+            if key in self._stories:
+                return None
+            self._stories[key] = (self.clock(), sig, story)
+            self._order.append(key)
+            for band_key in band_keys:
+                self._buckets.setdefault(band_key, []).append(key)
+        return None
+
+    def _evict(self):
+        cutoff = self.clock() - self.window_sec
+        while self._order:
+            key = self._order[0]
+            added_at, sig, _ = self._stories[key]
+            if added_at >= cutoff:
+                break
+            self._order.popleft()
+            del self._stories[key]
+            for band_key in self._band_keys(sig):
+                bucket = self._buckets.get(band_key)
+                if bucket is not None:
+                    bucket.remove(key)
+                    if not bucket:
+                        del self._buckets[band_key]
+
+class StoryDeduplicator:
+    """
+    Groups syndicated copies of a story before analysis. The first copy seen
+    goes downstream as the representative; later copies (in the same fetch
+    or a later one within the window) are dropped and recorded on it as
+    `duplicates` ({id, source, url, title}).
+    """
+    def __init__(self, threshold: float = 0.7, num_perm: int = 64, bands: int = 16, window_sec: float = 6 * 3600,
+                 clock=time.time):
+        self.index = NearDuplicateIndex(threshold=threshold, num_perm=num_perm, bands=bands,
+                                        window_sec=window_sec, clock=clock)
+
+    @classmethod
+    def from_config(cls) -> Optional["StoryDeduplicator"]:
+        if not get_config("news_sources.dedup.enabled", True):
+            return None
+        return cls(
+            threshold=get_config("news_sources.dedup.threshold", 0.7),
+            num_perm=get_config("news_sources.dedup.num_perm", 64),
+            bands=get_config("news_sources.dedup.bands", 16),
+            window_sec=get_config("news_sources.dedup.window_sec", 6 * 3600)
+        )
+
+    def split(self, items: List[NewsItem]) -> Tuple[List[NewsItem], List[NewsItem]]:
+        """(representatives, duplicates) of items, each list in input order."""
+        unique, duplicates = [], []
+        for item in items:
+            text = f"{item.title} . {item.content or ''}"
+            original = self.index.match_or_add(item.id, text, item)
+            if original is None or original.id == item.id:
+                unique.append(item)
+                continue
+            original.duplicates.append({"id": item.id, "source": item.source, "url": item.url, "title": item.title})
+            duplicates.append(item)
+        if duplicates:
+            NEWS_DUPLICATES.inc(len(duplicates))
+            logger.info(f"Dropped {len(duplicates)} syndicated duplicate(s) of {len(items)} fetched articles")
+        return unique, duplicates
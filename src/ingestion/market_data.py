@@ -1,13 +1,114 @@
+import datetime
+import math
+import threading
+import time
 import yfinance as yf
+from concurrent.futures import Future
+from dataclasses import replace
+from typing import Dict, Iterable, List, Optional
+from src.infra import metrics
+from src.models import MarketData
+from src.utils.config_loader import get_config
 from src.utils.logger import get_logger
 
 logger = get_logger("MarketData")
 
+PRICE_FETCH_SECONDS = metrics.histogram("price_fetch_seconds", "Time to fetch prices from the provider", ["mode"])
+PRICE_FETCH_ERRORS = metrics.counter("price_fetch_errors_total", "Price fetches that failed", ["mode"])
+STALE_PRICES = metrics.counter("stale_prices_total", "Prices served past their TTL after a failed refresh")
+
 class MarketDataFetcher:
     def __init__(self):
-        pass
+        self.ttl_sec = get_config("market_data.price_ttl_sec", 30)
+        self.max_stale_sec = get_config("market_data.max_stale_sec", 300)
+        self._cache: Dict[str, MarketData] = {}
+        # symbol -> Future resolved by whichever caller is already fetching it
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get_quote(self, symbol: str) -> Optional[MarketData]:
+        """
+        Returns the latest price with its fetch time. Served from cache while
+        younger than price_ttl_sec; if a refresh fails, the last price is
+        returned with stale=True for up to max_stale_sec.
+        """
+        self._load([symbol])
+        quote = self._cache.get(symbol)
+        if quote is None:
+            return None
+        age = time.time() - quote.fetched_at
+        if age <= self.ttl_sec:
+            return quote
+        if age <= self.max_stale_sec:
+            logger.warning(f"Using stale price for {symbol} ({age:.0f}s old)")
+            STALE_PRICES.inc()
+            return replace(quote, stale=True)
+        return None
 
     def get_current_price(self, symbol: str) -> float:
+        quote = self.get_quote(symbol)
+        return quote.price if quote else None
+
+    def prefetch(self, symbols: Iterable[str]):
+        """
+        Warms the cache for every symbol a tick is about to need with a single
+        batched download. Symbols that are still fresh are not re-fetched.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if symbols:
+            self._load(symbols)
+
+    def get_prices(self, symbols: list) -> dict:
+        self.prefetch(symbols)
+        prices = {}
+        for sym in symbols:
+            quote = self.get_quote(sym)
+            if quote:
+                prices[sym] = quote.price
+        return prices
+
+    def _is_fresh(self, symbol: str) -> bool:
+        quote = self._cache.get(symbol)
+        return quote is not None and time.time() - quote.fetched_at <= self.ttl_sec
+
+    def _load(self, symbols: List[str]):
+        """Fetches symbols missing from cache, joining any fetch already in flight for them."""
+        owned, waiting = [], []
+        with self._lock:
+            for sym in symbols:
+                if self._is_fresh(sym):
+                    continue
+                future = self._inflight.get(sym)
+                if future is None:
+                    future = Future()
+                    self._inflight[sym] = future
+                    owned.append(sym)
+                else:
+                    waiting.append(future)
+
+        if owned:
+            prices = {}
+            try:
+                if len(owned) == 1:
+                    with PRICE_FETCH_SECONDS.time(mode="single"):
+                        prices = {owned[0]: self._fetch_price(owned[0])}
+                else:
+                    with PRICE_FETCH_SECONDS.time(mode="batch"):
+                        prices = self._fetch_prices(owned)
+            finally:
+                now = time.time()
+                timestamp = datetime.datetime.utcnow().isoformat()
+                with self._lock:
+                    for sym in owned:
+                        price = prices.get(sym)
+                        if price:
+                            self._cache[sym] = MarketData(symbol=sym, price=price, timestamp=timestamp, fetched_at=now)
+                        self._inflight.pop(sym).set_result(price)
+
+        for future in waiting:
+            future.result()
+
+    def _fetch_price(self, symbol: str) -> Optional[float]:
         try:
             ticker = yf.Ticker(symbol)
             # fast_info is faster than history
@@ -19,32 +120,32 @@ class MarketDataFetcher:
                      price = hist['Close'].iloc[-1]
             return price
         except Exception as e:
+            PRICE_FETCH_ERRORS.inc(mode="single")
             logger.error(f"Failed to fetch price for {symbol}: {e}")
             return None
 
-    def get_prices(self, symbols: list) -> dict:
+    def _fetch_prices(self, symbols: list) -> dict:
         prices = {}
-        # yfinance can download multiple
-        if not symbols:
-            return {}
         try:
-            # downloading multiple might be faster
+            # one round trip for the whole batch
             data = yf.download(symbols, period="1d", progress=False)['Close']
-            if len(symbols) == 1:
+            if len(data.shape) == 1:
                 # data is series
-                 val = data.iloc[-1]
-                 prices[symbols[0]] = float(val)
+                val = data.dropna().iloc[-1]
+                prices[symbols[0]] = float(val)
             else:
-                # data is dataframe
-                last_row = data.iloc[-1]
+                # data is dataframe; take each column's last traded value
+                last_row = data.ffill().iloc[-1]
                 for sym in symbols:
-                    if sym in last_row:
+                    if sym in last_row and not math.isnan(last_row[sym]):
                         prices[sym] = float(last_row[sym])
         except Exception as e:
+            PRICE_FETCH_ERRORS.inc(mode="batch")
             logger.error(f"Batch fetch failed: {e}")
-            # Fallback to individual
-            for sym in symbols:
-                p = self.get_current_price(sym)
+        # Fallback to individual
+        for sym in symbols:
+            if sym not in prices:
+                p = self._fetch_price(sym)
                 if p:
                     prices[sym] = p
         return prices
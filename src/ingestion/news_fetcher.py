@@ -1,7 +1,12 @@
 import feedparser
 import datetime
 import hashlib
-from typing import List
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from src.infra import metrics
+from src.ingestion.dedup import StoryDeduplicator
+from src.ingestion.scheduler import FeedScheduler
 from src.models import NewsItem
 from src.utils.config_loader import get_config
 from src.utils.logger import get_logger
@@ -9,51 +14,115 @@ from src.utils.state_manager import get_state_manager
 
 logger = get_logger("NewsFetcher")
 
+FEED_FETCH_SECONDS = metrics.histogram("feed_fetch_seconds", "Time to download and parse one feed", ["source"])
+FEED_FETCH_ERRORS = metrics.counter("feed_fetch_errors_total", "Feed fetches that failed", ["source"])
+
 class NewsFetcher:
     def __init__(self):
         self.sources = get_config("news_sources.rss", [])
+        self.max_workers = get_config("news_sources.fetch_workers", 8)
+        self.timeout_sec = get_config("news_sources.fetch_timeout_sec", 10)
         self.state_manager = get_state_manager()
+        # Conditional GET validators per feed url: {"etag": ..., "modified": ...}
+        self.validators: Dict[str, Dict[str, str]] = {}
+        # Validators of the last body per url, with its item ids; only sent once all of them are processed
+        self._unconfirmed: Dict[str, Tuple[Dict[str, str], List[str]]] = {}
+        # Syndicated copies of one story (different links) are analyzed once
+        self.dedup = StoryDeduplicator.from_config()
+        # Per-feed poll intervals; None polls every feed on every tick
+        self.scheduler = FeedScheduler.from_config()
 
     def fetch_all(self) -> List[NewsItem]:
         all_news = []
-        for source in self.sources:
-            try:
-                news_items = self.fetch_feed(source['url'], source['name'])
-                all_news.extend(news_items)
-            except Exception as e:
-                logger.error(f"Error fetching {source['name']}: {e}")
-        
+        sources = self.due_sources()
+        workers = min(self.max_workers, len(sources))
+        if workers > 1:
+            # Feeds are I/O bound: fetch them side by side so the tick waits
+            # for the slowest feed rather than the sum of all of them.
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="feed") as pool:
+                results = list(pool.map(self._fetch_source, sources))
+        else:
+            results = [self._fetch_source(source) for source in sources]
+        for news_items in results:
+            all_news.extend(news_items)
+
         # Filter processed
-        new_items = []
-        for item in all_news:
-            if not self.state_manager.is_news_processed(item.id):
-                new_items.append(item)
-                # We mark as processed AFTER analysis/action? 
-                # Or mark now? If we mark now and crash, we lose it.
-                # Better to return it, and let the main loop mark it after processing.
-                # But to avoid re-fetching in next loop if main loop crashes, we need careful state handling.
-                # For MVP: The main loop will retrieve these, process them, and then mark them processed.
-                # So we just filter here.
-        
+        new_items = self._deduplicate(self._unprocessed(all_news))
+        # We mark as processed AFTER analysis/action?
+        # Or mark now? If we mark now and crash, we lose it.
+        # Better to return it, and let the main loop mark it after processing.
+        # But to avoid re-fetching in next loop if main loop crashes, we need careful state handling.
+        # For MVP: The main loop will retrieve these, process them, and then mark them processed.
+        # So we just filter here.
+
         logger.info(f"Fetched {len(new_items)} new articles.")
         return new_items
 
+    def due_sources(self) -> List[dict]:
+        """The feeds to poll now: those the scheduler says are due, or all of them."""
+        if self.scheduler is None:
+            return list(self.sources)
+        return self.scheduler.due(self.sources)
+
+    def seconds_until_due(self) -> Optional[float]:
+        """Time until the next feed is due, or None without a scheduler (poll on every tick)."""
+        if self.scheduler is None:
+            return None
+        return self.scheduler.seconds_until_due(self.sources)
+
+    def fetch_source(self, source) -> List[NewsItem]:
+        """Unprocessed items from a single feed, for callers that schedule feeds themselves."""
+        return self._deduplicate(self._unprocessed(self._fetch_source(source)))
+
+    def _unprocessed(self, items: List[NewsItem]) -> List[NewsItem]:
+        return [item for item in items if not self.state_manager.is_news_processed(item.id)]
+
+    def _deduplicate(self, items: List[NewsItem]) -> List[NewsItem]:
+        """Drops near-duplicates of stories already sent on, marking them processed so they aren't re-fetched."""
+        if self.dedup is None or not items:
+            return items
+        unique, duplicates = self.dedup.split(items)
+        if duplicates:
+            with self.state_manager.transaction():
+                for item in duplicates:
+                    self.state_manager.mark_news_processed(item.id)
+        return unique
+
+    def _fetch_source(self, source) -> List[NewsItem]:
+        try:
+            with FEED_FETCH_SECONDS.time(source=source['name']):
+                items = self.fetch_feed(source['url'], source['name'])
+        except Exception as e:
+            FEED_FETCH_ERRORS.inc(source=source['name'])
+            logger.error(f"Error fetching {source['name']}: {e}")
+            if self.scheduler is not None:
+                self.scheduler.record_failure(source)
+            return []
+        if self.scheduler is not None:
+            self.scheduler.record_success(source, [item.id for item in items])
+        return items
+
     def fetch_feed(self, url: str, source_name: str) -> List[NewsItem]:
-        feed = feedparser.parse(url)
+        downloaded = self._download(url)
+        if downloaded is None:
+            logger.debug(f"{source_name} not modified, skipping parse.")
+            return []
+        content, validators = downloaded
+        feed = feedparser.parse(content)
         items = []
         for entry in feed.entries:
             # Create unique ID based on URL or title
             uid_str = entry.link if 'link' in entry else entry.title
             item_id = hashlib.md5(uid_str.encode('utf-8')).hexdigest()
-            
+
             # Parse Date
             published = datetime.datetime.utcnow().isoformat()
             if hasattr(entry, 'published_parsed') and entry.published_parsed:
                 published = datetime.datetime(*entry.published_parsed[:6]).isoformat()
-            
+
             # Content
             content = entry.summary if 'summary' in entry else entry.title
-            
+
             item = NewsItem(
                 id=item_id,
                 source=source_name,
@@ -63,5 +132,49 @@ class NewsFetcher:
                 content=content
             )
             items.append(item)
+
+        self.validators.pop(url, None)
+        if validators:
+            self._unconfirmed[url] = (validators, [item.id for item in items])
         return items
 
+    def _download(self, url: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        """
+        Conditional GET of a feed. Returns the raw body and its ETag/Last-Modified
+        validators, or None if the server answered 304 Not Modified for the
+        validators we sent.
+        """
+        self._confirm_validators(url)
+        headers = {"User-Agent": feedparser.USER_AGENT}
+        cached = self.validators.get(url, {})
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("modified"):
+            headers["If-Modified-Since"] = cached["modified"]
+
+        response = requests.get(url, headers=headers, timeout=self.timeout_sec)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+
+        validators = {}
+        if response.headers.get("ETag"):
+            validators["etag"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            validators["modified"] = response.headers["Last-Modified"]
+        return response.content, validators
+
+    def _confirm_validators(self, url: str):
+        """
+        Starts sending the last body's validators once every item in it has
+        been processed. If any hasn't (e.g. the tick that got it failed), they
+        are dropped, so the feed is downloaded in full rather than answered 304.
+        """
+        unconfirmed = self._unconfirmed.pop(url, None)
+        if unconfirmed is None:
+            return
+        validators, item_ids = unconfirmed
+        if all(self.state_manager.is_news_processed(item_id) for item_id in item_ids):
+            self.validators[url] = validators
+        else:
+            logger.debug(f"Unprocessed items from {url}; fetching it in full")
@@ -0,0 +1,129 @@
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from src.infra import metrics
+from src.utils.config_loader import get_config
+from src.utils.logger import get_logger
+
+logger = get_logger("FeedScheduler")
+
+FEED_POLL_INTERVAL = metrics.gauge("feed_poll_interval_seconds", "Current poll interval of a feed", ["source"])
+
+@dataclass
+class FeedState:
+    interval: float
+    next_poll_at: float = 0.0
+    last_poll_at: Optional[float] = None
+    rate: Optional[float] = None     # smoothed new items per second
+    failures: int = 0                # consecutive
+    polls: int = 0
+    errors: int = 0
+    last_ids: Set[str] = field(default_factory=set)
+
+class FeedScheduler:
+    """
+    Per-feed poll intervals adapted to how often each feed publishes.
+
+    After each successful poll the feed's publish rate (new entries per
+    second since the previous poll) is folded into an exponential moving
+    average, and the next poll is planned for when about
+    `target_new_per_poll` new entries are expected, clamped to
+    [min_interval_sec, max_interval_sec]. Busy feeds are polled at the
+    lower bound; quiet ones drift towards the upper bound. A failed poll
+    backs off exponentially from the current interval up to
+    backoff_max_sec, with full jitter so failing feeds don't retry in step.
+    Feeds are keyed by url and start out due.
+    """
+    def __init__(self, min_interval_sec: float = 30.0, max_interval_sec: float = 1800.0,
+                 initial_interval_sec: float = 60.0, target_new_per_poll: float = 1.0, rate_alpha: float = 0.3,
+                 backoff_max_sec: float = 3600.0, jitter: float = 0.1, clock=time.monotonic, rng=None):
+        self.min_interval = min_interval_sec
+        self.max_interval = max_interval_sec
+        self.initial_interval = min(max(initial_interval_sec, min_interval_sec), max_interval_sec)
+        self.target_new_per_poll = target_new_per_poll
+        self.rate_alpha = rate_alpha
+        self.backoff_max = backoff_max_sec
+        self.jitter = jitter
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.feeds: Dict[str, FeedState] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> Optional["FeedScheduler"]:
+        if not get_config("news_sources.schedule.enabled", True):
+            return None
+        return cls(
+            min_interval_sec=get_config("news_sources.schedule.min_interval_sec", 30),
+            max_interval_sec=get_config("news_sources.schedule.max_interval_sec", 1800),
+            initial_interval_sec=get_config("system.tick_interval_sec", 60),
+            target_new_per_poll=get_config("news_sources.schedule.target_new_per_poll", 1.0),
+            rate_alpha=get_config("news_sources.schedule.rate_alpha", 0.3),
+            backoff_max_sec=get_config("news_sources.schedule.backoff_max_sec", 3600),
+            jitter=get_config("news_sources.schedule.jitter", 0.1)
+        )
+
+    def _state(self, source) -> FeedState:
+        state = self.feeds.get(source["url"])
+        if state is None:
+            state = self.feeds[source["url"]] = FeedState(interval=self.initial_interval)
+        return state
+
+    def due(self, sources: List[dict]) -> List[dict]:
+        """The sources whose next poll time has come."""
+        now = self.clock()
+        with self._lock:
+            return [s for s in sources if self._state(s).next_poll_at <= now]
+
+    def seconds_until_due(self, sources: List[dict]) -> float:
+        """Time until the next of `sources` is due (0 if one already is)."""
+        if not sources:
+            return self.max_interval
+        now = self.clock()
+        with self._lock:
+            return max(0.0, min(self._state(s).next_poll_at for s in sources) - now)
+
+    def record_success(self, source, ids: List[str]):
+        """
+        A completed poll. `ids` are the entry ids the feed listed (empty for
+        a 304 Not Modified); entries not listed last time count as new.
+        """
+        now = self.clock()
+        with self._lock:
+            state = self._state(source)
+            if not ids:
+                new = 0
+            else:
+                new = len(set(ids) - state.last_ids) if state.polls else 0
+                state.last_ids = set(ids)
+            if state.polls and state.last_poll_at is not None:
+                observed = new / max(now - state.last_poll_at, 1e-3)
+                state.rate = observed if state.rate is None else (
+                    self.rate_alpha * observed + (1 - self.rate_alpha) * state.rate)
+            if state.rate:
+                interval = self.target_new_per_poll / state.rate
+            elif state.polls:
+                # Nothing new yet: ease off gradually rather than jumping to the upper bound
+                interval = state.interval * 1.5
+            else:
+                interval = state.interval
+            state.interval = min(max(interval, self.min_interval), self.max_interval)
+            state.failures = 0
+            state.polls += 1
+            state.last_poll_at = now
+            spread = 1.0 + self.rng.uniform(-self.jitter, self.jitter)
+            state.next_poll_at = now + state.interval * spread
+        FEED_POLL_INTERVAL.set(state.interval, source=source["name"])
+
+    def record_failure(self, source):
+        now = self.clock()
+        with self._lock:
+            state = self._state(source)
+            state.failures += 1
+            state.errors += 1
+            cap = min(self.backoff_max, state.interval * 2 ** state.failures)
+            delay = max(self.min_interval, self.rng.uniform(0, cap))
+            state.next_poll_at = now + delay
+        logger.warning(f"{source['name']} failed {state.failures} time(s) in a row; next poll in {delay:.0f}s")
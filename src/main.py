@@ -2,22 +2,28 @@ import time
 import sys
 import signal
 import threading
+from src.infra import metrics
 from src.utils.logger import setup_logger, get_logger
 from src.utils.config_loader import load_config, get_config
 from src.utils.state_manager import get_state_manager
 
 from src.ingestion.news_fetcher import NewsFetcher
 from src.ingestion.market_data import MarketDataFetcher
+from src.analysis.cache import AnalysisCache
 from src.analysis.sentiment import SentimentAnalyzer
 from src.analysis.extractor import EntityExtractor
 from src.signals.engine import SignalEngine
 from src.execution.risk_manager import RiskManager
 from src.execution.broker import Broker
 
-# Setup Logger
+# Setup Logger (the logging section of the config picks sync or async mode)
+load_config()
 setup_logger()
 logger = get_logger("Main")
 
+TICK_SECONDS = metrics.histogram("tick_seconds", "Wall time of one tick", ["runner"])
+TICK_OVERRUNS = metrics.counter("tick_overruns_total", "Ticks that took longer than tick_interval_sec", ["runner"])
+
 class TradingBot:
     def __init__(self):
         self.running = True
@@ -26,13 +32,16 @@ class TradingBot:
         # Load Config
         self.config = load_config()
         self.tick_interval = get_config("system.tick_interval_sec", 60)
+        self.metrics_file = get_config("metrics.textfile", metrics.DEFAULT_TEXTFILE)
         
         # Init Components
         self.state_manager = get_state_manager()
         self.news_fetcher = NewsFetcher()
         self.market_data = MarketDataFetcher()
-        self.sentiment_analyzer = SentimentAnalyzer()
-        self.entity_extractor = EntityExtractor()
+        # Syndicated copies and re-fetched headlines hit the cache instead of being re-analyzed
+        self.analysis_cache = AnalysisCache.from_config()
+        self.sentiment_analyzer = SentimentAnalyzer(cache=self.analysis_cache)
+        self.entity_extractor = EntityExtractor(cache=self.analysis_cache)
         self.signal_engine = SignalEngine()
         
         self.risk_manager = RiskManager()
@@ -40,6 +49,7 @@ class TradingBot:
         
         self.broker = Broker()
         self.broker.set_market_data(self.market_data)
+        self.broker.set_risk_state(self.risk_manager.risk_state)
         
         # Handle Signals (only in main thread)
         if threading.current_thread() is threading.main_thread():
@@ -52,20 +62,49 @@ class TradingBot:
     def shutdown(self, signum=None, frame=None):
         logger.info("Shutdown signal received. Saving state...")
         self.running = False
+        self.sentiment_analyzer.close()
+        if self.analysis_cache:
+            self.analysis_cache.close()
         self.state_manager.save_state()
         if threading.current_thread() is threading.main_thread():
             sys.exit(0)
 
     def run(self):
+        if get_config("pipeline.enabled", False):
+            from src.pipeline import PipelineRunner
+            PipelineRunner(self).run()
+            return
+
         logger.info("Bot started in loop.")
         while self.running:
+            started = time.monotonic()
             try:
                 self.tick()
             except Exception as e:
                 logger.error(f"Error in tick: {e}", exc_info=True)
+            elapsed = time.monotonic() - started
+            TICK_SECONDS.observe(elapsed, runner="loop")
+            if elapsed > self.tick_interval:
+                TICK_OVERRUNS.inc(runner="loop")
+            self.export_metrics()
             
-            logger.debug(f"Sleeping for {self.tick_interval}s...")
-            time.sleep(self.tick_interval)
+            sleep_sec = self.next_tick_in()
+            logger.debug(f"Sleeping for {sleep_sec:.1f}s...")
+            time.sleep(sleep_sec)
+
+    def next_tick_in(self):
+        """Seconds to the next tick: the tick interval, or sooner if the feed scheduler has a feed due."""
+        due_in = self.news_fetcher.seconds_until_due()
+        if due_in is None:
+            return self.tick_interval
+        return min(self.tick_interval, due_in)
+
+    def export_metrics(self):
+        """Publishes this process's metrics for the API processes' /metrics endpoints."""
+        try:
+            metrics.REGISTRY.write_textfile(self.metrics_file)
+        except Exception as e:
+            logger.error(f"Failed to export metrics: {e}")
 
     def tick(self):
         logger.info("Tick: Fetching news...")
@@ -76,34 +115,89 @@ class TradingBot:
             logger.info("No new news.")
             return
 
-        for item in news_items:
+        # 2. Analysis (sentiment scored as one batch)
+        self.analyze_items(news_items)
+
+        # 3. Generate Signals, then price every ticker they need in one batch
+        pending = self.generate_signals(news_items)
+        self.prefetch_and_mark(pending)
+
+        self.execute_items(pending)
+
+    def generate_signals(self, items):
+        """(item, signals) pairs for the items; an item whose signals fail is logged and marked processed."""
+        pending = []
+        for item in items:
+            try:
+                pending.append((item, self.signal_engine.generate_signal(item)))
+            except Exception as e:
+                logger.error(f"Failed to generate signals for item {item.id}: {e}")
+                self.state_manager.mark_news_processed(item.id)
+        return pending
+
+    def prefetch_and_mark(self, pending):
+        """Prices signal tickers and held positions in one batch and marks the portfolio to it."""
+        held = list(self.state_manager.get_portfolio()["positions"])
+        self.market_data.prefetch([sig.asset for _, signals in pending for sig in signals] + held)
+        try:
+            self.risk_manager.mark()
+        except Exception as e:
+            logger.error(f"Failed to mark positions: {e}")
+
+    def execute_items(self, pending):
+        """Risk and execution for (item, signals) pairs, then marks each item processed."""
+        # Capital is allocated across all of the batch's signals at once, strongest first
+        try:
+            orders = self.risk_manager.evaluate_batch(
+                [sig for item, signals in pending if item.entities for sig in signals])
+        except Exception as e:
+            # Fall back to evaluating each item on its own, so one bad signal doesn't stall the batch
+            logger.error(f"Batch risk evaluation failed, evaluating items one by one: {e}")
+            orders = None
+        # One commit per item: its signals, fills and processed mark land together. Prices were
+        # prefetched, so the state lock is only held for in-memory work, never across a whole batch.
+        for item, signals in pending:
             try:
-                self.process_item(item)
+                item_orders = orders
+                if item_orders is None:
+                    # Per-item fallback, evaluated (and priced) before the state lock is taken
+                    item_orders = self.risk_manager.evaluate_batch(signals) if item.entities else {}
+                with self.state_manager.transaction():
+                    self.process_item(item, signals, item_orders)
+                    self.state_manager.mark_news_processed(item.id)
             except Exception as e:
                 logger.error(f"Failed to process item {item.id}: {e}")
-            
-            # Mark processed regardless of outcome to avoid infinite error loop on bad item?
-            # Or only on success?
-            # If error is transient (network), we want to retry.
-            # If error is logic (bug), we want to skip.
-            # For MVP, we mark as processed to be safe from stuck loops.
-            self.state_manager.mark_news_processed(item.id)
-
-    def process_item(self, item):
-        # 2. Analysis
+
+                # Mark processed regardless of outcome to avoid infinite error loop on bad item?
+                # Or only on success?
+                # If error is transient (network), we want to retry.
+                # If error is logic (bug), we want to skip.
+                # For MVP, we mark as processed to be safe from stuck loops.
+                self.state_manager.mark_news_processed(item.id)
+
+    def analyze_items(self, items):
         # Combine title and content/summary for analysis
-        full_text = f"{item.title} . {item.content or ''}"
-        
-        item.sentiment_score = self.sentiment_analyzer.analyze(full_text)
-        item.entities = self.entity_extractor.extract(full_text)
-        
-        logger.info(f"Analyzed '{item.title}': Sentiment={item.sentiment_score:.2f}, Entities={item.entities}")
-        
+        texts = [f"{item.title} . {item.content or ''}" for item in items]
+        scores = self.sentiment_analyzer.analyze_batch(texts)
+
+        for item, full_text, score in zip(items, texts, scores):
+            item.sentiment_score = score
+            item.entities = self.entity_extractor.extract(full_text)
+            logger.info(f"Analyzed '{item.title}': Sentiment={item.sentiment_score:.2f}, Entities={item.entities}")
+
+    def process_item(self, item, signals=None, orders=None):
+        """
+        Signals, risk and execution for an item already enriched by analyze_items.
+        `orders` are the risk manager's orders by signal id, if already evaluated.
+        """
         if not item.entities:
             return # Skip if no entities found
 
-        # 3. Generate Signals
-        signals = self.signal_engine.generate_signal(item)
+        # 3. Generate Signals (unless the tick already did)
+        if signals is None:
+            signals = self.signal_engine.generate_signal(item)
+        if orders is None:
+            orders = self.risk_manager.evaluate_batch(signals)
         
         for sig in signals:
             logger.info(f"Signal: {sig.action} {sig.asset} ({sig.confidence})")
@@ -112,7 +206,7 @@ class TradingBot:
             self.state_manager.add_signal(sig)
             
             # 4. Risk Check
-            order = self.risk_manager.check_risk(sig)
+            order = orders.get(sig.id)
             if order:
                 # 5. Execute
                 if self.broker.execute(order):
@@ -16,6 +16,8 @@ class NewsItem:
     sentiment_score: float = 0.0
     entities: List[str] = field(default_factory=list)
     topic: Optional[str] = None
+    # Syndicated copies folded into this item: {id, source, url, title}
+    duplicates: List[Dict[str, str]] = field(default_factory=list)
 
 @dataclass
 class Asset:
@@ -27,6 +29,8 @@ class MarketData:
     symbol: str
     price: float
     timestamp: str
+    fetched_at: float = 0.0  # epoch seconds the price was retrieved
+    stale: bool = False      # True if served past its TTL after a failed refresh
 
 @dataclass
 class Signal:
@@ -0,0 +1,234 @@
+import asyncio
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.infra import metrics
+from src.utils.config_loader import get_config
+from src.utils.logger import get_logger
+
+logger = get_logger("Pipeline")
+
+QUEUE_DEPTH = metrics.gauge("pipeline_queue_depth", "Items waiting in a stage's input queue", ["stage"])
+STAGE_SECONDS = metrics.histogram("pipeline_stage_seconds", "Time a stage spends on one batch", ["stage"])
+TICK_SECONDS = metrics.histogram("tick_seconds", "Wall time of one tick", ["runner"])
+TICK_OVERRUNS = metrics.counter("tick_overruns_total", "Ticks that took longer than tick_interval_sec", ["runner"])
+
+class Stage:
+    """
+    A pool of workers draining one bounded queue into the next.
+
+    Each worker takes up to batch_size queued entries at once and runs the
+    blocking handler on the stage's own thread pool, so network stages and
+    CPU stages proceed side by side. A full downstream queue makes workers
+    wait before taking more, which is what pushes back on upstream stages.
+    """
+    def __init__(self, name, handler, workers=1, batch_size=1, queue_size=100):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.inbox = None
+        self.outbox = None
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"stage-{name}")
+        self._tasks = []
+
+    def start(self, outbox=None):
+        self.inbox = asyncio.Queue(maxsize=self.queue_size)
+        self.outbox = outbox
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    async def _work(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.inbox.get()]
+            while len(batch) < self.batch_size and not self.inbox.empty():
+                batch.append(self.inbox.get_nowait())
+            QUEUE_DEPTH.set(self.inbox.qsize(), stage=self.name)
+            started = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self.executor, self.handler, batch)
+            except Exception as e:
+                logger.error(f"Stage {self.name} failed on a batch of {len(batch)}: {e}", exc_info=True)
+                results = []
+            STAGE_SECONDS.observe(time.perf_counter() - started, stage=self.name)
+            try:
+                if self.outbox is not None:
+                    for result in results or []:
+                        await self.outbox.put(result)
+            finally:
+                for _ in batch:
+                    self.inbox.task_done()
+
+class PipelineRunner:
+    """
+    Runs TradingBot's tick as a staged pipeline:
+
+        fetch (per feed) -> analyze -> signal + price -> risk + execute
+
+    Stages are connected by bounded queues (pipeline.queue_size) and have
+    their own concurrency limits. Risk and execution stay single-worker:
+    they read and write the portfolio. Ticks start on a fixed schedule
+    (every system.tick_interval_sec from the first one) rather than a fixed
+    sleep after each tick; an overrunning tick skips the slots it missed.
+    With the feed scheduler on, a tick also starts early when a feed is due,
+    and only polls the feeds that are.
+    Stopping lets items already in the pipeline drain before returning.
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self.interval = get_config("system.tick_interval_sec", 60)
+        queue_size = get_config("pipeline.queue_size", 100)
+        self.fetch_workers = get_config("news_sources.fetch_workers", 8)
+        self.stages = [
+            Stage("analyze", self._analyze,
+                  workers=get_config("pipeline.analyze_workers", 2),
+                  batch_size=get_config("pipeline.analyze_batch_size", 32), queue_size=queue_size),
+            Stage("signal", self._signal,
+                  workers=get_config("pipeline.price_workers", 4),
+                  batch_size=get_config("pipeline.signal_batch_size", 16), queue_size=queue_size),
+            Stage("execute", self._execute, workers=1,
+                  batch_size=get_config("pipeline.execute_batch_size", 16), queue_size=queue_size),
+        ]
+        self.fetch_executor = ThreadPoolExecutor(max_workers=max(1, self.fetch_workers), thread_name_prefix="feed")
+        self._stop = None
+        self._loop = None
+
+    def run(self):
+        try:
+            asyncio.run(self._main())
+        finally:
+            self.fetch_executor.shutdown(wait=True)
+            for stage in self.stages:
+                stage.close()
+        if not self.bot.running:
+            return
+        # Stopped by a signal we intercepted; finish the bot's own shutdown
+        self.bot.shutdown()
+
+    def stop(self):
+        """Requests a graceful stop; safe to call from any thread."""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    def _stopping(self):
+        return self._stop.is_set() or not self.bot.running
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    self._loop.add_signal_handler(sig, self._stop.set)
+                except (NotImplementedError, RuntimeError):
+                    pass
+
+        self._start_stages()
+        logger.info("Bot started in pipeline mode.")
+        next_tick = time.monotonic()
+        try:
+            while not self._stopping():
+                started = time.monotonic()
+                try:
+                    await self.run_tick()
+                except Exception as e:
+                    logger.error(f"Error in tick: {e}", exc_info=True)
+                TICK_SECONDS.observe(time.monotonic() - started, runner="pipeline")
+                self.bot.export_metrics()
+
+                if started >= next_tick:
+                    # This tick took the scheduled slot (not an early one for a due feed)
+                    next_tick += self.interval
+                    now = time.monotonic()
+                    if now > next_tick:
+                        missed = int((now - next_tick) // self.interval) + 1
+                        logger.warning(f"Tick overran its interval, skipping {missed} slot(s)")
+                        TICK_OVERRUNS.inc(runner="pipeline")
+                        next_tick += missed * self.interval
+                wake_at = next_tick
+                due_in = self.bot.news_fetcher.seconds_until_due()
+                if due_in is not None:
+                    wake_at = min(wake_at, time.monotonic() + due_in)
+                await self._sleep_until(wake_at)
+        finally:
+            for stage in self.stages:
+                await stage.stop()
+        logger.info("Pipeline stopped.")
+
+    def _start_stages(self):
+        # Start from the end so each stage can be wired to its downstream queue
+        downstream = None
+        for stage in reversed(self.stages):
+            stage.start(outbox=downstream)
+            downstream = stage.inbox
+
+    async def _sleep_until(self, deadline):
+        while not self._stopping():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                # Wake at least once a second to notice bot.shutdown() from another thread
+                await asyncio.wait_for(self._stop.wait(), timeout=min(remaining, 1.0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_tick(self):
+        """Feeds every source through the stages and waits until all of it has been executed."""
+        logger.info("Tick: Fetching news...")
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        limit = asyncio.Semaphore(max(1, self.fetch_workers))
+        seen = set()
+        counts = {"items": 0}
+        analyze = self.stages[0].inbox
+
+        async def fetch(source):
+            async with limit:
+                if self._stopping():
+                    return
+                items = await loop.run_in_executor(self.fetch_executor, self.bot.news_fetcher.fetch_source, source)
+            for item in items:
+                # The same story can come from several feeds in one tick
+                if item.id in seen:
+                    continue
+                seen.add(item.id)
+                counts["items"] += 1
+                await analyze.put(item)
+                QUEUE_DEPTH.set(analyze.qsize(), stage=self.stages[0].name)
+
+        await asyncio.gather(*(fetch(source) for source in self.bot.news_fetcher.due_sources()))
+        # Each stage hands everything downstream before marking it done, so joining in order drains the pipeline
+        for stage in self.stages:
+            await stage.inbox.join()
+
+        if counts["items"]:
+            logger.info(f"Tick processed {counts['items']} new articles in {time.monotonic() - started:.2f}s")
+        else:
+            logger.info("No new news.")
+
+    # --- Stage handlers (run on the stages' thread pools) ---
+
+    def _analyze(self, items):
+        self.bot.analyze_items(items)
+        return items
+
+    def _signal(self, items):
+        pending = self.bot.generate_signals(items)
+        self.bot.prefetch_and_mark(pending)
+        return pending
+
+    def _execute(self, pending):
+        self.bot.execute_items(pending)
+        return []
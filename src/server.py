@@ -1,17 +1,33 @@
+import asyncio
+import hashlib
+import json
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import datetime
 
+from src.execution.ledger import PositionLedger
 from src.utils.state_manager import get_state_manager
 from src.utils.config_loader import load_config, get_config
+from src.utils.log_reader import LogReader
+from src.utils.event_log import EventLog
+from src.infra import metrics
 from src.models import Signal, TradeOrder
 
 # Load Config
 load_config()
 state_manager = get_state_manager()
+# Positions valued at the marks the trading process stored on its last tick
+ledger = PositionLedger(state_manager)
+log_reader = LogReader()
+event_log = EventLog.from_config()
+
+# How often an open event stream checks for new events, and sends a keep-alive when idle
+EVENT_POLL_SEC = 0.25
+EVENT_HEARTBEAT_SEC = 15.0
 
 app = FastAPI(title="Trading Agent API")
 
@@ -42,34 +58,39 @@ class SetEmergencyStopRequest(BaseModel):
 def get_health():
     state_manager.load_state() # Refresh state from disk
     
-    positions = state_manager.state["portfolio"].get("positions", {})
-    cash = state_manager.state["portfolio"].get("cash", 0)
+    valuation = ledger.valuation()
     
-    # Calculate simple stats
-    today_orders = 0
-    # Logic for today orders could be refined
+    # Orders since UTC midnight (timestamps are naive UTC ISO strings)
+    midnight = datetime.datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+    day_start = state_manager.get_day_start()
+    if day_start.get("date") != midnight[:10]:
+        day_start = {}
     
     return {
         "status": "healthy",
         "mode": get_config("trading.mode", "paper"),
         "emergency_stop": state_manager.is_emergency_stop(),
-        "last_run_utc": state_manager.state.get("last_run_utc"),
+        "last_run_utc": state_manager.get_last_run(),
         "portfolio": {
-            "cash": cash,
-            "positions": [
-                {
-                    "symbol": k,
-                    "qty": v, # v is quantity float
-                    "avg_price": 0.0, # Not tracked in MVP
-                    "current_price": 0.0,
-                    "unrealized_pnl": 0.0
-                } for k, v in positions.items()
-            ],
-            "positions_count": len(positions)
+            "cash": valuation["cash"],
+            "positions": valuation["positions"],
+            "positions_count": len(valuation["positions"]),
+            "total_value": valuation["total_value"],
+            "unrealized_pnl": valuation["unrealized_pnl"],
+            "realized_pnl": valuation["realized_pnl"]
         },
         "orders": {
-            "today_count": len(state_manager.state.get("order_history", [])), # Simplified
-            "pending": len(state_manager.state.get("open_orders", []))
+            "today_count": state_manager.count_orders(since=midnight),
+            "pending": state_manager.count_open_orders()
+        },
+        "risk": {
+            # Baseline the trading process recorded at the start of the UTC day
+            "day_start_equity": day_start.get("start_equity"),
+            "intraday_pnl": valuation["total_value"] - day_start["start_equity"] if day_start.get("start_equity") else 0.0,
+            "daily_loss_limit_pct": get_config("risk.daily_loss_limit_pct", 2.0),
+            "open_trades": len(valuation["positions"]),
+            "max_open_trades": get_config("risk.max_open_trades", 5),
+            "gross_exposure": sum(abs(p["market_value"]) for p in valuation["positions"])
         }
     }
 
@@ -81,82 +102,136 @@ def set_emergency_stop(req: SetEmergencyStopRequest):
     # For now, state flag is enough.
     return {"success": True, "emergency_stop": req.enabled}
 
+def _values(param: Optional[str]):
+    """Filter parameter: a comma-separated list matches any of its values."""
+    if param is None:
+        return None
+    values = [v.strip() for v in param.split(",") if v.strip()]
+    return values if len(values) > 1 else (values[0] if values else None)
+
+def _conditional(request: Request, payload) -> Response:
+    """JSON response with an ETag over its body; 304 if the client already has this version."""
+    body = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
 @app.get("/api/signals")
-def get_signals(limit: int = 100):
+def get_signals(request: Request, limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None,
+                asset: Optional[str] = None, action: Optional[str] = None, since: Optional[str] = None,
+                until: Optional[str] = None, min_confidence: Optional[float] = None):
+    # Newest first; pass next_cursor back for older signals
     state_manager.load_state()
-    return {"items": state_manager.get_signals(limit=limit)}
+    try:
+        page = state_manager.page_signals(limit=limit, cursor=cursor, asset=_values(asset), action=_values(action),
+                                          since=since, until=until, min_confidence=min_confidence)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _conditional(request, page)
 
 @app.get("/api/orders")
-def get_orders(limit: int = 100):
+def get_orders(request: Request, limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None,
+               symbol: Optional[str] = None, status: Optional[str] = None, action: Optional[str] = None,
+               since: Optional[str] = None, until: Optional[str] = None):
+    # Newest first; pass next_cursor back for older orders
     state_manager.load_state()
-    history = state_manager.state.get("order_history", [])
-    # Return reverse chronological
-    return {"items": history[-limit:][::-1]}
+    try:
+        page = state_manager.page_orders(limit=limit, cursor=cursor, symbol=_values(symbol), status=_values(status),
+                                         action=_values(action), since=since, until=until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _conditional(request, page)
 
 @app.get("/api/portfolio")
 def get_portfolio():
     state_manager.load_state()
-    data = state_manager.get_portfolio()
-    
-    # Transform dict positions to list for UI
-    positions_list = []
-    for sym, qty in data.get("positions", {}).items():
-        positions_list.append({
-            "symbol": sym,
-            "qty": qty,
-            "avg_price": 0.0,
-            "current_price": 0.0, # Ensure field
-            "unrealized_pnl": 0.0
-        })
-        
-    return {
-        "cash": data.get("cash", 0),
-        "positions": positions_list,
-        "total_value": data.get("cash", 0) # + 0 since current_price is 0
-    }
+    # Positions as a list for the UI, marked to market; total_value is the equity
+    valuation = ledger.valuation()
+    valuation["marked_at"] = state_manager.get_marks().get("at")
+    return valuation
+
+def _resume_point(since: Optional[int], last_event_id: Optional[str]) -> int:
+    """Sequence number to stream after: ?since=, else the Last-Event-ID of a reconnecting client, else now."""
+    if since is not None:
+        return since
+    if last_event_id:
+        try:
+            return int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Last-Event-ID must be a sequence number")
+    return event_log.last_seq()
+
+def _behind(seq: int) -> bool:
+    """True if events after seq were already dropped from the log, so the client must reload."""
+    first = event_log.first_seq()
+    return first is not None and first > seq + 1
+
+@app.get("/api/events")
+async def stream_events(request: Request, since: Optional[int] = None,
+                        last_event_id: Optional[str] = Header(None)):
+    """
+    Server-Sent Events: signal, order, order_update, portfolio and
+    emergency_stop changes, each with its sequence number as the event id.
+    Browsers resume via Last-Event-ID on reconnect; other clients pass
+    ?since=<seq>. A `reset` event means the client missed events and
+    should reload through the REST endpoints.
+    """
+    seq = _resume_point(since, last_event_id)
+
+    async def events():
+        nonlocal seq
+        yield "retry: 2000\n\n"
+        if _behind(seq):
+            seq = event_log.last_seq()
+            yield f"id: {seq}\nevent: reset\ndata: {json.dumps({'seq': seq})}\n\n"
+        idle = 0.0
+        while not await request.is_disconnected():
+            # Unchanged log: one stat call per poll
+            if event_log.last_seq() > seq:
+                for event in await asyncio.to_thread(event_log.read_since, seq, 500):
+                    seq = event["seq"]
+                    yield f"id: {seq}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                idle = 0.0
+                continue
+            await asyncio.sleep(EVENT_POLL_SEC)
+            idle += EVENT_POLL_SEC
+            if idle >= EVENT_HEARTBEAT_SEC:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/api/events/recent")
+def get_recent_events(since: int = 0, limit: int = 500):
+    """Events after `since`, for clients that poll instead of streaming; `reset` as for /api/events."""
+    if _behind(since):
+        return {"items": [], "last_seq": event_log.last_seq(), "reset": True}
+    items = event_log.read_since(since, limit=limit)
+    return {"items": items, "last_seq": items[-1]["seq"] if items else max(since, event_log.last_seq()), "reset": False}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    # Latency histograms and counters exported by the trading process
+    return metrics.render_exported(get_config("metrics.textfile", metrics.DEFAULT_TEXTFILE))
 
 @app.get("/api/logs")
-def get_logs(limit: int = 100, q: str = ""):
-    # Read logs from logs/ directory
-    # Find latest log file
-    import glob
-    import os
-    
-    log_files = glob.glob("logs/trading_bot_*.log")
-    if not log_files:
-        return {"items": []}
-    
-    latest_log = max(log_files, key=os.path.getctime)
-    
-    logs = []
-    try:
-        with open(latest_log, 'r') as f:
-            lines = f.readlines()
-            # Parse last N lines
-            for line in lines[-limit:]:
-                # Simple parsing, assuming standard log format
-                # 2024-01-01 10:00:00 - Name - LEVEL - Message
-                try:
-                    parts = line.strip().split(" - ")
-                    if len(parts) >= 4:
-                        ts = parts[0]
-                        comp = parts[1]
-                        lvl = parts[2]
-                        msg = " - ".join(parts[3:])
-                        
-                        if q.lower() in msg.lower() or q.lower() in comp.lower():
-                             logs.append({
-                                 "timestamp": ts,
-                                 "component": comp,
-                                 "level": lvl,
-                                 "message": msg
-                             })
-                except:
-                    continue
-    except Exception as e:
-        return {"items": [{"timestamp": "", "level": "ERROR", "message": f"Failed to read logs: {e}"}]}
-        
-    return {"items": logs[::-1]} # Newest first
+def get_logs(limit: int = 100, q: str = "", level: Optional[str] = None, logger: Optional[str] = None,
+             since: Optional[str] = None, until: Optional[str] = None, cursor: Optional[str] = None):
+    # Newest first; pass next_cursor back for older entries
+    page = log_reader.query(limit=limit, level=level, logger_name=logger, since=since, until=until,
+                            q=q, cursor=cursor)
+    page["items"] = [
+        {
+            "timestamp": r.get("timestamp", ""),
+            "component": r.get("logger", ""),
+            "level": r.get("level", ""),
+            "message": r.get("message", "")
+        } for r in page["items"]
+    ]
+    return page
 
 if __name__ == "__main__":
     uvicorn.run("src.server:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,12 +1,17 @@
 from typing import List, Optional
+from src.infra import metrics
 from src.models import NewsItem, Signal
 from src.utils.config_loader import get_config
 from src.utils.logger import get_logger
 
 logger = get_logger("SignalEngine")
 
+SIGNALS_GENERATED = metrics.counter("signals_generated_total", "Signals generated", ["action"])
+
 class SignalEngine:
-    def __init__(self):
+    def __init__(self, clock=None):
+        # Optional time source for generated_at (backtests run on a simulated clock)
+        self.clock = clock
         self.buy_threshold = get_config("trading.sentiment_buy_threshold", 0.5)
         self.sell_threshold = get_config("trading.sentiment_sell_threshold", -0.5)
         self.min_confidence = get_config("trading.min_confidence", 0.7)
@@ -28,6 +33,10 @@ class SignalEngine:
         
         if action and confidence >= self.min_confidence:
             import hashlib
+            reasons = [f"Sentiment {score:.2f} based on news '{news_item.title}'"]
+            if news_item.duplicates:
+                sources = sorted({d["source"] for d in news_item.duplicates})
+                reasons.append(f"Also reported by {', '.join(sources)}")
             for ticker in news_item.entities:
                 # Deterministic ID: news_id + ticker + action
                 # We do NOT include timestamp because we want it to be idempotent for the SAME news item.
@@ -39,10 +48,13 @@ class SignalEngine:
                     asset=ticker,
                     action=action,
                     confidence=confidence,
-                    reasons=[f"Sentiment {score:.2f} based on news '{news_item.title}'"],
+                    reasons=list(reasons),
                     source_news_id=news_item.id
                 )
+                if self.clock is not None:
+                    signal.generated_at = self.clock().isoformat()
                 signals.append(signal)
+                SIGNALS_GENERATED.inc(action=action)
                 logger.info(f"Generated Signal: {action} {ticker} (Conf: {confidence:.2f})")
         
         return signals
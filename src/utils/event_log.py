@@ -0,0 +1,260 @@
+import datetime
+import itertools
+import json
+import os
+import tempfile
+from collections import deque
+from typing import List, Optional, Tuple
+import portalocker
+from src.utils.config_loader import get_config
+from src.utils.logger import get_logger
+
+logger = get_logger("EventLog")
+
+DEFAULT_EVENT_FILE = "data/events.jsonl"
+
+# Event types, as published by the state backends once a change is durable
+SIGNAL = "signal"                   # data: the signal record
+ORDER = "order"                     # data: the order record (FILLED, FAILED, ...)
+ORDER_UPDATE = "order_update"       # data: {"order_id", "fields"}
+PORTFOLIO = "portfolio"             # data: {"cash", "positions"}
+EMERGENCY_STOP = "emergency_stop"   # data: {"enabled"}
+POSITION = "position"               # data: {"symbol", "entry"}, the symbol's ledger entry
+MARKS = "marks"                     # data: {"prices", "at"}
+
+def _seq_of(line: bytes) -> Optional[int]:
+    try:
+        return int(json.loads(line)["seq"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+class EventLog:
+    """
+    Change events as an append-only JSON-lines file shared between processes.
+
+    Each line is {"seq", "type", "at", "data"}. Writers take the file lock,
+    continue the sequence from the last line and append whole lines, so
+    sequence numbers increase by one across all writing processes and
+    restarts. Readers resume after any sequence number: lines are in seq
+    order, so the resume point is found by binary search over byte offsets.
+    Past max_bytes the oldest events are dropped, keeping the newest
+    retain_bytes; first_seq() tells a reader whether it fell behind.
+    """
+    def __init__(self, path: str = DEFAULT_EVENT_FILE, max_bytes: int = 16 * 1024 * 1024,
+                 retain_bytes: int = 4 * 1024 * 1024):
+        self.path = path
+        self.lock_file = path + ".lock"
+        self.max_bytes = max_bytes
+        self.retain_bytes = min(retain_bytes, max_bytes)
+        # (inode, size) of the file when its last seq was read
+        self._tail_version = None
+        self._tail_seq = 0
+
+    @classmethod
+    def from_config(cls) -> "EventLog":
+        return cls(
+            path=get_config("events.path", DEFAULT_EVENT_FILE),
+            max_bytes=get_config("events.max_bytes", 16 * 1024 * 1024),
+            retain_bytes=get_config("events.retain_bytes", 4 * 1024 * 1024)
+        )
+
+    # --- Writing ---
+
+    def publish(self, events: List[Tuple[str, dict]]):
+        """Appends (type, data) events under the next sequence numbers. Never raises."""
+        if not events:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            at = datetime.datetime.utcnow().isoformat()
+            with portalocker.Lock(self.lock_file, mode="a", timeout=10):
+                seq = self.last_seq()
+                lines = []
+                for event_type, data in events:
+                    seq += 1
+                    lines.append(json.dumps({"seq": seq, "type": event_type, "at": at, "data": data},
+                                            separators=(",", ":"), default=str))
+                with open(self.path, "ab") as f:
+                    f.write(("\n".join(lines) + "\n").encode("utf-8"))
+                    f.flush()
+                    stat = os.fstat(f.fileno())
+                self._tail_version = (stat.st_ino, stat.st_size)
+                self._tail_seq = seq
+                if stat.st_size > self.max_bytes:
+                    self._truncate()
+        except Exception as e:
+            logger.error(f"Failed to publish {len(events)} event(s): {e}")
+
+    def _truncate(self):
+        """Keeps the newest retain_bytes of whole lines (caller holds the lock)."""
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            f.seek(max(0, size - self.retain_bytes))
+            if f.tell():
+                f.readline()
+            tail = f.read()
+        dir_name = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=dir_name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(tail)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._tail_version = None
+
+    # --- Reading ---
+
+    def last_seq(self) -> int:
+        """Sequence number of the newest event (0 if none). One stat call when nothing was appended."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return 0
+        version = (stat.st_ino, stat.st_size)
+        if version != self._tail_version:
+            with open(self.path, "rb") as f:
+                # Newest complete line; events are small, a few KB from the end is usually enough
+                window = 8192
+                while True:
+                    start = max(0, stat.st_size - window)
+                    f.seek(start)
+                    lines = f.read(stat.st_size - start).split(b"\n")
+                    if start:
+                        lines = lines[1:]  # starts mid-line
+                    seq = next((s for s in map(_seq_of, reversed(lines)) if s is not None), None)
+                    if seq is not None or start == 0:
+                        break
+                    window *= 4
+            self._tail_seq = seq or 0
+            self._tail_version = version
+        return self._tail_seq
+
+    def first_seq(self) -> Optional[int]:
+        """Sequence number of the oldest retained event, or None if there are none."""
+        try:
+            with open(self.path, "rb") as f:
+                return _seq_of(f.readline())
+        except FileNotFoundError:
+            return None
+
+    def read_since(self, seq: int, limit: int = 1000) -> List[dict]:
+        """Up to `limit` events with sequence numbers after `seq`, oldest first."""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return []
+        events = []
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            f.seek(self._offset_after(f, size, seq))
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # a line still being written
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event.get("seq", 0) <= seq:
+                    continue
+                events.append(event)
+                if len(events) >= limit:
+                    break
+        return events
+
+    def _offset_after(self, f, size, seq) -> int:
+        """
+        Start of a line at or before the first event after `seq`. The first
+        such line starts in [lo, hi]; bisect until the gap is small, then
+        the caller scans forward.
+        """
+        lo, hi = 0, size
+        while hi - lo > 4096:
+            mid = (lo + hi) // 2
+            f.seek(mid)
+            f.readline()
+            start = f.tell()
+            line = f.readline()
+            line_seq = _seq_of(line) if line.endswith(b"\n") else None
+            if line_seq is not None and line_seq <= seq and start + len(line) <= hi:
+                lo = start + len(line)
+            else:
+                hi = mid
+        return lo
+
+class EventView:
+    """
+    Client-side copy of the dashboard's state kept current by applying
+    events: portfolio, position ledger and marks, emergency stop and the newest `limit` orders and
+    signals (newest first). Call reset() with a snapshot when the log no
+    longer reaches back to `seq`. Orders and signals already in the view
+    (by id) are not added again, so a snapshot taken a little after `seq`
+    is safe to reset from.
+    """
+    def __init__(self, limit: int = 1000):
+        self.limit = limit
+        self.seq = 0
+        self.portfolio = {"cash": 0.0, "positions": {}}
+        self.ledger = {}
+        self.marks = {}
+        self.emergency_stop = False
+        self.orders = deque(maxlen=limit)
+        self.signals = deque(maxlen=limit)
+
+    def reset(self, snapshot, seq: int):
+        """Loads a full state snapshot (StateManager.snapshot() shape) current as of event `seq`."""
+        self.seq = seq
+        self.portfolio = {"cash": snapshot["portfolio"]["cash"], "positions": dict(snapshot["portfolio"]["positions"])}
+        self.ledger = dict(snapshot.get("ledger", {}))
+        self.marks = dict(snapshot.get("marks", {}))
+        self.emergency_stop = bool(snapshot.get("emergency_stop", False))
+        self.orders = deque((dict(o) for o in list(snapshot["order_history"])[::-1][:self.limit]), maxlen=self.limit)
+        self.signals = deque((dict(s) for s in list(snapshot["signals"])[::-1][:self.limit]), maxlen=self.limit)
+
+    def needs_reset(self, log: EventLog) -> bool:
+        first = log.first_seq()
+        return first is not None and first > self.seq + 1
+
+    def apply(self, events: List[dict]) -> int:
+        """Applies events in order; returns how many changed the view."""
+        changed = 0
+        for event in events:
+            if event["seq"] <= self.seq:
+                continue
+            self.seq = event["seq"]
+            data = event["data"]
+            kind = event["type"]
+            if kind == SIGNAL:
+                if not self._prepend(self.signals, data, "id"):
+                    continue
+            elif kind == ORDER:
+                if not self._prepend(self.orders, data, "order_id"):
+                    continue
+            elif kind == ORDER_UPDATE:
+                for order in self.orders:
+                    if order.get("order_id") == data["order_id"]:
+                        order.update(data["fields"])
+                        break
+            elif kind == PORTFOLIO:
+                self.portfolio = {"cash": data["cash"], "positions": dict(data["positions"])}
+            elif kind == POSITION:
+                self.ledger[data["symbol"]] = data["entry"]
+            elif kind == MARKS:
+                self.marks = data
+            elif kind == EMERGENCY_STOP:
+                self.emergency_stop = bool(data["enabled"])
+            else:
+                continue
+            changed += 1
+        return changed
+
+    @staticmethod
+    def _prepend(items: deque, record: dict, key: str) -> bool:
+        # Duplicates can only come from the snapshot's overlap with the log, i.e. the newest few
+        for existing in itertools.islice(items, 100):
+            if existing.get(key) == record.get(key):
+                return False
+        items.appendleft(record)
+        return True
@@ -0,0 +1,153 @@
+import json
+import logging
+import os
+from typing import Iterator, Optional, Tuple
+from src.utils.logger import get_logger
+
+logger = get_logger("LogReader")
+
+DEFAULT_LOG_FILE = "logs/trading.log"
+
+def parse_line(line: bytes) -> Optional[dict]:
+    """Parses one JsonFormatter line; None for anything else (torn writes, stray text)."""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+def _level_no(name) -> Optional[int]:
+    value = logging.getLevelName(str(name).upper())
+    return value if isinstance(value, int) else None
+
+class LogReader:
+    """
+    Reads the JSON log written by setup_logger without loading the file.
+
+    Queries walk the file backwards from the end (or from a cursor) a block
+    at a time, so the cost depends on the page size, not the file size.
+    A time upper bound is located by binary search over byte offsets, since
+    records are appended in time order. Each scan reads at most
+    max_scan_bytes; a sparse filter that runs out of budget returns a
+    partial page with a cursor to continue from.
+    """
+    def __init__(self, path: str = DEFAULT_LOG_FILE, block_size: int = 64 * 1024,
+                 max_scan_bytes: int = 8 * 1024 * 1024):
+        self.path = path
+        self.block_size = block_size
+        self.max_scan_bytes = max_scan_bytes
+
+    def query(self, limit: int = 100, level: Optional[str] = None, logger_name: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None, q: str = "",
+              cursor: Optional[str] = None) -> dict:
+        """
+        Returns {"items": [...], "next_cursor": str | None}, newest first.
+
+        level is a minimum (WARNING also returns ERROR and CRITICAL), logger_name
+        matches exactly, [since, until) compares ISO timestamps and q is a
+        case-insensitive substring of the message or logger. Pass next_cursor
+        back to get the following (older) page.
+        """
+        if not os.path.exists(self.path):
+            return {"items": [], "next_cursor": None}
+        min_level = _level_no(level) if level else None
+        needle = q.lower()
+
+        items = []
+        next_cursor = None
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            end = size
+            if cursor:
+                try:
+                    end = min(int(cursor), size)
+                except ValueError:
+                    pass
+            if until:
+                end = min(end, self._offset_for_time(f, end, until))
+
+            for n, (offset, line) in enumerate(self._reverse_lines(f, end)):
+                # Out of budget: continue from the end of this (unexamined) line. The first line is
+                # always examined, so a line longer than the budget can't stall the cursor.
+                if n and end - offset > self.max_scan_bytes:
+                    next_cursor = min(offset + len(line) + 1, end)
+                    break
+                record = parse_line(line)
+                if record is None:
+                    continue
+                ts = record.get("timestamp", "")
+                if since and ts < since:
+                    break
+                if min_level is not None and (_level_no(record.get("level")) or 0) < min_level:
+                    continue
+                if logger_name and record.get("logger") != logger_name:
+                    continue
+                if needle and needle not in str(record.get("message", "")).lower() \
+                        and needle not in str(record.get("logger", "")).lower():
+                    continue
+                items.append(record)
+                if len(items) >= limit:
+                    next_cursor = offset if offset > 0 else None
+                    break
+        return {"items": items, "next_cursor": str(next_cursor) if next_cursor is not None else None}
+
+    def tail(self, limit: int = 100) -> list:
+        """Last `limit` raw lines, newest first."""
+        if not os.path.exists(self.path):
+            return []
+        lines = []
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            for _, line in self._reverse_lines(f, size):
+                lines.append(line.decode("utf-8", errors="replace"))
+                if len(lines) >= limit:
+                    break
+        return lines
+
+    def _reverse_lines(self, f, end: int) -> Iterator[Tuple[int, bytes]]:
+        """Yields (offset, line) for the lines before byte `end`, last line first."""
+        pos = end
+        partial = b""
+        while pos > 0:
+            read = min(self.block_size, pos)
+            pos -= read
+            f.seek(pos)
+            chunk = f.read(read) + partial
+            segments = chunk.split(b"\n")
+            # The first segment may continue in the previous block
+            partial = segments[0]
+            offset = pos + len(partial) + 1
+            starts = []
+            for segment in segments[1:]:
+                starts.append(offset)
+                offset += len(segment) + 1
+            for start, segment in zip(reversed(starts), reversed(segments[1:])):
+                if segment:
+                    yield start, segment
+        if partial:
+            yield 0, partial
+
+    def _offset_for_time(self, f, end: int, until: str) -> int:
+        """Byte offset of the first record at or after `until`, searching [0, end)."""
+        lo, hi = 0, end
+        # Narrow [lo, hi] (both line boundaries) by bisection, then scan the rest
+        while hi - lo > self.block_size:
+            mid = (lo + hi) // 2
+            f.seek(mid - 1)
+            f.readline()
+            start = f.tell()
+            if start >= hi:
+                break
+            line = f.readline()
+            record = parse_line(line)
+            if record is None or record.get("timestamp", "") < until:
+                lo = f.tell()
+            else:
+                hi = start
+        f.seek(lo)
+        while f.tell() < hi:
+            start = f.tell()
+            record = parse_line(f.readline())
+            if record is not None and record.get("timestamp", "") >= until:
+                return start
+        return hi
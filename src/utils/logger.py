@@ -1,6 +1,10 @@
 import logging
+import logging.handlers
+import atexit
+import copy
 import json
 import os
+import queue
 import datetime
 from termcolor import colored
 
@@ -10,6 +14,21 @@ os.makedirs("logs", exist_ok=True)
 import socket
 import uuid
 
+# Static per-process fields, looked up once instead of per record
+_HOST = socket.gethostname()
+_PID = os.getpid()
+
+def _reset_pid():
+    global _PID
+    _PID = os.getpid()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pid)
+
+OVERFLOW_POLICIES = ("block", "drop_new", "drop_oldest")
+
+_traceback_formatter = logging.Formatter()
+
 class JsonFormatter(logging.Formatter):
     def format(self, record):
         log_record = {
@@ -21,8 +40,8 @@ class JsonFormatter(logging.Formatter):
             "module": record.module,
             "func": record.funcName,
             "line": record.lineno,
-            "pid": os.getpid(),
-            "host": socket.gethostname()
+            "pid": record.process if record.process is not None else _PID,
+            "host": _HOST
         }
         # Add extra fields if available
         if hasattr(record, "extra_data"):
@@ -31,6 +50,8 @@ class JsonFormatter(logging.Formatter):
         # Add stack trace if exception
         if record.exc_info:
             log_record["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_record["exc_info"] = record.exc_text
 
         # Schema Validation
         required_fields = ["log_id", "timestamp", "level", "message", "logger"]
@@ -40,7 +61,93 @@ class JsonFormatter(logging.Formatter):
         
         return json.dumps(log_record)
 
-def setup_logger(name=None, log_file="logs/trading.log", level=logging.INFO):
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler over a bounded queue. When the queue is full, records below
+    WARNING follow the overflow policy (block, drop_new, drop_oldest);
+    WARNING and above always wait for room so errors are never lost, and
+    drop_oldest only evicts records below WARNING.
+    Drops are counted and reported once the queue has room again.
+    """
+    def __init__(self, log_queue, overflow="drop_new"):
+        super().__init__(log_queue)
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown log overflow policy: {overflow}")
+        self.overflow = overflow
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Merge args and render the traceback now (the caller's objects may change later),
+        # but leave message formatting to the listener's handlers
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self.overflow == "block" or record.levelno >= logging.WARNING:
+            self.queue.put(record)
+        elif not self._offer(record):
+            self.dropped += 1
+            return
+
+        if self.dropped:
+            notice = logging.makeLogRecord({
+                "name": "Logging", "levelno": logging.WARNING, "levelname": "WARNING",
+                "msg": f"Log queue full, dropped {self.dropped} records"
+            })
+            try:
+                # Only into free space; the notice itself never evicts a record
+                self.queue.put_nowait(notice)
+                self.dropped = 0
+            except queue.Full:
+                pass
+
+    def _offer(self, record) -> bool:
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            if self.overflow != "drop_oldest" or not self._evict_oldest():
+                return False
+        self.dropped += 1
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            return False
+
+    def _evict_oldest(self) -> bool:
+        """Removes the oldest queued record below WARNING; False if there is none."""
+        with self.queue.mutex:
+            for i, queued in enumerate(self.queue.queue):
+                if queued.levelno < logging.WARNING:
+                    del self.queue.queue[i]
+                    self.queue.not_full.notify()
+                    return True
+        return False
+
+_listeners = []
+
+def stop_logging():
+    """Drains queued records and stops the background log writers."""
+    while _listeners:
+        _listeners.pop().stop()
+
+atexit.register(stop_logging)
+
+def setup_logger(name=None, log_file="logs/trading.log", level=logging.INFO, async_mode=None, queue_size=None,
+                 overflow=None):
+    """
+    Attaches the JSON file and console handlers. In async mode (logging.async_mode)
+    the logger only enqueues records; formatting and I/O run on a background
+    QueueListener thread.
+    """
+    from src.utils.config_loader import get_config
+
     logger = logging.getLogger(name)
     logger.setLevel(level)
     
@@ -51,14 +158,24 @@ def setup_logger(name=None, log_file="logs/trading.log", level=logging.INFO):
     # File Handler (JSON)
     file_handler = logging.FileHandler(log_file)
     file_handler.setFormatter(JsonFormatter())
-    logger.addHandler(file_handler)
 
     # Console Handler (Human Readable)
     console_handler = logging.StreamHandler()
     console_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
 
+    if async_mode is None:
+        async_mode = get_config("logging.async_mode", False)
+    if not async_mode:
+        logger.addHandler(file_handler)
+        logger.addHandler(console_handler)
+        return logger
+
+    log_queue = queue.Queue(maxsize=queue_size or get_config("logging.queue_size", 10000))
+    logger.addHandler(BoundedQueueHandler(log_queue, overflow or get_config("logging.overflow", "drop_new")))
+    listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
     return logger
 
 def get_logger(name="TradingAgent"):
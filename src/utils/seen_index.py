@@ -0,0 +1,65 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+class SeenIndex:
+    """
+    Insertion-ordered set of ids with a size cap and time-based expiry.
+
+    Backed by an OrderedDict of id -> first-seen epoch seconds, so membership
+    checks and inserts are O(1) and the oldest ids are evicted from the front
+    once the index is full or they are older than `ttl_sec`.
+    Persisted as that same mapping (JSON object), oldest first.
+    """
+    def __init__(self, capacity: int = 5000, ttl_sec: Optional[float] = None):
+        self.capacity = capacity
+        self.ttl_sec = ttl_sec
+        self.entries = OrderedDict()
+
+    @classmethod
+    def from_state(cls, value, capacity: int = 5000, ttl_sec: Optional[float] = None):
+        """
+        Rebuilds the index from its persisted form. Accepts the legacy list of
+        ids as well, stamping them with the current time.
+        """
+        index = cls(capacity=capacity, ttl_sec=ttl_sec)
+        if isinstance(value, dict):
+            for key, ts in value.items():
+                index.entries[key] = int(ts)
+        elif isinstance(value, list):
+            now = int(time.time())
+            for key in value:
+                index.entries[key] = now
+        index._evict()
+        return index
+
+    def __contains__(self, key) -> bool:
+        ts = self.entries.get(key)
+        if ts is None:
+            return False
+        if self.ttl_sec is not None and time.time() - ts > self.ttl_sec:
+            return False
+        return True
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key, ts: Optional[float] = None) -> bool:
+        """Records an id. Returns False if it was already present."""
+        if key in self:
+            return False
+        self.entries[key] = int(ts if ts is not None else time.time())
+        self.entries.move_to_end(key)
+        self._evict()
+        return True
+
+    def _evict(self):
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        if self.ttl_sec is not None:
+            cutoff = time.time() - self.ttl_sec
+            while self.entries:
+                oldest = next(iter(self.entries.values()))
+                if oldest >= cutoff:
+                    break
+                self.entries.popitem(last=False)
@@ -0,0 +1,498 @@
+import json
+import os
+import datetime
+import dataclasses
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from src.utils.logger import get_logger
+from src.utils import event_log
+from src.utils.state_manager import (STATE_COMMITS, STATE_FSYNC_SECONDS, decode_cursor, encode_cursor, freeze,
+                                     signal_timestamp)
+
+logger = get_logger("SQLiteStateManager")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS orders (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id TEXT,
+    signal_id TEXT,
+    symbol TEXT,
+    action TEXT,
+    status TEXT,
+    ts TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_order_id ON orders (order_id);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status, seq);
+CREATE INDEX IF NOT EXISTS idx_orders_symbol ON orders (symbol, seq);
+CREATE INDEX IF NOT EXISTS idx_orders_action ON orders (action, seq);
+CREATE INDEX IF NOT EXISTS idx_orders_ts ON orders (ts);
+CREATE TABLE IF NOT EXISTS signals (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    asset TEXT,
+    action TEXT,
+    confidence REAL,
+    ts TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_signals_asset ON signals (asset, seq);
+CREATE INDEX IF NOT EXISTS idx_signals_action ON signals (action, seq);
+CREATE INDEX IF NOT EXISTS idx_signals_ts ON signals (ts);
+CREATE TABLE IF NOT EXISTS positions (
+    symbol TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS processed_news (
+    id TEXT PRIMARY KEY,
+    ts INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_processed_news_ts ON processed_news (ts);
+CREATE TABLE IF NOT EXISTS audit (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    data TEXT NOT NULL
+);
+"""
+
+DEFAULT_PORTFOLIO = {"cash": 100000.0, "positions": {}}
+
+def _where(clauses, params, column, wanted):
+    if wanted is None:
+        return
+    if isinstance(wanted, (list, tuple, set)):
+        wanted = list(wanted)
+        clauses.append(f"{column} IN ({', '.join('?' * len(wanted))})")
+        params.extend(wanted)
+    else:
+        clauses.append(f"{column} = ?")
+        params.append(wanted)
+
+def _page(kind, rows, limit):
+    """Page result from up to limit + 1 (seq, data) rows; the extra row only tells that there is more."""
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": [json.loads(r[1]) for r in rows],
+        "next_cursor": encode_cursor(kind, rows[-1][0]) if more and rows else None
+    }
+
+class SQLiteStateManager:
+    """
+    StateManager backend on SQLite (WAL mode).
+
+    Orders, signals and processed news live in indexed tables, so duplicate
+    checks and lookups are index probes and history is never truncated.
+    Scalars (portfolio, emergency stop, last run) are kept in a key/value
+    table. Exposes the same public API as StateManager plus range queries;
+    every commit is a SQLite transaction with synchronous=FULL. Changes are
+    published to `event_log` (if given) when their transaction commits.
+    """
+    def __init__(self, db_file="data/state.db", max_processed_news=5000, processed_news_ttl_sec=7 * 24 * 3600,
+                 max_commit_latency_sec=1.0, event_log=None):
+        self.db_file = db_file
+        self.max_processed_news = max_processed_news
+        self.processed_news_ttl_sec = processed_news_ttl_sec
+        self.max_commit_latency_sec = max_commit_latency_sec
+        self.event_log = event_log
+        # Change events of the open transaction, published on commit
+        self._events = []
+
+        os.makedirs(os.path.dirname(db_file) or ".", exist_ok=True)
+        # Autocommit mode; transactions are managed explicitly
+        self._db = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.executescript(SCHEMA)
+
+        self._mutex = threading.RLock()
+        self._txn_depth = 0
+        self._txn_started = None
+        self._news_inserts = 0
+        # Commits made through this connection; PRAGMA data_version counts everyone else's
+        self._commits = 0
+        self._seen_version = None
+        self._frozen = None
+        self.portfolio = dict(DEFAULT_PORTFOLIO)
+        self.ledger = {}
+        self.marks = {}
+        self.load_state()
+
+    # --- Storage helpers ---
+
+    def _get_kv(self, key, default=None):
+        row = self._db.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_kv(self, key, value):
+        self._db.execute("INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def _version(self):
+        return self._db.execute("PRAGMA data_version").fetchone()[0], self._commits
+
+    def load_state(self):
+        """Refreshes the in-memory portfolio from the database if anything was committed since the last read."""
+        with self._mutex:
+            version = self._version()
+            if version != self._seen_version:
+                self._reload()
+                self._seen_version = version
+
+    def _reload(self):
+        self.portfolio = self._get_kv("portfolio") or {"cash": DEFAULT_PORTFOLIO["cash"], "positions": {}}
+        self.ledger = {symbol: json.loads(data) for symbol, data in self._db.execute("SELECT symbol, data FROM positions")}
+        self.marks = self._get_kv("marks", {})
+        self._frozen = None
+
+    def snapshot(self):
+        """
+        Read-only view of the last committed state, for pollers. Rebuilt only
+        after a commit, and never waits for a transaction open in another
+        thread of this process.
+        """
+        if self._frozen is None or self._version() != self._seen_version:
+            if self._mutex.acquire(blocking=self._frozen is None):
+                try:
+                    if self._txn_depth == 0:
+                        self.load_state()
+                    if self._frozen is None:
+                        self._frozen = freeze(self.state)
+                finally:
+                    self._mutex.release()
+        return self._frozen
+
+    def save_state(self):
+        """Every commit is already durable; this just stamps last_run_utc."""
+        with self.transaction():
+            self._touch()
+
+    @property
+    def state(self):
+        """Dict view shaped like StateManager.state, for read-only callers. Builds it on every access."""
+        return {
+            "last_run_utc": self.get_last_run(),
+            "emergency_stop": self.is_emergency_stop(),
+            "portfolio": self.get_portfolio(),
+            "ledger": self.get_ledger(),
+            "marks": self.get_marks(),
+            "processed_news_ids": [r[0] for r in self._db.execute("SELECT id FROM processed_news ORDER BY ts")],
+            "order_history": self.get_orders(limit=1000)[::-1],
+            "signals": self.get_signals(limit=1000)[::-1],
+            "audit": self.get_audit(limit=1000)[::-1],
+            "open_orders": [],
+        }
+
+    # --- Transactions ---
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups mutations into one SQLite transaction. Nested blocks are
+        savepoints; a block directly inside the outermost one commits early
+        once the transaction is older than max_commit_latency_sec. A block
+        that raises is rolled back to its savepoint. The outermost block holds
+        the database write lock (BEGIN IMMEDIATE) until it exits, blocking
+        writers in other threads and processes, so keep blocks short and free
+        of network calls.
+        """
+        with self._mutex:
+            depth = self._txn_depth
+            mark = len(self._events)
+            if depth == 0:
+                self._db.execute("BEGIN IMMEDIATE")
+                self._txn_started = time.monotonic()
+            else:
+                self._db.execute(f"SAVEPOINT sp{depth}")
+            self._txn_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._txn_depth -= 1
+                del self._events[mark:]
+                if depth == 0:
+                    self._db.execute("ROLLBACK")
+                else:
+                    self._db.execute(f"ROLLBACK TO sp{depth}")
+                    self._db.execute(f"RELEASE sp{depth}")
+                self._reload()
+                raise
+            self._txn_depth -= 1
+            if depth == 0:
+                self._commit_now()
+            else:
+                self._db.execute(f"RELEASE sp{depth}")
+                if depth == 1 and time.monotonic() - self._txn_started >= self.max_commit_latency_sec:
+                    self._commit_now()
+                    self._db.execute("BEGIN IMMEDIATE")
+                    self._txn_started = time.monotonic()
+
+    batch = transaction
+
+    def _commit_now(self):
+        with STATE_FSYNC_SECONDS.time(backend="sqlite"):
+            self._db.execute("COMMIT")
+        self._commits += 1
+        STATE_COMMITS.inc(backend="sqlite")
+        events, self._events = self._events, []
+        if self.event_log is not None:
+            self.event_log.publish(events)
+
+    def _emit(self, event_type, data):
+        if self.event_log is not None:
+            self._events.append((event_type, data))
+
+    def _touch(self):
+        self._set_kv("last_run_utc", datetime.datetime.utcnow().isoformat())
+
+    # --- Public API ---
+
+    def is_emergency_stop(self):
+        return bool(self._get_kv("emergency_stop", False))
+
+    def set_emergency_stop(self, enabled: bool):
+        with self.transaction():
+            self._set_kv("emergency_stop", bool(enabled))
+            self._touch()
+            self._emit(event_log.EMERGENCY_STOP, {"enabled": bool(enabled)})
+
+    def add_order(self, order_dict):
+        """Adds an executed order to history."""
+        with self.transaction():
+            self._db.execute(
+                "INSERT INTO orders (order_id, signal_id, symbol, action, status, ts, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (order_dict.get("order_id"), order_dict.get("signal_id"), order_dict.get("symbol"),
+                 order_dict.get("action"), order_dict.get("status"), order_dict.get("timestamp"),
+                 json.dumps(order_dict))
+            )
+            self._touch()
+            self._emit(event_log.ORDER, order_dict)
+
+    def order_exists(self, order_id):
+        return self._db.execute("SELECT 1 FROM orders WHERE order_id = ? LIMIT 1", (order_id,)).fetchone() is not None
+
+    def get_order(self, order_id):
+        """Latest history record for order_id, or None."""
+        row = self._db.execute(
+            "SELECT data FROM orders WHERE order_id = ? ORDER BY seq DESC LIMIT 1", (order_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update_order(self, order_id, fields):
+        """Merges fields into an existing order record (e.g. reconciled status)."""
+        with self.transaction():
+            row = self._db.execute(
+                "SELECT seq, data FROM orders WHERE order_id = ? ORDER BY seq DESC LIMIT 1", (order_id,)
+            ).fetchone()
+            if row is None:
+                return
+            order = json.loads(row[1])
+            order.update(fields)
+            self._db.execute(
+                "UPDATE orders SET status = ?, data = ? WHERE seq = ?", (order.get("status"), json.dumps(order), row[0])
+            )
+            self._touch()
+            self._emit(event_log.ORDER_UPDATE, {"order_id": order_id, "fields": fields})
+
+    def get_orders(self, limit=100, symbol=None, status=None, action=None, since=None, until=None):
+        """Order history newest first, filtered by symbol/status/action and [since, until) timestamp."""
+        return [json.loads(r[1]) for r in self._query_orders(
+            "seq, data", limit=limit, symbol=symbol, status=status, action=action, since=since, until=until
+        )]
+
+    def _query_orders(self, columns, limit=100, symbol=None, status=None, action=None, since=None, until=None,
+                      before_seq=None):
+        clauses, params = [], []
+        _where(clauses, params, "symbol", symbol)
+        _where(clauses, params, "status", status)
+        _where(clauses, params, "action", action)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        if before_seq is not None:
+            clauses.append("seq < ?")
+            params.append(before_seq)
+        sql = f"SELECT {columns} FROM orders"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY seq DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._db.execute(sql, params).fetchall()
+
+    def page_orders(self, limit=100, cursor=None, symbol=None, status=None, action=None, since=None, until=None):
+        """
+        One page of order history, newest first, with the same filters as
+        get_orders. Returns {"items", "next_cursor"}; pass next_cursor back
+        for the next older page (None on the last page).
+        """
+        rows = self._query_orders(
+            "seq, data", limit=limit + 1, symbol=symbol, status=status, action=action, since=since, until=until,
+            before_seq=decode_cursor("order", cursor) if cursor is not None else None
+        )
+        return _page("order", rows, limit)
+
+    def count_orders(self, status=None, since=None):
+        clauses, params = [], []
+        _where(clauses, params, "status", status)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        sql = "SELECT COUNT(*) FROM orders"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return self._db.execute(sql, params).fetchone()[0]
+
+    def count_open_orders(self):
+        return 0
+
+    def is_news_processed(self, news_id):
+        row = self._db.execute("SELECT ts FROM processed_news WHERE id = ?", (news_id,)).fetchone()
+        return row is not None and time.time() - row[0] <= self.processed_news_ttl_sec
+
+    def count_processed_news(self):
+        return self._db.execute("SELECT COUNT(*) FROM processed_news").fetchone()[0]
+
+    def mark_news_processed(self, news_id):
+        with self.transaction():
+            self._db.execute(
+                "INSERT OR REPLACE INTO processed_news (id, ts) VALUES (?, ?)", (news_id, int(time.time()))
+            )
+            self._news_inserts += 1
+            if self._news_inserts >= 100:
+                self._prune_news()
+            self._touch()
+
+    def _prune_news(self):
+        """Keeps processed_news within its TTL and capacity, oldest first."""
+        self._news_inserts = 0
+        self._db.execute("DELETE FROM processed_news WHERE ts < ?", (int(time.time() - self.processed_news_ttl_sec),))
+        self._db.execute(
+            "DELETE FROM processed_news WHERE id IN ("
+            " SELECT id FROM processed_news ORDER BY ts DESC LIMIT -1 OFFSET ?)",
+            (self.max_processed_news,)
+        )
+
+    def update_portfolio(self, cash, positions):
+        with self.transaction():
+            self.portfolio["cash"] = cash
+            self.portfolio["positions"] = dict(positions)
+            self._set_kv("portfolio", self.portfolio)
+            self._touch()
+            self._emit(event_log.PORTFOLIO, {"cash": cash, "positions": dict(positions)})
+
+    def get_portfolio(self):
+        return self.portfolio
+
+    def update_position(self, symbol, entry):
+        """Replaces one symbol's ledger entry."""
+        with self.transaction():
+            self._db.execute("INSERT OR REPLACE INTO positions (symbol, data) VALUES (?, ?)",
+                             (symbol, json.dumps(entry)))
+            self.ledger[symbol] = entry
+            self._touch()
+            self._emit(event_log.POSITION, {"symbol": symbol, "entry": entry})
+
+    def get_ledger(self):
+        return self.ledger
+
+    def set_marks(self, prices):
+        with self.transaction():
+            self.marks = {"prices": dict(prices), "at": datetime.datetime.utcnow().isoformat()}
+            self._set_kv("marks", self.marks)
+            self._touch()
+            self._emit(event_log.MARKS, self.marks)
+
+    def get_marks(self):
+        return self.marks
+
+    def set_day_start(self, day):
+        """Baseline for intraday P&L (see RiskState)."""
+        with self.transaction():
+            self._set_kv("day_start", dict(day))
+
+    def get_day_start(self):
+        return self._get_kv("day_start", {})
+
+    def get_last_run(self):
+        return self._get_kv("last_run_utc")
+
+    def add_audit(self, entry):
+        """Records an operator action (who did what, when)."""
+        with self.transaction():
+            self._db.execute("INSERT INTO audit (data) VALUES (?)", (json.dumps(entry),))
+            self._touch()
+
+    def get_audit(self, limit=100):
+        """Audit entries newest first."""
+        rows = self._db.execute("SELECT data FROM audit ORDER BY seq DESC LIMIT ?", (limit,)).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def add_signal(self, signal_obj):
+        """Adds a generated signal to history. Duplicate IDs are ignored."""
+        if dataclasses.is_dataclass(signal_obj):
+            sig_dict = dataclasses.asdict(signal_obj)
+        else:
+            sig_dict = signal_obj
+        with self.transaction():
+            inserted = self._db.execute(
+                "INSERT OR IGNORE INTO signals (id, asset, action, confidence, ts, data) VALUES (?, ?, ?, ?, ?, ?)",
+                (sig_dict["id"], sig_dict.get("asset"), sig_dict.get("action"), sig_dict.get("confidence"),
+                 signal_timestamp(sig_dict), json.dumps(sig_dict))
+            ).rowcount
+            self._touch()
+            if inserted:
+                self._emit(event_log.SIGNAL, sig_dict)
+
+    def get_signals(self, limit=100, asset=None, action=None, since=None, until=None):
+        """Signal history newest first, filtered by asset/action and [since, until) timestamp."""
+        return [json.loads(r[1]) for r in self._query_signals(
+            "seq, data", limit=limit, asset=asset, action=action, since=since, until=until
+        )]
+
+    def page_signals(self, limit=100, cursor=None, asset=None, action=None, since=None, until=None,
+                     min_confidence=None):
+        """One page of signal history, newest first; see page_orders."""
+        rows = self._query_signals(
+            "seq, data", limit=limit + 1, asset=asset, action=action, since=since, until=until,
+            min_confidence=min_confidence, before_seq=decode_cursor("signal", cursor) if cursor is not None else None
+        )
+        return _page("signal", rows, limit)
+
+    def _query_signals(self, columns, limit=100, asset=None, action=None, since=None, until=None,
+                       min_confidence=None, before_seq=None):
+        clauses, params = [], []
+        _where(clauses, params, "asset", asset)
+        _where(clauses, params, "action", action)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        if min_confidence is not None:
+            clauses.append("confidence >= ?")
+            params.append(min_confidence)
+        if before_seq is not None:
+            clauses.append("seq < ?")
+            params.append(before_seq)
+        sql = f"SELECT {columns} FROM signals"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY seq DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._db.execute(sql, params).fetchall()
+
+    def close(self):
+        with self._mutex:
+            self._db.close()
@@ -1,180 +1,757 @@
+import base64
 import json
 import os
 import datetime
+import dataclasses
+import tempfile
+import threading
+import time
 import portalocker
 from contextlib import contextmanager
+from types import MappingProxyType
+from src.infra import metrics
+from src.utils import event_log
+from src.utils.config_loader import get_config
 from src.utils.logger import get_logger
+from src.utils.seen_index import SeenIndex
 
 logger = get_logger("StateManager")
 
+STATE_SAVE_SECONDS = metrics.histogram("state_save_seconds", "Time to write a full state snapshot", ["backend"])
+STATE_FSYNC_SECONDS = metrics.histogram("state_fsync_seconds", "Time to make one commit durable", ["backend"])
+STATE_COMMITS = metrics.counter("state_commits_total", "Durable state commits", ["backend"])
+
+# History caps for the JSON backend; the SQLite backend keeps everything
+MAX_ORDER_HISTORY = 1000
+MAX_SIGNAL_HISTORY = 1000
+MAX_AUDIT_HISTORY = 1000
+
+def _matches(value, wanted) -> bool:
+    """Filter helper: wanted is None (any), a single value or a list of values."""
+    if wanted is None:
+        return True
+    if isinstance(wanted, (list, tuple, set)):
+        return value in wanted
+    return value == wanted
+
+def _in_range(ts, since, until) -> bool:
+    """ISO-8601 timestamps compare correctly as strings."""
+    if since is not None and (ts is None or ts < since):
+        return False
+    if until is not None and (ts is None or ts >= until):
+        return False
+    return True
+
+def signal_timestamp(sig_dict):
+    return sig_dict.get("generated_at") or sig_dict.get("timestamp_utc")
+
+def encode_cursor(kind: str, seq: int) -> str:
+    """Opaque page cursor: history entries older than sequence number `seq`."""
+    return base64.urlsafe_b64encode(f"{kind}:{seq}".encode("ascii")).decode("ascii").rstrip("=")
+
+def decode_cursor(kind: str, cursor: str) -> int:
+    """Sequence number of a cursor from encode_cursor; ValueError if it is malformed or for another history."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        cursor_kind, seq = raw.split(":", 1)
+        if cursor_kind == kind:
+            return int(seq)
+    except (ValueError, UnicodeDecodeError):
+        pass
+    raise ValueError(f"Invalid {kind} cursor")
+
+def record_events(record) -> list:
+    """(type, data) change events for one journal record; processed-news bookkeeping has none."""
+    op = record.get("op")
+    if op == "batch":
+        return [event for sub_record in record["records"] for event in record_events(sub_record)]
+    if op == "signal":
+        return [(event_log.SIGNAL, record["signal"])]
+    if op == "order":
+        return [(event_log.ORDER, record["order"])]
+    if op == "order_update":
+        return [(event_log.ORDER_UPDATE, {"order_id": record["order_id"], "fields": record["fields"]})]
+    if op == "portfolio":
+        return [(event_log.PORTFOLIO, {"cash": record["cash"], "positions": record["positions"]})]
+    if op == "position":
+        return [(event_log.POSITION, {"symbol": record["symbol"], "entry": record["entry"]})]
+    if op == "set" and record.get("key") == "emergency_stop":
+        return [(event_log.EMERGENCY_STOP, {"enabled": bool(record["value"])})]
+    if op == "set" and record.get("key") == "marks":
+        return [(event_log.MARKS, record["value"])]
+    return []
+
+def freeze(obj):
+    """Deep read-only copy: dicts become mappingproxies, lists become tuples."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
 class StateManager:
-    def __init__(self, state_file="data/state.json"):
+    """
+    Persistent bot state: a JSON snapshot plus an append-only journal.
+
+    Each mutation is applied in memory and appended to `<state_file>.wal` as
+    one fsynced JSON line, so a write costs the size of the change rather
+    than the size of the state. Every `snapshot_every` records the full state
+    is written to `state_file` (temp file + atomic rename) and the journal
+    restarts under the next generation number. Loading reads the snapshot and
+    replays the journal of the same generation; a torn final line left by a
+    crash is ignored.
+
+    Mutations made inside `transaction()` are buffered and committed together
+    as a single journal line (one fsync), so they land on disk all-or-nothing.
+
+    With journal=False every commit rewrites the snapshot instead.
+
+    Once a commit is durable, its changes are published to `event_log`
+    (if given) for push-based readers.
+
+    Readers (API server, dashboard) only take a shared lock, and only when
+    the snapshot or journal changed on disk since the last read; `snapshot()`
+    hands out a cached read-only view of the last committed state.
+    """
+    def __init__(self, state_file="data/state.json", max_processed_news=5000, processed_news_ttl_sec=7 * 24 * 3600,
+                 journal=True, snapshot_every=500, max_commit_latency_sec=1.0, event_log=None):
         self.state_file = state_file
         self.lock_file = state_file + ".lock"
+        self.journal_file = state_file + ".wal"
+        self.journal = journal
+        self.snapshot_every = snapshot_every
+        self.max_commit_latency_sec = max_commit_latency_sec
+        self.event_log = event_log
+        self.max_order_history = MAX_ORDER_HISTORY
+        self.max_signal_history = MAX_SIGNAL_HISTORY
+        self.max_processed_news = max_processed_news
+        self.processed_news_ttl_sec = processed_news_ttl_sec
+        self.seen_news = SeenIndex(capacity=max_processed_news, ttl_sec=processed_news_ttl_sec)
         self.state = {
             "last_run_utc": None,
-            "processed_news_ids": [],
+            "processed_news_ids": self.seen_news.entries,
             "signals": [],  # Store recent signals
             "portfolio": {
                 "cash": 100000.0,
                 "positions": {}
             }
         }
+        self._normalize()
+
+        self._mutex = threading.RLock()
+        self._lock_depth = 0
+        # What this process has read of the files on disk
+        self._snapshot_ino = None
+        self._journal_gen = 0
+        self._journal_ino = None
+        self._journal_offset = 0
+        self._journal_records = 0
+        # Open transaction: applied in memory, not yet on disk
+        self._txn_depth = 0
+        self._txn_records = []
+        self._txn_started = None
+        # Change detection for readers, and the read-only view handed to them
+        self._seen_version = None
+        self._frozen = None
+        self._frozen_version = None
         self.load_state()
 
     @contextmanager
-    def _lock(self):
-        """Acquire exclusive lock for state file operations."""
-        os.makedirs(os.path.dirname(self.lock_file) or ".", exist_ok=True)
-        lock_fh = open(self.lock_file, 'w')
-        try:
-            portalocker.lock(lock_fh, portalocker.LOCK_EX)
-            yield
-        finally:
-            portalocker.unlock(lock_fh)
-            lock_fh.close()
+    def _lock(self, shared=False):
+        """
+        Acquire the state file lock, exclusive for writers and shared for
+        readers. Re-entrant within a process; a nested request runs under
+        whatever lock is already held.
+        """
+        with self._mutex:
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+
+            os.makedirs(os.path.dirname(self.lock_file) or ".", exist_ok=True)
+            lock_fh = open(self.lock_file, 'w')
+            try:
+                portalocker.lock(lock_fh, portalocker.LOCK_SH if shared else portalocker.LOCK_EX)
+                self._lock_depth = 1
+                yield
+            finally:
+                self._lock_depth = 0
+                portalocker.unlock(lock_fh)
+                lock_fh.close()
 
     def load_state(self):
+        """Catches up with the files on disk. Costs two stat calls when nothing changed."""
         if os.path.exists(self.state_file):
             try:
-                with self._lock():
-                    with open(self.state_file, 'r') as f:
-                        self.state = json.load(f)
-                # Ensure all keys exist
-                if "processed_news_ids" not in self.state:
-                    self.state["processed_news_ids"] = []
-                if "portfolio" not in self.state:
-                    self.state["portfolio"] = {"cash": 100000.0, "positions": {}}
-                if "order_history" not in self.state:
-                    self.state["order_history"] = []
-                if "open_orders" not in self.state:
-                    self.state["open_orders"] = []
-                if "signals" not in self.state:
-                    self.state["signals"] = []
+                if self._disk_version() == self._seen_version:
+                    return
+                with self._lock(shared=True):
+                    self._catch_up()
+                    self._mark_seen()
             except Exception as e:
                 logger.error(f"Failed to load state: {e}")
         else:
             logger.warning("State file not found, using default state.")
             self.save_state()
 
+    def snapshot(self):
+        """
+        Read-only view of the last committed state, for pollers. Served from
+        cache while the files on disk are unchanged, and never waits for a
+        transaction open in another thread of this process. The view is
+        rebuilt here, on the reader's call, never on the commit path.
+        """
+        if self._frozen is None or self._disk_version() != self._frozen_version:
+            # Only block if there is nothing to hand out yet
+            if self._mutex.acquire(blocking=self._frozen is None):
+                try:
+                    if self._txn_depth == 0:
+                        self.load_state()
+                    # Memory matches disk unless a transaction of this thread has buffered records
+                    if self._frozen is None or not self._txn_records:
+                        self._frozen = freeze(self.state)
+                        self._frozen_version = None if self._txn_records else self._seen_version
+                finally:
+                    self._mutex.release()
+        return self._frozen
+
+    def _disk_version(self):
+        """
+        (inode, size, mtime) of the snapshot and the journal. A new snapshot or
+        journal generation replaces the file, so it changes the inode.
+        """
+        version = []
+        for path in (self.state_file, self.journal_file):
+            try:
+                st = os.stat(path)
+                version.append((st.st_ino, st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                version.append(None)
+        return tuple(version)
+
+    def _mark_seen(self):
+        """Records that memory holds everything on disk. Caller holds the lock."""
+        self._seen_version = self._disk_version()
+
+    def _read_from_disk(self):
+        """Loads the snapshot and replays its journal. Caller holds the lock."""
+        with open(self.state_file, 'r') as f:
+            self.state = json.load(f)
+            self._snapshot_ino = os.fstat(f.fileno()).st_ino
+        self._normalize()
+        self._journal_gen = self.state.get("journal_gen", 0)
+        self._journal_ino = None
+        self._journal_offset = 0
+        self._journal_records = 0
+        if self.journal:
+            self._replay_journal()
+
+    def _normalize(self):
+        # Ensure all keys exist
+        self.seen_news = SeenIndex.from_state(
+            self.state.get("processed_news_ids", {}),
+            capacity=self.max_processed_news,
+            ttl_sec=self.processed_news_ttl_sec
+        )
+        self.state["processed_news_ids"] = self.seen_news.entries
+        if "portfolio" not in self.state:
+            self.state["portfolio"] = {"cash": 100000.0, "positions": {}}
+        if "order_history" not in self.state:
+            self.state["order_history"] = []
+        if "open_orders" not in self.state:
+            self.state["open_orders"] = []
+        if "signals" not in self.state:
+            self.state["signals"] = []
+        # Entries dropped from the front of each history, so entry i has sequence number dropped + i + 1
+        self.state.setdefault("order_history_dropped", 0)
+        self.state.setdefault("signals_dropped", 0)
+        # Cost basis per symbol (see PositionLedger) and the last prices positions were marked at
+        self.state.setdefault("ledger", {})
+        self.state.setdefault("marks", {})
+        # Operator actions (e.g. tools/clear_emergency), oldest first
+        self.state.setdefault("audit", [])
+        # Lookup indexes over the history lists
+        self._orders_by_id = {o.get("order_id"): o for o in self.state["order_history"]}
+        self._signal_ids = {sig.get("id") for sig in self.state["signals"]}
+
     def save_state(self):
-        self.state["last_run_utc"] = datetime.datetime.utcnow().isoformat()
-        
+        """Writes a full snapshot and, in journal mode, starts a new journal generation."""
         with self._lock():
+            if self.journal:
+                # Fold in anything other processes journaled since we last looked
+                self._sync_journal()
+                self.state["journal_gen"] = self._journal_gen + 1
+            self.state["last_run_utc"] = datetime.datetime.utcnow().isoformat()
+
             # Atomic Write: Write to temp then rename
-            import tempfile
             dir_name = os.path.dirname(self.state_file)
             os.makedirs(dir_name, exist_ok=True)
-            
-            fd, tmp_path = tempfile.mkstemp(dir=dir_name, text=True)
+            with STATE_SAVE_SECONDS.time(backend="json"):
+                self._atomic_write(self.state_file, json.dumps(self.state, indent=2))
+            self._snapshot_ino = os.stat(self.state_file).st_ino
+
+            if self.journal:
+                self._journal_gen += 1
+                self._start_journal()
+            # Anything buffered by an open transaction is now part of the snapshot
+            self._txn_records = []
+            self._mark_seen()
+
+    def _atomic_write(self, path, text):
+        dir_name = os.path.dirname(path)
+        fd, tmp_path = tempfile.mkstemp(dir=dir_name, text=True)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno()) # Ensure file content durability
+
+            # Atomic replace - Retry on Windows if file is locked
+            max_retries = 5
+            for i in range(max_retries):
+                try:
+                    os.replace(tmp_path, path)
+                    break
+                except PermissionError as e:
+                    if i == max_retries - 1:
+                        raise e
+                    logger.warning(f"Permission denied on {path}, retrying {i+1}/{max_retries}...")
+                    time.sleep(0.1)
+
+            # Attempt to fsync directory (best effort for durability)
+            if hasattr(os, 'O_DIRECTORY'):
+                try:
+                    dir_fd = os.open(dir_name, os.O_DIRECTORY)
+                    os.fsync(dir_fd)
+                    os.close(dir_fd)
+                except Exception:
+                    pass
+        except Exception as e:
+            # Cleanup temp on failure
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except:
+                    pass
+            logger.error(f"Failed to save state: {e}")
+            raise e
+
+    # --- Journal ---
+
+    def _start_journal(self):
+        """Replaces the journal with an empty one for the current generation."""
+        header = json.dumps({"gen": self._journal_gen}) + "\n"
+        self._atomic_write(self.journal_file, header)
+        self._journal_ino = os.stat(self.journal_file).st_ino
+        self._journal_offset = len(header.encode("utf-8"))
+        self._journal_records = 0
+
+    def _replay_journal(self):
+        """Applies journal records past what this process has already seen. Caller holds the lock."""
+        try:
+            f = open(self.journal_file, 'rb')
+        except FileNotFoundError:
+            self._journal_ino = None
+            return
+        with f:
+            ino = os.fstat(f.fileno()).st_ino
+            if ino != self._journal_ino:
+                try:
+                    gen = json.loads(f.readline()).get("gen")
+                except ValueError:
+                    gen = None
+                if gen != self._journal_gen:
+                    # Left over from before the current snapshot; already folded into it
+                    self._journal_ino = None
+                    return
+                self._journal_ino = ino
+                self._journal_offset = f.tell()
+                self._journal_records = 0
+            else:
+                f.seek(self._journal_offset)
+
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break # Torn final write from a crash
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self._apply(record)
+                self._journal_offset += len(line)
+                self._journal_records += len(record.get("records", [record]))
+
+    def _catch_up(self):
+        """
+        Applies whatever other processes wrote since this one last looked.
+        Only reads, so a shared lock is enough. Returns False if the journal
+        is missing or left over from an older generation.
+        """
+        try:
+            snapshot_ino = os.stat(self.state_file).st_ino
+        except FileNotFoundError:
+            snapshot_ino = None
+        if snapshot_ino is not None and snapshot_ino != self._snapshot_ino:
+            # Someone else wrote a newer snapshot; keep our uncommitted changes on top of it
+            self._read_from_disk()
+            for record in self._txn_records:
+                self._apply(record)
+            return not self.journal or self._journal_ino is not None
+        if not self.journal:
+            return True
+
+        try:
+            st = os.stat(self.journal_file)
+        except FileNotFoundError:
+            st = None
+        if st is not None and st.st_ino == self._journal_ino:
+            if st.st_size != self._journal_offset:
+                self._replay_journal()
+        else:
+            self._journal_ino = None
+            if st is not None:
+                self._replay_journal()
+        return self._journal_ino is not None
+
+    def _sync_journal(self):
+        """Brings memory up to date and readies the journal for appending. Caller holds the exclusive lock."""
+        if not self._catch_up():
+            # Missing or stale journal
+            self._start_journal()
+            return
+
+        # Whatever is left past the last complete record is a torn write; drop it before appending
+        if os.path.getsize(self.journal_file) > self._journal_offset:
+            logger.warning("Discarding incomplete trailing journal record")
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(self._journal_offset)
+                os.fsync(f.fileno())
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups the mutations made inside the block into one atomic commit.
+
+        Blocks nest: inner blocks join the outermost one, which commits on
+        exit. A block directly inside the outermost one also commits
+        everything so far if the oldest buffered mutation has waited longer
+        than max_commit_latency_sec, so a long tick still reaches disk
+        regularly and only at unit boundaries.
+        If a block raises, its mutations are discarded and memory is restored
+        to match disk plus whatever the enclosing blocks already buffered.
+        Other threads' mutations wait until the outermost block exits, so keep
+        blocks to one unit of in-memory work, with no network calls inside.
+        """
+        with self._mutex:
+            mark = len(self._txn_records)
+            self._txn_depth += 1
             try:
-                with os.fdopen(fd, 'w') as f:
-                    json.dump(self.state, f, indent=2)
-                    f.flush()
-                    os.fsync(f.fileno()) # Ensure file content durability
-                
-                # Atomic replace - Retry on Windows if file is locked
-                import time
-                max_retries = 5
-                for i in range(max_retries):
-                    try:
-                        os.replace(tmp_path, self.state_file)
-                        break
-                    except PermissionError as e:
-                        if i == max_retries - 1:
-                            raise e
-                        logger.warning(f"Permission denied on {self.state_file}, retrying {i+1}/{max_retries}...")
-                        time.sleep(0.1)
-                
-                # Attempt to fsync directory (best effort for durability)
-                if hasattr(os, 'O_DIRECTORY'):
-                    try:
-                        dir_fd = os.open(dir_name, os.O_DIRECTORY)
-                        os.fsync(dir_fd)
-                        os.close(dir_fd)
-                    except Exception:
-                        pass
-            except Exception as e:
-                # Cleanup temp on failure
-                if os.path.exists(tmp_path):
-                    try:
-                        os.remove(tmp_path)
-                    except:
-                        pass
-                logger.error(f"Failed to save state: {e}")
-                raise e
+                yield self
+            except BaseException:
+                self._txn_depth -= 1
+                self._rollback(mark)
+                raise
+            self._txn_depth -= 1
+            if self._txn_depth == 0 or (self._txn_depth == 1 and self._txn_overdue()):
+                self._flush()
+
+    batch = transaction
+
+    def _txn_overdue(self):
+        return bool(self._txn_records) and time.monotonic() - self._txn_started >= self.max_commit_latency_sec
+
+    def _rollback(self, mark):
+        self._txn_records = self._txn_records[:mark]
+        with self._lock():
+            self._read_from_disk()
+            for record in self._txn_records:
+                self._apply(record)
+
+    def _commit(self, record):
+        """Applies a mutation record in memory and makes it durable (at transaction end if one is open)."""
+        record["at"] = datetime.datetime.utcnow().isoformat()
+        with self._mutex:
+            self._apply(record)
+            if not self._txn_records:
+                self._txn_started = time.monotonic()
+            self._txn_records.append(record)
+            if self._txn_depth == 0:
+                self._flush()
+
+    def _flush(self):
+        """Writes buffered records as one journal line with a single fsync."""
+        if not self._txn_records:
+            return
+        records = self._txn_records
+        try:
+            with self._lock():
+                if not self.journal:
+                    self.save_state()
+                else:
+                    self._append_journal(records)
+            if self.event_log is not None:
+                self.event_log.publish([event for record in records for event in record_events(record)])
+        finally:
+            self._txn_records = []
+
+    def _append_journal(self, records):
+        """Appends records as one fsynced journal line (caller holds the lock)."""
+        self._sync_journal()
+        record = records[0] if len(records) == 1 else {"op": "batch", "records": records}
+        data = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        with STATE_FSYNC_SECONDS.time(backend="json"), open(self.journal_file, 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        STATE_COMMITS.inc(backend="json")
+        self._journal_offset += len(data)
+        self._journal_records += len(records)
+        self._txn_records = []
+
+        if self._journal_records >= self.snapshot_every:
+            self.save_state()
+        else:
+            self._mark_seen()
+
+    def _apply(self, record):
+        """Applies one journal record to the in-memory state. Must be idempotent-safe on replay."""
+        op = record.get("op")
+        if op == "batch":
+            for sub_record in record["records"]:
+                self._apply(sub_record)
+            return
+        if op == "news":
+            self.seen_news.add(record["id"], record.get("ts"))
+        elif op == "signal":
+            sig_dict = record["signal"]
+            # Avoid duplicate IDs
+            if sig_dict.get("id") not in self._signal_ids:
+                signals = self.state["signals"]
+                signals.append(sig_dict)
+                self._signal_ids.add(sig_dict.get("id"))
+                # Keep last 1000
+                while len(signals) > self.max_signal_history:
+                    self._signal_ids.discard(signals.pop(0).get("id"))
+                    self.state["signals_dropped"] += 1
+        elif op == "order":
+            order = record["order"]
+            history = self.state["order_history"]
+            history.append(order)
+            self._orders_by_id[order.get("order_id")] = order
+            # Keep healthy size
+            while len(history) > self.max_order_history:
+                dropped = history.pop(0)
+                self.state["order_history_dropped"] += 1
+                if self._orders_by_id.get(dropped.get("order_id")) is dropped:
+                    del self._orders_by_id[dropped.get("order_id")]
+        elif op == "order_update":
+            order = self._orders_by_id.get(record["order_id"])
+            if order is not None:
+                order.update(record["fields"])
+        elif op == "portfolio":
+            self.state["portfolio"]["cash"] = record["cash"]
+            self.state["portfolio"]["positions"] = record["positions"]
+        elif op == "position":
+            self.state["ledger"][record["symbol"]] = record["entry"]
+        elif op == "set":
+            self.state[record["key"]] = record["value"]
+        elif op == "audit":
+            audit = self.state["audit"]
+            audit.append(record["entry"])
+            del audit[:-MAX_AUDIT_HISTORY]
+        else:
+            logger.warning(f"Unknown journal record {op}, skipping")
+            return
+        if record.get("at"):
+            self.state["last_run_utc"] = record["at"]
+
+    # --- Public API ---
 
     def is_emergency_stop(self):
         return self.state.get("emergency_stop", False)
 
     def set_emergency_stop(self, enabled: bool):
-        self.state["emergency_stop"] = enabled
-        self.save_state()
+        self._commit({"op": "set", "key": "emergency_stop", "value": enabled})
 
     def add_order(self, order_dict):
         """Adds an executed order to history."""
-        if "order_history" not in self.state:
-            self.state["order_history"] = []
-        self.state["order_history"].append(order_dict)
-        # Keep healthy size
-        if len(self.state["order_history"]) > 1000:
-             self.state["order_history"] = self.state["order_history"][-1000:]
-        self.save_state()
+        self._commit({"op": "order", "order": order_dict})
 
     def order_exists(self, order_id):
-        # Check history
-        history = self.state.get("order_history", [])
-        for o in history:
-            if o.get("order_id") == order_id:
-                return True
-        return False
+        return order_id in self._orders_by_id
+
+    def get_order(self, order_id):
+        """Latest history record for order_id, or None."""
+        return self._orders_by_id.get(order_id)
+
+    def update_order(self, order_id, fields):
+        """Merges fields into an existing order record (e.g. reconciled status)."""
+        self._commit({"op": "order_update", "order_id": order_id, "fields": fields})
+
+    def get_orders(self, limit=100, symbol=None, status=None, action=None, since=None, until=None):
+        """Order history newest first, filtered by symbol/status/action and [since, until) timestamp."""
+        items = []
+        for o in reversed(self.state.get("order_history", [])):
+            if limit is not None and len(items) >= limit:
+                break
+            if (_matches(o.get("symbol"), symbol) and _matches(o.get("status"), status)
+                    and _matches(o.get("action"), action) and _in_range(o.get("timestamp"), since, until)):
+                items.append(o)
+        return items
+
+    def page_orders(self, limit=100, cursor=None, symbol=None, status=None, action=None, since=None, until=None):
+        """
+        One page of order history, newest first, with the same filters as
+        get_orders. Returns {"items", "next_cursor"}; pass next_cursor back
+        for the next older page (None on the last page).
+        """
+        return self._page(
+            "order", self.state["order_history"], self.state["order_history_dropped"], limit, cursor,
+            lambda o: (_matches(o.get("symbol"), symbol) and _matches(o.get("status"), status)
+                       and _matches(o.get("action"), action) and _in_range(o.get("timestamp"), since, until))
+        )
+
+    def _page(self, kind, history, dropped, limit, cursor, match):
+        """Walks history back from the cursor position; only the page (plus filtered-out entries) is visited."""
+        end = len(history)
+        if cursor is not None:
+            end = max(0, min(end, decode_cursor(kind, cursor) - dropped - 1))
+        items = []
+        last = i = end - 1
+        while i >= 0:
+            if match(history[i]):
+                if len(items) == limit:
+                    # There is an older match: the page ends after the last item taken
+                    return {"items": items, "next_cursor": encode_cursor(kind, dropped + last + 1)}
+                items.append(history[i])
+                last = i
+            i -= 1
+        return {"items": items, "next_cursor": None}
+
+    def count_orders(self, status=None, since=None):
+        return sum(1 for o in self.state.get("order_history", [])
+                   if _matches(o.get("status"), status) and _in_range(o.get("timestamp"), since, None))
+
+    def count_open_orders(self):
+        return len(self.state.get("open_orders", []))
 
     def is_news_processed(self, news_id):
-        return news_id in self.state["processed_news_ids"]
+        return news_id in self.seen_news
+
+    def count_processed_news(self):
+        return len(self.seen_news)
 
     def mark_news_processed(self, news_id):
-        if news_id not in self.state["processed_news_ids"]:
-            self.state["processed_news_ids"].append(news_id)
-            # Limit size of processed IDs to avoid infinite growth? Maybe keep last 1000.
-            if len(self.state["processed_news_ids"]) > 5000:
-                self.state["processed_news_ids"] = self.state["processed_news_ids"][-4000:]
-            self.save_state()
+        # Bounded by size and age inside the index, oldest ids evicted first
+        if news_id not in self.seen_news:
+            self._commit({"op": "news", "id": news_id, "ts": int(time.time())})
 
     def update_portfolio(self, cash, positions):
-        self.state["portfolio"]["cash"] = cash
-        self.state["portfolio"]["positions"] = positions
-        self.save_state()
+        self._commit({"op": "portfolio", "cash": cash, "positions": dict(positions)})
 
     def get_portfolio(self):
         return self.state["portfolio"]
 
+    def update_position(self, symbol, entry):
+        """Replaces one symbol's ledger entry."""
+        self._commit({"op": "position", "symbol": symbol, "entry": entry})
+
+    def get_ledger(self):
+        return self.state["ledger"]
+
+    def set_marks(self, prices):
+        self._commit({"op": "set", "key": "marks",
+                      "value": {"prices": dict(prices), "at": datetime.datetime.utcnow().isoformat()}})
+
+    def get_marks(self):
+        return self.state["marks"]
+
+    def set_day_start(self, day):
+        """Baseline for intraday P&L (see RiskState)."""
+        self._commit({"op": "set", "key": "day_start", "value": dict(day)})
+
+    def get_day_start(self):
+        return self.state.get("day_start", {})
+
+    def get_last_run(self):
+        return self.state.get("last_run_utc")
+
+    def add_audit(self, entry):
+        """Records an operator action (who did what, when)."""
+        self._commit({"op": "audit", "entry": entry})
+
+    def get_audit(self, limit=100):
+        """Audit entries newest first."""
+        return self.state["audit"][::-1][:limit]
+
     def add_signal(self, signal_obj):
         """Adds a generated signal to history."""
-        if "signals" not in self.state:
-            self.state["signals"] = []
-        
-        # Avoid duplicate IDs
-        if any(s["id"] == signal_obj.id for s in self.state["signals"]):
-            return
-
         # Convert dataclass to dict if needed
-        import dataclasses
         if dataclasses.is_dataclass(signal_obj):
             sig_dict = dataclasses.asdict(signal_obj)
         else:
             sig_dict = signal_obj
 
-        self.state["signals"].append(sig_dict)
-        # Keep last 1000
-        if len(self.state["signals"]) > 1000:
-            self.state["signals"] = self.state["signals"][-1000:]
-        self.save_state()
+        # Avoid duplicate IDs
+        if sig_dict["id"] in self._signal_ids:
+            return
+        self._commit({"op": "signal", "signal": sig_dict})
+
+    def get_signals(self, limit=100, asset=None, action=None, since=None, until=None):
+        """Signal history newest first, filtered by asset/action and [since, until) timestamp."""
+        items = []
+        for sig in reversed(self.state.get("signals", [])):
+            if limit is not None and len(items) >= limit:
+                break
+            if (_matches(sig.get("asset"), asset) and _matches(sig.get("action"), action)
+                    and _in_range(signal_timestamp(sig), since, until)):
+                items.append(sig)
+        return items
+
+    def page_signals(self, limit=100, cursor=None, asset=None, action=None, since=None, until=None,
+                     min_confidence=None):
+        """One page of signal history, newest first; see page_orders."""
+        return self._page(
+            "signal", self.state["signals"], self.state["signals_dropped"], limit, cursor,
+            lambda sig: (_matches(sig.get("asset"), asset) and _matches(sig.get("action"), action)
+                         and _in_range(signal_timestamp(sig), since, until)
+                         and (min_confidence is None or (sig.get("confidence") or 0.0) >= min_confidence))
+        )
 
-    def get_signals(self, limit=100):
-        return self.state.get("signals", [])[-limit:][::-1] # Newest first
+def create_state_manager():
+    """Builds the state backend selected by `state.backend` (json | sqlite)."""
+    backend = get_config("state.backend", "json")
+    events = event_log.EventLog.from_config() if get_config("events.enabled", True) else None
+    common = {
+        "event_log": events,
+        "max_processed_news": get_config("state.max_processed_news", 5000),
+        "processed_news_ttl_sec": get_config("state.processed_news_ttl_sec", 7 * 24 * 3600),
+        "max_commit_latency_sec": get_config("state.max_commit_latency_sec", 1.0),
+    }
+    if backend == "sqlite":
+        from src.utils.sqlite_state import SQLiteStateManager
+        return SQLiteStateManager(db_file=get_config("state.sqlite_path", "data/state.db"), **common)
+    if backend != "json":
+        logger.warning(f"Unknown state backend '{backend}', using json")
+    return StateManager(
+        state_file=get_config("state.path", "data/state.json"),
+        journal=get_config("state.journal", True),
+        snapshot_every=get_config("state.snapshot_every", 500),
+        **common
+    )
 
-# Global Instance
-_state_manager = StateManager()
+# Global Instance, created on first use so it picks up the loaded config
+_state_manager = None
+_state_manager_lock = threading.Lock()
 
 def get_state_manager():
+    global _state_manager
+    if _state_manager is None:
+        with _state_manager_lock:
+            if _state_manager is None:
+                _state_manager = create_state_manager()
     return _state_manager
@@ -34,12 +34,42 @@ st.markdown("", unsafe_allow_html=True)
 # --- HELPER FUNCTIONS ---
 
 from src.utils.state_manager import get_state_manager
+from src.utils.log_reader import LogReader
+from src.utils.event_log import EventLog, EventView
+from src.execution.ledger import value_positions
+
+HISTORY_LIMIT = 1000
+
+@st.cache_resource
+def get_event_log():
+    return EventLog.from_config()
 
 def load_state():
     try:
-        sm = get_state_manager()
-        sm.load_state() # Ensure we have latest from disk
-        return sm.state
+        # Kept current from the event log; the full state is only read on first load
+        # or when this session fell behind what the log retains
+        events = get_event_log()
+        view = st.session_state.get("event_view")
+        if view is None or view.needs_reset(events):
+            view = EventView(limit=HISTORY_LIMIT)
+            seq = events.last_seq()
+            view.reset(get_state_manager().snapshot(), seq)
+            st.session_state["event_view"] = view
+        while True:
+            batch = events.read_since(view.seq, limit=1000)
+            view.apply(batch)
+            if len(batch) < 1000:
+                break
+        # Order and signal history newest first
+        return {
+            "portfolio": view.portfolio,
+            # Marked at the prices of the bot's last tick
+            "valuation": value_positions(view.portfolio["cash"], view.portfolio["positions"], view.ledger,
+                                         view.marks.get("prices", {})),
+            "emergency_stop": view.emergency_stop,
+            "order_history": list(view.orders),
+            "signals": list(view.signals)
+        }
     except Exception as e:
         st.error(f"Error loading state: {e}")
         return {}
@@ -48,10 +78,8 @@ def load_logs(lines=100):
     try:
         if not os.path.exists("logs/trading.log"):
             return ["No logs found."]
-        with open("logs/trading.log", "r") as f:
-            # Read all lines and take last N
-            all_lines = f.readlines()
-            return all_lines[-lines:][::-1] # Reverse order
+        # Seeks back from the end; cost doesn't grow with the file
+        return [l + "\n" for l in LogReader("logs/trading.log").tail(lines)]
     except Exception as e:
         return [f"Error reading logs: {e}"]
 
@@ -76,10 +104,12 @@ page = st.sidebar.radio("NAVIGATION", ["DASHBOARD", "SIGNALS", "ORDERS", "LOGS",
 st.sidebar.markdown("---")
 
 # --- REFRESH LOGIC ---
-@st.fragment(run_every=30)
+@st.fragment(run_every=1)
 def auto_refresh():
-    """Triggers a rerun of the entire app every 30 seconds."""
-    st.rerun()
+    """Reruns the app when new events were published; a stat call otherwise."""
+    view = st.session_state.get("event_view")
+    if view is not None and get_event_log().last_seq() != view.seq:
+        st.rerun()
 
 auto_refresh()
 
@@ -87,6 +117,7 @@ auto_refresh()
 
 state = load_state()
 portfolio = state.get("portfolio", {})
+valuation = state.get("valuation", {})
 health = state.get("health", {}) # Assuming we might save health to state, or infer it
 orders_history = state.get("order_history", [])
 signals_history = state.get("signals", []) # If we saved signals to state.json
@@ -105,9 +136,9 @@ if page == "DASHBOARD":
     pos_count = len(portfolio.get("positions", {}))
     
     with col1:
-        st.metric("TOTAL CASH", f"${cash:,.2f}")
+        st.metric("TOTAL VALUE", f"${valuation.get('total_value', cash):,.2f}", f"${cash:,.2f} cash", delta_color="off")
     with col2:
-        st.metric("OPEN POSITIONS", str(pos_count))
+        st.metric("OPEN POSITIONS", str(pos_count), f"{valuation.get('unrealized_pnl', 0.0):+,.2f} unrealized")
     with col3:
         emergency = state.get("emergency_stop", False)
         status = "STOPPED" if emergency else "RUNNING"
@@ -120,16 +151,17 @@ if page == "DASHBOARD":
     
     # Active Positions
     st.subheader("ACTIVE POSITIONS")
-    positions = portfolio.get("positions", {})
+    positions = valuation.get("positions", [])
     if positions:
         # Convert to DF for nice table
         pos_data = []
-        for ticker, qty in positions.items():
+        for pos in positions:
             pos_data.append({
-                "TICKER": ticker,
-                "QTY": f"{qty:.4f}", # Handle float quantity
-                "AVG PRICE": "---", 
-                "CURRENT VALUE": "---" 
+                "TICKER": pos["symbol"],
+                "QTY": f"{pos['qty']:.4f}", # Handle float quantity
+                "AVG PRICE": f"{pos['avg_price']:,.2f}" if pos["avg_price"] else "---",
+                "CURRENT VALUE": f"{pos['market_value']:,.2f}",
+                "UNREALIZED P&L": f"{pos['unrealized_pnl']:+,.2f}"
             })
         st.dataframe(pd.DataFrame(pos_data), use_container_width=False)
     else:
@@ -141,7 +173,7 @@ if page == "DASHBOARD":
     st.subheader("RECENT ORDERS")
     if orders_history:
         # Show last 5
-        recent_orders = orders_history[-5:][::-1]
+        recent_orders = orders_history[:5]
         df_orders = pd.DataFrame(recent_orders)
         # Select/Rename cols if needed
         st.dataframe(df_orders, use_container_width=True, hide_index=True)
@@ -170,7 +202,7 @@ elif page == "SIGNALS":
 elif page == "ORDERS":
     st.title("ORDER HISTORY")
     if orders_history:
-        df_orders = pd.DataFrame(orders_history[::-1]) # Newest first
+        df_orders = pd.DataFrame(orders_history) # Newest first
         st.dataframe(df_orders, use_container_width=True, hide_index=True)
     else:
         st.info("No orders found.")
@@ -223,4 +255,4 @@ elif page == "SETTINGS":
     config_content = load_config_file()
     st.code(config_content, language="yaml")
 
-# Auto-refresh logic automated (occurs every 30s)
+# Auto-refresh logic automated (reruns on new events)
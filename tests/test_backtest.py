@@ -0,0 +1,79 @@
+import datetime
+import json
+import pandas as pd
+from src.analysis import extractor as extractor_module
+from src.backtest.data import PriceFeed, load_news
+from src.backtest.engine import BacktestEngine
+from src.backtest.state import InMemoryStateManager
+from src.models import NewsItem
+
+def bars():
+    days = pd.date_range("2026-01-01", periods=10, freq="D")
+    rows = [{"timestamp": d, "symbol": "AAPL", "close": 100.0 + i} for i, d in enumerate(days)]
+    rows += [{"timestamp": d, "symbol": "TSLA", "close": 200.0 - i} for i, d in enumerate(days) if i % 2 == 0]
+    return pd.DataFrame(rows)
+
+def test_price_feed_as_of_lookups():
+    feed = PriceFeed(bars())
+    t = datetime.datetime(2026, 1, 2, 12)
+    assert feed.price_at("AAPL", t) == 101.0
+    # TSLA has no bar on Jan 2; the Jan 1 close carries forward
+    assert feed.price_at("TSLA", t) == 200.0
+    assert feed.price_at("AAPL", datetime.datetime(2025, 12, 31)) is None
+    assert feed.price_at("MSFT", t) is None
+
+def test_backtest_runs_offline_and_reports(tmp_path, monkeypatch):
+    monkeypatch.setattr(extractor_module, "get_entities", lambda: {"Apple": "AAPL", "Tesla": "TSLA"})
+    archive = tmp_path / "news.jsonl"
+    with open(archive, "w") as f:
+        f.write(json.dumps({"id": "2", "title": "Tesla recall is a terrible, awful disaster",
+                            "published_at": "2026-01-03T15:00:00Z"}) + "\n")
+        f.write(json.dumps({"id": "1", "title": "Apple posts excellent, amazing results",
+                            "published_at": "2026-01-02T15:00:00Z"}) + "\n")
+
+    engine = BacktestEngine(PriceFeed(bars()), initial_cash=100000.0, hit_horizon=datetime.timedelta(days=2))
+    report = engine.run(load_news(str(archive)))
+
+    assert report.news_items == 2
+    assert report.signals == 2
+    # Bought AAPL at the Jan 2 close; the TSLA sell is rejected with no position to sell
+    assert report.orders == 1
+    fill = engine.state.get_orders(status="FILLED")[0]
+    assert fill["price"] == 101.0 and fill["timestamp"].startswith("2026-01-02T15:00")
+    assert report.positions["AAPL"] > 0
+    assert report.pnl > 0
+    assert report.hit_rate == 1.0
+    assert 0 < report.turnover < 1
+
+def test_in_memory_state_rolls_back_without_disk(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    state = InMemoryStateManager(1000.0)
+    try:
+        with state.transaction():
+            state.update_portfolio(0.0, {"AAPL": 1.0})
+            raise RuntimeError("rejected")
+    except RuntimeError:
+        pass
+    assert state.get_portfolio() == {"cash": 1000.0, "positions": {}}
+    assert list(tmp_path.iterdir()) == []
+
+def test_daily_loss_blocks_only_the_rest_of_the_simulated_day():
+    # AAPL collapses within Jan 2
+    bars = [("2026-01-02 09:00", 100.0), ("2026-01-02 14:00", 20.0), ("2026-01-03 09:00", 20.0)]
+    feed = PriceFeed(pd.DataFrame([{"timestamp": pd.Timestamp(t), "symbol": s, "close": c}
+                                   for t, close in bars for s, c in (("AAPL", close), ("TSLA", 200.0))]))
+    engine = BacktestEngine(feed, initial_cash=100000.0)
+    engine.risk_manager.risk_state.daily_loss_limit_pct = 2.0
+
+    news = []
+    for item_id, ticker, published_at in [("1", "AAPL", "2026-01-02T10:00:00Z"), ("2", "TSLA", "2026-01-02T15:00:00Z"),
+                                          ("3", "TSLA", "2026-01-03T10:00:00Z")]:
+        item = NewsItem(id=item_id, source="Test", title=item_id, url="", content="", published_at=published_at)
+        item.sentiment_score, item.entities = 0.9, [ticker]
+        news.append(item)
+    report = engine.replay(news)
+
+    # The crash blocks the afternoon TSLA buy; Jan 3 starts a new day and trades again
+    assert report.daily_loss_breaches == 1
+    assert [o["timestamp"][:13] for o in engine.state.get_orders(status="FILLED")] == ["2026-01-03T10", "2026-01-02T10"]
+    assert not engine.state.is_emergency_stop()
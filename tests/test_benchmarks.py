@@ -0,0 +1,26 @@
+from benchmarks.__main__ import main, run
+from benchmarks.harness import compare, save
+
+def result(**medians):
+    return {"scale": 1.0, "cases": {name: {"median_sec": value} for name, value in medians.items()}}
+
+def test_compare_flags_changes_beyond_threshold():
+    rows = compare(result(a=1.0, b=1.0, c=1.0, gone=1.0), result(a=1.05, b=1.2, c=0.5, added=1.0), threshold=0.1)
+    status = {row["case"]: row["status"] for row in rows}
+    assert status == {"a": "ok", "b": "regression", "c": "improvement", "gone": "missing", "added": "new"}
+
+def test_compare_command_exits_nonzero_on_regression(tmp_path, capsys):
+    base, slow, fast = tmp_path / "base.json", tmp_path / "slow.json", tmp_path / "fast.json"
+    save(result(x=1.0), str(base))
+    save(result(x=1.5), str(slow))
+    save(result(x=0.9), str(fast))
+    assert main(["compare", str(base), str(slow)]) == 1
+    assert "regression" in capsys.readouterr().out
+    assert main(["compare", str(base), str(fast), "--threshold", "0.2"]) == 0
+
+def test_run_times_selected_cases():
+    results = run(["signal.generate_signal", "state.order_exists"], scale=0.01, repeats=2, min_time=0.001)
+    assert set(results["cases"]) == {"signal.generate_signal", "state.order_exists"}
+    stats = results["cases"]["state.order_exists"]
+    assert 0 < stats["min_sec"] <= stats["median_sec"] <= stats["max_sec"]
+    assert results["environment"]["python"]
@@ -0,0 +1,58 @@
+from src.main import TradingBot
+from src.models import NewsItem, Signal
+from src.utils.state_manager import StateManager
+
+class FakeRiskManager:
+    def __init__(self, fail_batch_over=1):
+        self.fail_batch_over = fail_batch_over
+        self.batches = []
+
+    def evaluate_batch(self, signals):
+        self.batches.append([sig.id for sig in signals])
+        if len(signals) > self.fail_batch_over:
+            raise ValueError("bad batch")
+        return {}
+
+class FakeSignalEngine:
+    def generate_signal(self, item):
+        if item.id == "bad":
+            raise ValueError("bad item")
+        return [Signal(asset=item.entities[0], action="BUY", confidence=0.9, reasons=[], id=f"sig-{item.id}")]
+
+def make_bot(tmp_path, risk_manager=None):
+    bot = TradingBot.__new__(TradingBot)
+    bot.state_manager = StateManager(state_file=str(tmp_path / "state.json"))
+    bot.signal_engine = FakeSignalEngine()
+    bot.risk_manager = risk_manager or FakeRiskManager()
+    return bot
+
+def news(item_id, entity="AAPL"):
+    item = NewsItem(id=item_id, source="Test", title=item_id, content="", url=f"http://example.com/{item_id}",
+                    published_at="2026-03-02T14:00:00Z")
+    item.entities = [entity]
+    return item
+
+def test_batch_risk_failure_falls_back_to_per_item(tmp_path):
+    bot = make_bot(tmp_path)
+    items = [news("a"), news("m", "MSFT")]
+    bot.execute_items([(item, bot.signal_engine.generate_signal(item)) for item in items])
+
+    assert bot.risk_manager.batches == [["sig-a", "sig-m"], ["sig-a"], ["sig-m"]]
+    assert {"a", "m"} <= set(bot.state_manager.state["processed_news_ids"])
+    assert [s["id"] for s in bot.state_manager.state["signals"]] == ["sig-a", "sig-m"]
+
+def test_signal_failure_skips_only_that_item(tmp_path):
+    bot = make_bot(tmp_path)
+    pending = bot.generate_signals([news("a"), news("bad"), news("m", "MSFT")])
+
+    assert [item.id for item, _ in pending] == ["a", "m"]
+    assert "bad" in bot.state_manager.state["processed_news_ids"]
+
+def test_fallback_risk_runs_outside_the_item_transaction(tmp_path):
+    bot = make_bot(tmp_path)
+    in_txn = []
+    evaluate = bot.risk_manager.evaluate_batch
+    bot.risk_manager.evaluate_batch = lambda signals: in_txn.append(bot.state_manager._txn_depth) or evaluate(signals)
+    items = [news("a"), news("m", "MSFT")]
+    bot.execute_items([(item, bot.signal_engine.generate_signal(item)) for item in items])
+    assert in_txn == [0, 0, 0]
@@ -0,0 +1,37 @@
+from src.ingestion.dedup import NearDuplicateIndex, StoryDeduplicator
+from src.models import NewsItem
+
+WIRE = ("Apple shares rose 3% on Thursday after the iPhone maker reported record quarterly revenue "
+        "and raised its dividend, beating analyst expectations for services growth.")
+
+def item(id, source, title, content):
+    return NewsItem(id=id, source=source, title=title, url=f"https://{source}/{id}",
+                    published_at="2026-01-01T00:00:00", content=content)
+
+def test_syndicated_copies_collapse_to_first_story():
+    dedup = StoryDeduplicator()
+    items = [
+        item("a", "Reuters", "Apple posts record revenue, raises dividend", WIRE),
+        item("b", "Yahoo", "Apple posts record revenue, raises dividend", WIRE + " (Reporting by Staff)"),
+        item("c", "CNBC", "Tesla recalls 2 million vehicles", "Tesla is recalling vehicles over an autopilot defect."),
+    ]
+    unique, duplicates = dedup.split(items)
+    assert [i.id for i in unique] == ["a", "c"]
+    assert [i.id for i in duplicates] == ["b"]
+    assert items[0].duplicates == [{"id": "b", "source": "Yahoo", "url": "https://Yahoo/b",
+                                    "title": "Apple posts record revenue, raises dividend"}]
+
+    # A later fetch of another copy is matched against the index too
+    unique, duplicates = dedup.split([item("d", "MarketWatch", "Apple posts record revenue and raises dividend", WIRE)])
+    assert unique == [] and [i.id for i in duplicates] == ["d"]
+    assert [d["id"] for d in items[0].duplicates] == ["b", "d"]
+
+def test_stories_expire_after_window():
+    now = [1000.0]
+    index = NearDuplicateIndex(window_sec=60, clock=lambda: now[0])
+    first = item("a", "Reuters", "t", WIRE)
+    assert index.match_or_add("a", WIRE, first) is None
+    assert index.match_or_add("b", WIRE, item("b", "Yahoo", "t", WIRE)) is first
+    now[0] += 61
+    assert index.match_or_add("b", WIRE, item("b", "Yahoo", "t", WIRE)) is None
+    assert len(index) == 1
@@ -6,3 +6,36 @@ def test_entity_matching(tmp_path, monkeypatch):
     text = "Apple reports strong revenue in Q4"
     found = extractor.extract(text)
     assert "AAPL" in found
+
+def test_longest_alias_wins():
+    extractor = EntityExtractor(path="config/entities.yaml")
+    found = extractor.extract("Alphabet Inc. (Class A) shares rise")
+    assert found == ["GOOGL"]
+
+def test_matcher_respects_word_boundaries():
+    from src.analysis.matcher import AliasMatcher
+    matcher = AliasMatcher({"Gold": "GC=F", "Apple": "AAPL", "3M": "MMM"})
+    assert matcher.tickers("Golden Globes and pineapple prices") == []
+    assert matcher.tickers("GOLD jumps while 3M and Apple slip") == ["GC=F", "MMM", "AAPL"]
+
+def test_entity_cache_invalidated_when_map_changes(tmp_path, monkeypatch):
+    from src.analysis import extractor as extractor_module
+    from src.analysis.cache import AnalysisCache
+    cache = AnalysisCache(path=str(tmp_path / "cache.db"))
+
+    monkeypatch.setattr(extractor_module, "get_entities", lambda: {"Apple": "AAPL"})
+    assert extractor_module.EntityExtractor(cache=cache).extract("Apple rallies") == ["AAPL"]
+
+    monkeypatch.setattr(extractor_module, "get_entities", lambda: {"Apple": "APPLE"})
+    assert extractor_module.EntityExtractor(cache=cache).extract("Apple rallies") == ["APPLE"]
+    cache.close()
+
+def test_path_extractor_uses_the_analysis_cache(tmp_path):
+    from src.analysis.cache import AnalysisCache
+    cache = AnalysisCache(path=str(tmp_path / "cache.db"))
+    extractor = EntityExtractor(path="config/entities.yaml", cache=cache)
+    assert extractor.extract("Apple rallies") == ["AAPL"]
+
+    extractor.matcher = None  # a second extract of the same text must not match again
+    assert extractor.extract("Apple rallies") == ["AAPL"]
+    cache.close()
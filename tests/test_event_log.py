@@ -0,0 +1,88 @@
+import pytest
+from src.utils.event_log import EventLog, EventView, ORDER, PORTFOLIO, SIGNAL
+from src.utils.sqlite_state import SQLiteStateManager
+from src.utils.state_manager import StateManager
+
+def make_log(tmp_path, **kwargs):
+    return EventLog(path=str(tmp_path / "events.jsonl"), **kwargs)
+
+@pytest.fixture(params=["json", "sqlite"])
+def backend(request, tmp_path):
+    events = make_log(tmp_path)
+    if request.param == "json":
+        return StateManager(state_file=str(tmp_path / "state.json"), event_log=events)
+    return SQLiteStateManager(db_file=str(tmp_path / "state.db"), event_log=events)
+
+def test_sequence_continues_across_writers(tmp_path):
+    first, second = make_log(tmp_path), make_log(tmp_path)
+    first.publish([(SIGNAL, {"id": "s1"}), (SIGNAL, {"id": "s2"})])
+    second.publish([(ORDER, {"order_id": "o1"})])
+    first.publish([(ORDER, {"order_id": "o2"})])
+
+    events = make_log(tmp_path).read_since(0)
+    assert [e["seq"] for e in events] == [1, 2, 3, 4]
+    assert first.last_seq() == second.last_seq() == 4
+    assert [e["data"].get("order_id") for e in first.read_since(2)] == ["o1", "o2"]
+
+def test_read_since_seeks_into_large_log(tmp_path):
+    log = make_log(tmp_path)
+    log.publish([(SIGNAL, {"id": f"s{i}", "reasons": ["x" * 50]}) for i in range(5000)])
+
+    assert [e["seq"] for e in log.read_since(4321, limit=3)] == [4322, 4323, 4324]
+    assert log.read_since(5000) == []
+    assert len(log.read_since(0, limit=10)) == 10
+
+def test_truncation_keeps_newest_and_flags_lagging_readers(tmp_path):
+    log = make_log(tmp_path, max_bytes=20000, retain_bytes=5000)
+    view = EventView()
+    view.reset({"portfolio": {"cash": 0.0, "positions": {}}, "order_history": [], "signals": []}, 0)
+    for i in range(400):
+        log.publish([(SIGNAL, {"id": f"s{i}"})])
+
+    assert log.last_seq() == 400
+    assert log.first_seq() > 1
+    assert log.read_since(log.first_seq() - 1)[0]["seq"] == log.first_seq()
+    assert view.needs_reset(log)
+
+def test_backends_publish_committed_changes(backend):
+    backend.add_signal({"id": "s1", "asset": "AAPL", "action": "BUY"})
+    backend.add_signal({"id": "s1", "asset": "AAPL", "action": "BUY"})
+    backend.mark_news_processed("n1")
+    backend.add_order({"order_id": "o1", "symbol": "AAPL", "status": "PENDING"})
+    backend.update_order("o1", {"status": "FILLED"})
+    backend.update_portfolio(90000.0, {"AAPL": 5.0})
+    backend.set_emergency_stop(True)
+
+    events = backend.event_log.read_since(0)
+    assert [e["type"] for e in events] == ["signal", "order", "order_update", "portfolio", "emergency_stop"]
+    assert events[2]["data"] == {"order_id": "o1", "fields": {"status": "FILLED"}}
+
+def test_rolled_back_transaction_publishes_nothing(backend):
+    with pytest.raises(RuntimeError):
+        with backend.transaction():
+            backend.add_order({"order_id": "o1", "status": "FILLED"})
+            backend.update_portfolio(90000.0, {"AAPL": 5.0})
+            raise RuntimeError("broker failed")
+    with backend.transaction():
+        backend.add_order({"order_id": "o2", "status": "FILLED"})
+        backend.update_portfolio(80000.0, {"MSFT": 1.0})
+
+    events = backend.event_log.read_since(0)
+    assert [(e["seq"], e["type"]) for e in events] == [(1, ORDER), (2, PORTFOLIO)]
+    assert events[0]["data"]["order_id"] == "o2"
+
+def test_view_applies_deltas_over_snapshot(backend):
+    backend.add_order({"order_id": "o1", "symbol": "AAPL", "status": "PENDING"})
+    view = EventView(limit=2)
+    view.reset(backend.snapshot(), 0)  # snapshot already includes event 1
+
+    backend.update_order("o1", {"status": "FILLED"})
+    backend.add_order({"order_id": "o2", "symbol": "MSFT", "status": "FILLED"})
+    backend.add_order({"order_id": "o3", "symbol": "TSLA", "status": "FILLED"})
+    backend.update_portfolio(90000.0, {"AAPL": 5.0})
+
+    assert view.apply(backend.event_log.read_since(view.seq)) == 4
+    assert [o["order_id"] for o in view.orders] == ["o3", "o2"]
+    assert view.portfolio == {"cash": 90000.0, "positions": {"AAPL": 5.0}}
+    assert view.seq == backend.event_log.last_seq()
+    assert view.apply(backend.event_log.read_since(0)) == 0
@@ -0,0 +1,111 @@
+import pytest
+from src.execution.broker import Broker
+from src.execution.ledger import PositionLedger
+from src.execution.risk_manager import RiskManager
+from src.models import Signal, TradeOrder
+from src.utils.sqlite_state import SQLiteStateManager
+from src.utils.state_manager import StateManager
+
+class FakeMarketData:
+    def __init__(self, prices):
+        self.prices = prices
+        self.batches = []
+
+    def get_current_price(self, symbol):
+        return self.prices.get(symbol)
+
+    def get_prices(self, symbols):
+        self.batches.append(list(symbols))
+        return {s: self.prices[s] for s in symbols if s in self.prices}
+
+@pytest.fixture(params=["json", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "json":
+        return StateManager(state_file=str(tmp_path / "state.json"))
+    return SQLiteStateManager(db_file=str(tmp_path / "state.db"))
+
+def paper_broker(state, market_data):
+    broker = Broker(state_manager=state, mode="paper", dry_run=False)
+    broker.set_market_data(market_data)
+    return broker
+
+def test_fills_update_cost_basis_fifo(backend):
+    ledger = PositionLedger(backend)
+    ledger.apply_fill("AAPL", "BUY", 10, 100.0)
+    ledger.apply_fill("AAPL", "BUY", 10, 120.0, held=10)
+    assert backend.get_ledger()["AAPL"]["avg_cost"] == pytest.approx(110.0)
+
+    realized = ledger.apply_fill("AAPL", "SELL", 15, 130.0, held=20)
+    entry = backend.get_ledger()["AAPL"]
+    assert realized == pytest.approx(10 * 30.0 + 5 * 10.0)
+    assert entry["qty"] == pytest.approx(5) and entry["avg_cost"] == pytest.approx(120.0)
+    assert [lot["qty"] for lot in entry["lots"]] == pytest.approx([5])
+
+    ledger.apply_fill("AAPL", "SELL", 5, 110.0, held=5)
+    entry = backend.get_ledger()["AAPL"]
+    assert entry["qty"] == 0 and entry["lots"] == []
+    assert entry["realized_pnl"] == pytest.approx(350.0 - 50.0)
+
+def test_untracked_holdings_are_taken_on_at_fill_price(backend):
+    ledger = PositionLedger(backend)
+    ledger.apply_fill("MSFT", "BUY", 2, 50.0, held=3)
+    entry = backend.get_ledger()["MSFT"]
+    assert entry["qty"] == 5 and entry["avg_cost"] == pytest.approx(50.0)
+
+def test_paper_fills_and_marks_drive_valuation(backend):
+    market = FakeMarketData({"AAPL": 100.0, "MSFT": 200.0})
+    broker = paper_broker(backend, market)
+    assert broker.execute(TradeOrder(symbol="AAPL", action="BUY", quantity=10, order_id="o1"))
+    assert broker.execute(TradeOrder(symbol="MSFT", action="BUY", quantity=5, order_id="o2"))
+    market.prices.update(AAPL=110.0, MSFT=190.0)
+    assert broker.execute(TradeOrder(symbol="AAPL", action="SELL", quantity=4, order_id="o3"))
+    assert backend.get_order("o3")["realized_pnl"] == pytest.approx(40.0)
+
+    ledger = PositionLedger(backend)
+    valuation = ledger.mark(market)
+    assert market.batches[-1] == ["AAPL", "MSFT"]
+    assert valuation["unrealized_pnl"] == pytest.approx(6 * 10.0 - 5 * 10.0)
+    assert valuation["total_value"] == pytest.approx(backend.get_portfolio()["cash"] + 6 * 110.0 + 5 * 190.0)
+    # Readers value from the stored marks without touching market data
+    assert ledger.valuation() == valuation
+    rows = {row["symbol"]: row for row in valuation["positions"]}
+    assert rows["AAPL"]["avg_price"] == pytest.approx(100.0) and rows["AAPL"]["realized_pnl"] == pytest.approx(40.0)
+
+def test_risk_sizes_from_marked_equity(tmp_path):
+    state = StateManager(state_file=str(tmp_path / "state.json"))
+    state.update_portfolio(20000.0, {"AAPL": 800.0})
+    market = FakeMarketData({"AAPL": 100.0, "MSFT": 50.0})
+    PositionLedger(state).mark(market)
+    risk = RiskManager(state_manager=state)
+    risk.set_market_data(market)
+
+    result = risk.evaluate(Signal(asset="MSFT", action="BUY", confidence=0.9, reasons=[]), state.get_portfolio())
+    # 0.5% risk at a 5% stop is 10% of the 100k equity, not of the 20k cash
+    assert result["allow"] and result["quantity"] == pytest.approx(10000.0 / 50.0)
+
+def test_missing_prices_keep_last_mark(backend):
+    backend.update_portfolio(1000.0, {"AAPL": 10.0, "MSFT": 5.0, "OLD": 2.0})
+    ledger = PositionLedger(backend)
+    ledger.apply_fill("MSFT", "BUY", 5, 180.0)
+    market = FakeMarketData({"AAPL": 100.0, "MSFT": 200.0, "OLD": 30.0})
+    ledger.mark(market)
+
+    # A failed fetch keeps the previous marks instead of dropping them
+    market.prices = {"AAPL": 105.0}
+    valuation = ledger.mark(market)
+    assert backend.get_marks()["prices"] == {"AAPL": 105.0, "MSFT": 200.0, "OLD": 30.0}
+    assert valuation["market_value"] == pytest.approx(10 * 105.0 + 5 * 200.0 + 2 * 30.0)
+
+def test_unpriced_position_is_carried_at_ledger_cost(backend):
+    backend.update_portfolio(1000.0, {"MSFT": 8.0})
+    PositionLedger(backend).apply_fill("MSFT", "BUY", 5, 180.0)
+    # Ledger quantity out of step with the portfolio: no P&L, but still valued at cost rather than 0
+    valuation = PositionLedger(backend).mark(FakeMarketData({}))
+    assert valuation["market_value"] == pytest.approx(8 * 180.0)
+
+def test_position_with_no_price_or_cost_is_flagged_stale(backend):
+    backend.update_portfolio(1000.0, {"AAPL": 10.0, "OLD": 2.0})
+    valuation = PositionLedger(backend).mark(FakeMarketData({"AAPL": 100.0}))
+    assert valuation["stale"] == ["OLD"]
+    assert [row["stale"] for row in valuation["positions"]] == [False, True]
+    assert valuation["total_value"] == pytest.approx(1000.0 + 10 * 100.0)
@@ -0,0 +1,24 @@
+import time
+from benchmarks.loadgen import SyntheticFeedServer
+from src.ingestion.news_fetcher import NewsFetcher
+
+def test_synthetic_feeds_parse_and_honour_etags(monkeypatch):
+    server = SyntheticFeedServer(rate=200.0, feeds=2, window=50, entities={"Apple": "AAPL", "Tesla": "TSLA"}).start()
+    try:
+        time.sleep(0.1)
+        fetcher = NewsFetcher()
+        processed = set()
+        monkeypatch.setattr(fetcher.state_manager, "is_news_processed", lambda news_id: news_id in processed)
+        items = fetcher.fetch_feed(server.sources()[0]["url"], "Synthetic 0")
+        assert items
+        assert all(server.published_at(item.id) is not None for item in items)
+        # Newest first, as real feeds list them
+        assert items[0].published_at >= items[-1].published_at
+
+        # Nothing new since the last poll, and everything processed: the conditional GET gets a 304
+        server.rate = 0.0
+        processed.update(item.id for item in items)
+        assert fetcher.fetch_feed(server.sources()[0]["url"], "Synthetic 0") == []
+        assert server.generated >= len(items)
+    finally:
+        server.stop()
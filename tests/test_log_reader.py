@@ -0,0 +1,69 @@
+import json
+from src.utils.log_reader import LogReader
+
+def write_log(path, n):
+    levels = ["INFO", "WARNING", "ERROR"]
+    with open(path, "w") as f:
+        for i in range(n):
+            f.write(json.dumps({
+                "timestamp": f"2026-01-01T00:{i // 60:02d}:{i % 60:02d}",
+                "level": levels[i % 3],
+                "logger": "RiskManager" if i % 2 else "TradingBot",
+                "message": f"event {i}"
+            }) + "\n")
+
+def messages(page):
+    return [r["message"] for r in page["items"]]
+
+def test_tail_reads_newest_first_across_blocks(tmp_path):
+    path = tmp_path / "trading.log"
+    write_log(path, 500)
+    reader = LogReader(str(path), block_size=128)
+    assert messages(reader.query(limit=3)) == ["event 499", "event 498", "event 497"]
+    assert len(reader.tail(10)) == 10
+
+def test_cursor_pagination_covers_every_record_once(tmp_path):
+    path = tmp_path / "trading.log"
+    write_log(path, 250)
+    reader = LogReader(str(path), block_size=100)
+    seen, cursor = [], None
+    while True:
+        page = reader.query(limit=40, cursor=cursor)
+        seen.extend(messages(page))
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"event {i}" for i in reversed(range(250))]
+
+def test_filters_and_time_range(tmp_path):
+    path = tmp_path / "trading.log"
+    write_log(path, 600)
+    reader = LogReader(str(path), block_size=256)
+    page = reader.query(limit=5, level="ERROR", logger_name="RiskManager",
+                        since="2026-01-01T00:01:00", until="2026-01-01T00:02:00")
+    # ERROR is every 3rd record, RiskManager every odd one
+    assert messages(page) == ["event 119", "event 113", "event 107", "event 101", "event 95"]
+    assert all(r["level"] == "ERROR" for r in page["items"])
+    assert messages(reader.query(limit=50, level="warning", since="2026-01-01T00:09:55")) == [
+        "event 599", "event 598", "event 596", "event 595"]
+
+def test_torn_and_foreign_lines_are_skipped(tmp_path):
+    path = tmp_path / "trading.log"
+    write_log(path, 3)
+    with open(path, "a") as f:
+        f.write('{"timestamp": "2026-01-01T00:00:03", "lev')
+    assert messages(LogReader(str(path)).query(limit=5)) == ["event 2", "event 1", "event 0"]
+
+def test_scan_budget_smaller_than_two_lines_skips_nothing(tmp_path):
+    path = tmp_path / "trading.log"
+    write_log(path, 30)
+    for budget in (150, 10):
+        reader = LogReader(str(path), block_size=64, max_scan_bytes=budget)
+        seen, cursor = [], None
+        while True:
+            page = reader.query(limit=5, level="ERROR", cursor=cursor)
+            seen.extend(messages(page))
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == [f"event {i}" for i in reversed(range(30)) if i % 3 == 2]
@@ -0,0 +1,65 @@
+import json
+import logging
+import queue
+import pytest
+from src.utils.logger import BoundedQueueHandler, setup_logger, stop_logging
+
+def record(msg, level=logging.INFO):
+    return logging.makeLogRecord({"name": "t", "levelno": level, "levelname": logging.getLevelName(level),
+                                  "msg": msg})
+
+def test_async_logger_writes_json_from_background_thread(tmp_path):
+    log_file = tmp_path / "trading.log"
+    log = setup_logger("async-test", log_file=str(log_file), async_mode=True, queue_size=100)
+    try:
+        log.info("tick %d done", 7)
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            log.exception("failed")
+    finally:
+        stop_logging()
+        for handler in list(log.handlers):
+            log.removeHandler(handler)
+
+    lines = [json.loads(l) for l in log_file.read_text().splitlines()]
+    assert [l["message"] for l in lines] == ["tick 7 done", "failed"]
+    assert "RuntimeError: boom" in lines[1]["exc_info"]
+    assert lines[0]["host"] and lines[0]["pid"]
+
+def test_drop_new_keeps_oldest_and_reports_drops():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2), overflow="drop_new")
+    for i in range(4):
+        handler.emit(record(f"m{i}"))
+    assert handler.dropped == 2
+
+    handler.queue.get_nowait()
+    handler.queue.get_nowait()
+    handler.emit(record("m4"))
+    msgs = [handler.queue.get_nowait().msg for _ in range(2)]
+    assert msgs == ["m4", "Log queue full, dropped 2 records"]
+    assert handler.dropped == 0
+
+def test_drop_oldest_keeps_newest():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2), overflow="drop_oldest")
+    for i in range(4):
+        handler.emit(record(f"m{i}"))
+    assert [handler.queue.get_nowait().msg for _ in range(2)] == ["m2", "m3"]
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        BoundedQueueHandler(queue.Queue(maxsize=1), overflow="spill")
+
+def test_drop_oldest_never_evicts_warnings_or_errors():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=3), overflow="drop_oldest")
+    handler.emit(record("e0", logging.ERROR))
+    handler.emit(record("m1"))
+    handler.emit(record("w2", logging.WARNING))
+    handler.emit(record("m3"))
+    assert [r.msg for r in handler.queue.queue] == ["e0", "w2", "m3"]
+
+    # Nothing left below WARNING to evict: the new record is dropped instead
+    handler.queue.queue[2] = record("c3", logging.CRITICAL)
+    handler.emit(record("m4"))
+    assert [r.msg for r in handler.queue.queue] == ["e0", "w2", "c3"]
+    assert handler.dropped == 2
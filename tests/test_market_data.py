@@ -0,0 +1,58 @@
+import threading
+import time
+from src.ingestion.market_data import MarketDataFetcher
+
+def test_prices_are_cached_until_ttl(monkeypatch):
+    calls = []
+    fetcher = MarketDataFetcher()
+    monkeypatch.setattr(fetcher, "_fetch_price", lambda sym: calls.append(sym) or 100.0)
+
+    assert fetcher.get_current_price("AAPL") == 100.0
+    assert fetcher.get_current_price("AAPL") == 100.0
+    assert calls == ["AAPL"]
+
+    fetcher.ttl_sec = 0
+    fetcher._cache["AAPL"].fetched_at -= 1
+    fetcher.get_current_price("AAPL")
+    assert calls == ["AAPL", "AAPL"]
+
+def test_failed_refresh_returns_stale_quote(monkeypatch):
+    fetcher = MarketDataFetcher()
+    monkeypatch.setattr(fetcher, "_fetch_price", lambda sym: 50.0)
+    fetcher.get_quote("MSFT")
+    fetcher._cache["MSFT"].fetched_at -= fetcher.ttl_sec + 1
+
+    monkeypatch.setattr(fetcher, "_fetch_price", lambda sym: None)
+    quote = fetcher.get_quote("MSFT")
+    assert quote.price == 50.0 and quote.stale
+
+def test_prefetch_batches_and_skips_fresh_symbols(monkeypatch):
+    batches = []
+    fetcher = MarketDataFetcher()
+    monkeypatch.setattr(fetcher, "_fetch_prices", lambda syms: batches.append(list(syms)) or {s: 10.0 for s in syms})
+    monkeypatch.setattr(fetcher, "_fetch_price", lambda sym: 10.0)
+
+    fetcher.get_current_price("AAPL")
+    fetcher.prefetch(["AAPL", "MSFT", "NVDA", "MSFT"])
+    assert batches == [["MSFT", "NVDA"]]
+    assert fetcher.get_prices(["MSFT", "NVDA"]) == {"MSFT": 10.0, "NVDA": 10.0}
+    assert len(batches) == 1
+
+def test_concurrent_requests_are_coalesced(monkeypatch):
+    calls = []
+
+    def slow_fetch(sym):
+        calls.append(sym)
+        time.sleep(0.1)
+        return 42.0
+
+    fetcher = MarketDataFetcher()
+    monkeypatch.setattr(fetcher, "_fetch_price", slow_fetch)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fetcher.get_current_price("TSLA"))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [42.0] * 5
+    assert calls == ["TSLA"]
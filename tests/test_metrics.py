@@ -0,0 +1,49 @@
+import pytest
+from src.infra.metrics import Registry, render_exported
+
+def test_render_prometheus_text():
+    registry = Registry()
+    fetches = registry.counter("feed_fetch_errors_total", "Feed fetches that failed", ["source"])
+    depth = registry.gauge("pipeline_queue_depth", "Queued items", ["stage"])
+    latency = registry.histogram("price_fetch_seconds", "Price fetch time", buckets=(0.1, 1.0))
+
+    fetches.inc(source="CNBC")
+    fetches.inc(2, source="CNBC")
+    depth.set(7, stage="analyze")
+    for value in (0.05, 0.5, 3.0):
+        latency.observe(value)
+
+    text = registry.render()
+    assert '# TYPE feed_fetch_errors_total counter' in text
+    assert 'feed_fetch_errors_total{source="CNBC"} 3' in text
+    assert 'pipeline_queue_depth{stage="analyze"} 7' in text
+    assert 'price_fetch_seconds_bucket{le="0.1"} 1' in text
+    assert 'price_fetch_seconds_bucket{le="1.0"} 2' in text
+    assert 'price_fetch_seconds_bucket{le="+Inf"} 3' in text
+    assert 'price_fetch_seconds_count 3' in text
+
+def test_histogram_timer_records_failures_too():
+    latency = Registry().histogram("order_execution_seconds", "Order time", ["mode"])
+    with pytest.raises(RuntimeError):
+        with latency.time(mode="paper"):
+            raise RuntimeError("broker down")
+    assert latency.count(mode="paper") == 1
+
+def test_labels_and_types_are_checked():
+    registry = Registry()
+    commits = registry.counter("state_commits_total", "Commits", ["backend"])
+    assert registry.counter("state_commits_total", "Commits", ["backend"]) is commits
+    with pytest.raises(ValueError):
+        commits.inc(store="json")
+    with pytest.raises(ValueError):
+        registry.gauge("state_commits_total", "Commits", ["backend"])
+
+def test_textfile_is_served_with_its_age(tmp_path):
+    registry = Registry()
+    registry.counter("tick_overruns_total", "Overruns", ["runner"]).inc(runner="loop")
+    path = tmp_path / "metrics.prom"
+    registry.write_textfile(str(path))
+
+    text = render_exported(str(path))
+    assert 'tick_overruns_total{runner="loop"} 1' in text
+    assert "metrics_textfile_age_seconds" in text
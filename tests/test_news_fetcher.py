@@ -0,0 +1,98 @@
+from src.ingestion import news_fetcher
+from src.ingestion.news_fetcher import NewsFetcher
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Test</title>
+<item><title>Apple beats estimates</title><link>http://example.com/a</link><description>Strong quarter</description></item>
+</channel></rss>"""
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+def test_conditional_get_skips_unchanged_feed(monkeypatch):
+    sent_headers = []
+
+    def fake_get(url, headers=None, timeout=None):
+        sent_headers.append(headers)
+        if headers.get("If-None-Match") == '"v1"':
+            return FakeResponse(304)
+        return FakeResponse(200, RSS, {"ETag": '"v1"', "Last-Modified": "Mon, 09 Feb 2026 00:00:00 GMT"})
+
+    monkeypatch.setattr(news_fetcher.requests, "get", fake_get)
+    fetcher = NewsFetcher()
+    processed = set()
+    monkeypatch.setattr(fetcher.state_manager, "is_news_processed", lambda news_id: news_id in processed)
+
+    first = fetcher.fetch_feed("http://example.com/rss", "Test")
+    assert [i.title for i in first] == ["Apple beats estimates"]
+    processed.update(i.id for i in first)
+
+    second = fetcher.fetch_feed("http://example.com/rss", "Test")
+    assert second == []
+    assert sent_headers[1]["If-None-Match"] == '"v1"'
+    assert sent_headers[1]["If-Modified-Since"] == "Mon, 09 Feb 2026 00:00:00 GMT"
+
+def test_fetch_all_isolates_failing_feed(monkeypatch):
+    def fake_get(url, headers=None, timeout=None):
+        if "bad" in url:
+            return FakeResponse(500)
+        return FakeResponse(200, RSS)
+
+    monkeypatch.setattr(news_fetcher.requests, "get", fake_get)
+    fetcher = NewsFetcher()
+    fetcher.sources = [
+        {"name": "Good", "url": "http://good.example.com/rss"},
+        {"name": "Bad", "url": "http://bad.example.com/rss"},
+    ]
+    monkeypatch.setattr(fetcher.state_manager, "is_news_processed", lambda news_id: False)
+
+    items = fetcher.fetch_all()
+    assert [i.source for i in items] == ["Good"]
+
+def test_fetch_all_only_polls_due_feeds(monkeypatch):
+    polled = []
+
+    def fake_get(url, headers=None, timeout=None):
+        polled.append(url)
+        return FakeResponse(200, RSS)
+
+    monkeypatch.setattr(news_fetcher.requests, "get", fake_get)
+    fetcher = NewsFetcher()
+    fetcher.sources = [{"name": "Good", "url": "http://good.example.com/rss"}]
+    monkeypatch.setattr(fetcher.state_manager, "is_news_processed", lambda news_id: False)
+
+    fetcher.fetch_all()
+    fetcher.fetch_all()
+    assert polled == ["http://good.example.com/rss"]
+    assert fetcher.seconds_until_due() > 0
+
+def test_validators_wait_until_items_are_processed(monkeypatch):
+    sent_headers = []
+
+    def fake_get(url, headers=None, timeout=None):
+        sent_headers.append(headers)
+        if headers.get("If-None-Match") == '"v1"':
+            return FakeResponse(304)
+        return FakeResponse(200, RSS, {"ETag": '"v1"'})
+
+    monkeypatch.setattr(news_fetcher.requests, "get", fake_get)
+    fetcher = NewsFetcher()
+    processed = set()
+    monkeypatch.setattr(fetcher.state_manager, "is_news_processed", lambda news_id: news_id in processed)
+
+    first = fetcher.fetch_feed("http://example.com/rss", "Test")
+    # The tick that got the item failed before marking it: the feed is fetched in full again
+    again = fetcher.fetch_feed("http://example.com/rss", "Test")
+    assert "If-None-Match" not in sent_headers[1]
+    assert [i.id for i in again] == [i.id for i in first]
+
+    processed.update(i.id for i in again)
+    assert fetcher.fetch_feed("http://example.com/rss", "Test") == []
+    assert sent_headers[2]["If-None-Match"] == '"v1"'
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from src.models import NewsItem
+from src.pipeline import PipelineRunner
+
+class FakeBot:
+    def __init__(self, feeds, fetch_delay=0.0):
+        self.running = True
+        self.feeds = feeds
+        self.fetch_delay = fetch_delay
+        self.executed = []
+        self.execute_threads = set()
+        self.news_fetcher = SimpleNamespace(sources=list(feeds), fetch_source=self.fetch_source,
+                                            due_sources=lambda: list(feeds), seconds_until_due=lambda: None)
+        self.signal_engine = SimpleNamespace(generate_signal=lambda item: [])
+
+    def fetch_source(self, source):
+        time.sleep(self.fetch_delay)
+        return [NewsItem(id=i, source=source, title=i, url="", published_at="", content="") for i in self.feeds[source]]
+
+    def analyze_items(self, items):
+        for item in items:
+            item.sentiment_score = 0.1
+
+    def generate_signals(self, items):
+        return [(item, self.signal_engine.generate_signal(item)) for item in items]
+
+    def prefetch_and_mark(self, pending):
+        pass
+
+    def execute_items(self, pending):
+        self.execute_threads.add(threading.get_ident())
+        self.executed.extend(item.id for item, _ in pending)
+
+    def export_metrics(self):
+        pass
+
+    def shutdown(self):
+        self.running = False
+
+def run_one_tick(runner):
+    async def main():
+        runner._start_stages()
+        runner._stop = asyncio.Event()
+        await runner.run_tick()
+        for stage in runner.stages:
+            await stage.stop()
+    asyncio.run(main())
+
+def test_tick_drains_every_item_through_all_stages():
+    bot = FakeBot({"a": ["1", "2", "3"], "b": ["3", "4"], "c": [str(i) for i in range(5, 60)]})
+    runner = PipelineRunner(bot)
+    run_one_tick(runner)
+    assert sorted(bot.executed, key=int) == [str(i) for i in range(1, 60)]
+    # Risk/execution is single-worker
+    assert len(bot.execute_threads) == 1
+
+def test_feeds_are_fetched_concurrently():
+    bot = FakeBot({name: [name] for name in "abcd"}, fetch_delay=0.2)
+    runner = PipelineRunner(bot)
+    started = time.monotonic()
+    run_one_tick(runner)
+    assert time.monotonic() - started < 0.6
+    assert sorted(bot.executed) == list("abcd")
+
+def test_ticks_follow_a_fixed_schedule(monkeypatch):
+    bot = FakeBot({"a": []})
+    runner = PipelineRunner(bot)
+    runner.interval = 0.2
+    starts = []
+
+    async def slow_tick():
+        starts.append(time.monotonic())
+        await asyncio.sleep(0.1)
+        if len(starts) == 4:
+            runner._stop.set()
+    monkeypatch.setattr(runner, "run_tick", slow_tick)
+    runner.run()
+
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    # 0.2s apart from start to start, not 0.1s of work plus 0.2s of sleep
+    assert all(0.15 < gap < 0.27 for gap in gaps)
+    assert not bot.running
@@ -0,0 +1,54 @@
+from src.execution.risk_manager import RiskManager
+from src.models import Signal
+from src.utils.state_manager import StateManager
+
+class CountingMarketData:
+    def __init__(self, prices):
+        self.prices = prices
+        self.calls = []
+
+    def get_current_price(self, symbol):
+        self.calls.append([symbol])
+        return self.prices.get(symbol)
+
+    def get_prices(self, symbols):
+        self.calls.append(list(symbols))
+        return {s: self.prices[s] for s in symbols if s in self.prices}
+
+def make_risk(tmp_path, cash=100000.0, positions=None, max_open_trades=5):
+    state = StateManager(state_file=str(tmp_path / "state.json"))
+    state.update_portfolio(cash, positions or {})
+    risk = RiskManager(state_manager=state)
+    risk.risk_state.max_open_trades = max_open_trades
+    market = CountingMarketData({"AAPL": 100.0, "MSFT": 200.0, "NVDA": 50.0, "TSLA": 250.0})
+    risk.set_market_data(market)
+    risk.mark()
+    market.calls.clear()
+    return risk, market
+
+def signal(signal_id, asset, confidence, action="BUY"):
+    return Signal(asset=asset, action=action, confidence=confidence, reasons=[], id=signal_id)
+
+def test_batch_prices_once_and_allocates_by_confidence(tmp_path):
+    signals = [signal("a", "AAPL", 0.6), signal("m", "MSFT", 0.9), signal("n", "NVDA", 0.75)]
+    risk, market = make_risk(tmp_path, max_open_trades=2)
+
+    orders = risk.evaluate_batch(signals)
+    assert market.calls == [["AAPL", "MSFT", "NVDA"]]
+    assert sorted(orders) == ["m", "n"]
+    assert orders["m"].quantity == 10000.0 / 200.0
+
+    # Same outcome whatever order the signals arrive in
+    again, _ = make_risk(tmp_path / "again", max_open_trades=2)
+    assert sorted(again.evaluate_batch(signals[::-1])) == ["m", "n"]
+
+def test_cash_is_shared_across_the_batch(tmp_path):
+    # 100k equity, but cash for only one 10k position (plus fee buffer)
+    risk, _ = make_risk(tmp_path, cash=15000.0, positions={"TSLA": 340.0})
+    orders = risk.evaluate_batch([signal("a", "AAPL", 0.6), signal("m", "MSFT", 0.8)])
+    assert list(orders) == ["m"]
+
+def test_one_order_per_asset(tmp_path):
+    risk, _ = make_risk(tmp_path)
+    orders = risk.evaluate_batch([signal("weak", "AAPL", 0.6), signal("strong", "AAPL", 0.95, action="SELL")])
+    assert list(orders) == ["strong"] and orders["strong"].action == "SELL"
@@ -0,0 +1,148 @@
+import datetime
+import threading
+import pytest
+from src.execution.broker import Broker
+from src.execution.risk_manager import RiskManager
+from src.execution.risk_state import RiskState
+from src.models import Signal, TradeOrder
+from src.utils.state_manager import StateManager
+
+class FakeMarketData:
+    def __init__(self, prices):
+        self.prices = prices
+
+    def get_current_price(self, symbol):
+        return self.prices.get(symbol)
+
+    def get_prices(self, symbols):
+        return {s: self.prices[s] for s in symbols if s in self.prices}
+
+class Clock:
+    def __init__(self):
+        self.now = datetime.datetime(2026, 3, 2, 14, 0)
+
+    def __call__(self):
+        return self.now
+
+def setup(tmp_path, prices, clock, **config):
+    state = StateManager(state_file=str(tmp_path / "state.json"))
+    market = FakeMarketData(prices)
+    risk = RiskManager(state_manager=state, clock=clock)
+    risk.risk_state.__dict__.update(config)
+    risk.set_market_data(market)
+    broker = Broker(state_manager=state, mode="paper", dry_run=False)
+    broker.set_market_data(market)
+    broker.set_risk_state(risk.risk_state)
+    # As the first tick would, before any trading
+    risk.mark()
+    return state, market, risk, broker
+
+def buy(signal_id, asset):
+    return Signal(asset=asset, action="BUY", confidence=0.9, reasons=[], id=signal_id)
+
+def test_fills_update_totals_incrementally(tmp_path):
+    state, market, risk, broker = setup(tmp_path, {"AAPL": 100.0, "MSFT": 200.0}, Clock())
+    broker.execute(TradeOrder(symbol="AAPL", action="BUY", quantity=10, order_id="o1"))
+    broker.execute(TradeOrder(symbol="MSFT", action="BUY", quantity=5, order_id="o2"))
+    broker.execute(TradeOrder(symbol="AAPL", action="SELL", quantity=4, order_id="o3"))
+
+    totals = risk.risk_state.snapshot()
+    assert totals["exposure"] == {"AAPL": pytest.approx(600.0), "MSFT": pytest.approx(1000.0)}
+    assert totals["gross_exposure"] == pytest.approx(1600.0) and totals["open_trades"] == 2
+    assert totals["equity"] == pytest.approx(100000.0)
+
+    # A full resync from marks agrees with the running totals
+    market.prices.update(AAPL=90.0)
+    risk.mark()
+    assert risk.risk_state.gross == pytest.approx(6 * 90.0 + 1000.0)
+    assert risk.risk_state.intraday_pnl == pytest.approx(-60.0)
+
+def test_max_open_trades_and_position_cap(tmp_path):
+    state, market, risk, broker = setup(tmp_path, {"AAPL": 100.0, "MSFT": 200.0}, Clock(), max_open_trades=1)
+    order = risk.check_risk(buy("s1", "AAPL"))
+    assert order is not None and broker.execute(order)
+
+    assert risk.check_risk(buy("s2", "MSFT")) is None
+    assert "Max open trades" in risk.evaluate(buy("s2", "MSFT"), state.get_portfolio())["reason"]
+    # Already at max_position_size_pct of equity in AAPL
+    assert "Max position size" in risk.evaluate(buy("s3", "AAPL"), state.get_portfolio())["reason"]
+
+def test_daily_loss_trips_emergency_stop_and_resets_next_day(tmp_path):
+    clock = Clock()
+    state, market, risk, broker = setup(tmp_path, {"AAPL": 100.0}, clock, daily_loss_limit_pct=1.0)
+    broker.execute(TradeOrder(symbol="AAPL", action="BUY", quantity=200, order_id="o1"))
+    assert state.get_day_start()["start_equity"] == pytest.approx(100000.0)
+
+    market.prices["AAPL"] = 96.0
+    risk.mark()
+    assert not state.is_emergency_stop()
+    market.prices["AAPL"] = 94.0
+    risk.mark()
+    assert state.is_emergency_stop()
+    assert "Daily loss" in risk.evaluate(buy("s1", "MSFT"), state.get_portfolio())["reason"]
+
+    # A restart the same day keeps the baseline; the next day starts a new one
+    assert RiskState(state, clock=clock).day["start_equity"] == pytest.approx(100000.0)
+    clock.now += datetime.timedelta(days=1)
+    risk.mark()
+    assert state.get_day_start()["start_equity"] == pytest.approx(100000.0 - 1200.0)
+    assert not risk.risk_state.daily_loss_breached()
+
+def test_construction_does_not_write_state(tmp_path):
+    state = StateManager(state_file=str(tmp_path / "state.json"))
+    state.update_portfolio(1000.0, {"AAPL": 10.0})
+    state.set_marks({"AAPL": 10.0})
+    state.set_day_start({"date": "2026-03-01", "start_equity": 100000.0, "start_realized": 0.0})
+
+    # Stale marks 99% below yesterday's baseline: neither a new baseline nor a stop until a tick marks
+    risk_state = RiskState(state, clock=Clock())
+    assert risk_state.equity == pytest.approx(1100.0)
+    assert state.get_day_start()["date"] == "2026-03-01"
+    assert not state.is_emergency_stop()
+
+def test_mark_waits_for_an_in_flight_fill(tmp_path):
+    state, market, risk, broker = setup(tmp_path, {"AAPL": 100.0}, Clock())
+    marked = []
+    with risk.risk_state.updating():
+        marker = threading.Thread(target=lambda: marked.append(risk.mark()))
+        marker.start()
+        marker.join(0.2)
+        # The resync can't replace the totals while a fill is between its portfolio change and on_fill
+        assert not marked
+        broker.execute(TradeOrder(symbol="AAPL", action="BUY", quantity=10, order_id="o1"))
+    marker.join()
+
+    # The resync saw the fill once: neither lost nor counted twice
+    assert risk.risk_state.exposure == {"AAPL": pytest.approx(1000.0)}
+    assert risk.risk_state.equity == pytest.approx(100000.0)
+
+def test_breaches_and_blocked_signals_are_counted_apart(tmp_path):
+    from src.execution.risk_state import RISK_BLOCKED_SIGNALS, RISK_LIMIT_BREACHES
+    state, market, risk, broker = setup(tmp_path, {"AAPL": 100.0, "MSFT": 200.0}, Clock(), daily_loss_limit_pct=1.0)
+    broker.execute(TradeOrder(symbol="AAPL", action="BUY", quantity=200, order_id="o1"))
+    breaches, blocked = RISK_LIMIT_BREACHES.value(limit="daily_loss"), RISK_BLOCKED_SIGNALS.value(limit="daily_loss")
+
+    market.prices["AAPL"] = 90.0
+    risk.mark()
+    risk.mark()
+    for i in range(3):
+        assert risk.check_risk(buy(f"s{i}", "MSFT")) is None
+    assert RISK_LIMIT_BREACHES.value(limit="daily_loss") == breaches + 1
+    assert RISK_BLOCKED_SIGNALS.value(limit="daily_loss") == blocked + 3
+
+def test_stale_position_keeps_its_last_value(tmp_path):
+    clock = Clock()
+    state = StateManager(state_file=str(tmp_path / "state.json"))
+    state.update_portfolio(1000.0, {"OLD": 100.0})
+    risk = RiskManager(state_manager=state, clock=clock)
+    risk.set_market_data(FakeMarketData({"OLD": 30.0}))
+    risk.mark()
+    assert risk.risk_state.equity == pytest.approx(4000.0)
+
+    # The legacy position's marks are lost: no price and no ledger cost left to value it at
+    state.set_marks({})
+    risk.set_market_data(FakeMarketData({}))
+    risk.mark()
+    assert risk.risk_state.equity == pytest.approx(4000.0)
+    assert risk.risk_state.open_trades == 1
+    assert not risk.risk_state.daily_loss_breached() and not state.is_emergency_stop()
@@ -0,0 +1,44 @@
+import random
+from src.ingestion.scheduler import FeedScheduler
+
+HOT = {"name": "Hot", "url": "http://hot.example.com/rss"}
+QUIET = {"name": "Quiet", "url": "http://quiet.example.com/rss"}
+
+def make_scheduler(now):
+    return FeedScheduler(min_interval_sec=30, max_interval_sec=1800, initial_interval_sec=60,
+                         backoff_max_sec=3600, jitter=0.0, clock=lambda: now[0], rng=random.Random(1))
+
+def test_hot_feeds_poll_faster_than_quiet_ones():
+    now = [0.0]
+    scheduler = make_scheduler(now)
+    assert scheduler.due([HOT, QUIET]) == [HOT, QUIET]
+    hot_ids = [f"h{i}" for i in range(20)]
+    scheduler.record_success(HOT, hot_ids)
+    scheduler.record_success(QUIET, ["q0"])
+
+    for step in range(10):
+        now[0] += 60
+        # Ten new hot entries a minute; nothing new on the quiet feed
+        hot_ids = hot_ids[10:] + [f"h{20 + step * 10 + i}" for i in range(10)]
+        for source in scheduler.due([HOT, QUIET]):
+            scheduler.record_success(source, hot_ids if source is HOT else ["q0"])
+
+    assert scheduler.feeds[HOT["url"]].interval == 30
+    assert scheduler.feeds[QUIET["url"]].interval > 300
+    assert scheduler.due([HOT, QUIET]) == []
+    assert 0 < scheduler.seconds_until_due([HOT, QUIET]) <= 30
+
+def test_failures_back_off_exponentially_up_to_the_cap():
+    now = [0.0]
+    scheduler = make_scheduler(now)
+    caps = []
+    for _ in range(10):
+        scheduler.record_failure(HOT)
+        state = scheduler.feeds[HOT["url"]]
+        caps.append(state.next_poll_at - now[0])
+        assert 30 <= caps[-1] <= min(3600, 60 * 2 ** state.failures)
+    assert max(caps) > 240
+    # One success resets the backoff
+    scheduler.record_success(HOT, ["a"])
+    assert scheduler.feeds[HOT["url"]].failures == 0
+    assert scheduler.feeds[HOT["url"]].next_poll_at - now[0] == 60
@@ -0,0 +1,31 @@
+import json
+import time
+from src.utils.seen_index import SeenIndex
+from src.utils.state_manager import StateManager
+
+def test_capacity_evicts_oldest():
+    index = SeenIndex(capacity=3)
+    for news_id in ["a", "b", "c", "d"]:
+        index.add(news_id)
+    assert "a" not in index
+    assert all(news_id in index for news_id in ["b", "c", "d"])
+    assert len(index) == 3
+
+def test_expired_ids_are_forgotten():
+    index = SeenIndex(capacity=10, ttl_sec=60)
+    index.add("old", ts=time.time() - 120)
+    assert "old" not in index
+    index.add("new")
+    assert "old" not in index.entries
+    assert "new" in index
+
+def test_legacy_list_state_is_migrated(tmp_path):
+    state_file = tmp_path / "state.json"
+    state_file.write_text(json.dumps({"processed_news_ids": ["n1", "n2"]}))
+
+    sm = StateManager(state_file=str(state_file))
+    assert sm.is_news_processed("n1")
+    sm.mark_news_processed("n3")
+
+    reloaded = StateManager(state_file=str(state_file))
+    assert list(reloaded.state["processed_news_ids"]) == ["n1", "n2", "n3"]
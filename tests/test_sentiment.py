@@ -0,0 +1,38 @@
+from src.analysis.sentiment import SentimentAnalyzer
+
+TEXTS = [
+    "Apple posts excellent record profits",
+    "Shares crash after terrible guidance",
+    "",
+    "Markets were flat today",
+]
+
+def test_small_batch_matches_single_scores():
+    analyzer = SentimentAnalyzer()
+    assert analyzer.analyze_batch(TEXTS) == [analyzer.analyze(t) for t in TEXTS]
+
+def test_pool_batch_preserves_order():
+    analyzer = SentimentAnalyzer()
+    analyzer.workers = 2
+    analyzer.min_batch = 1
+    analyzer.chunk_size = 3
+    try:
+        scores = analyzer.analyze_batch(TEXTS * 3)
+    finally:
+        analyzer.close()
+    assert scores == [analyzer.analyze(t) for t in TEXTS * 3]
+
+def test_cached_scores_survive_restart(tmp_path):
+    from src.analysis.cache import AnalysisCache
+    path = str(tmp_path / "cache.db")
+
+    cache = AnalysisCache(path=path)
+    analyzer = SentimentAnalyzer(cache=cache)
+    scores = analyzer.analyze_batch(TEXTS + ["Apple  posts excellent\nrecord profits"])
+    assert scores[-1] == scores[0]  # whitespace variants share one entry
+    cache.close()
+
+    warm = AnalysisCache(path=path)
+    assert warm.get("sentiment", TEXTS[0], SentimentAnalyzer.CACHE_VERSION) == scores[0]
+    assert warm.get("sentiment", TEXTS[0], "other-version") is None
+    warm.close()
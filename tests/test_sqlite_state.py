@@ -0,0 +1,132 @@
+import pytest
+from src.utils.sqlite_state import SQLiteStateManager
+from src.utils.state_manager import StateManager
+
+def make(tmp_path, **kwargs):
+    return SQLiteStateManager(db_file=str(tmp_path / "state.db"), **kwargs)
+
+@pytest.fixture(params=["json", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "json":
+        return StateManager(state_file=str(tmp_path / "state.json"))
+    return make(tmp_path)
+
+def test_backends_share_public_api(backend):
+    backend.mark_news_processed("n1")
+    backend.add_order({"order_id": "o1", "symbol": "AAPL", "action": "BUY", "status": "PENDING",
+                       "timestamp": "2026-01-01T10:00:00"})
+    backend.add_order({"order_id": "o2", "symbol": "MSFT", "action": "SELL", "status": "FILLED",
+                       "timestamp": "2026-01-02T10:00:00"})
+    backend.add_signal({"id": "s1", "asset": "AAPL", "action": "BUY", "confidence": 0.9,
+                        "generated_at": "2026-01-01T09:00:00"})
+    backend.add_signal({"id": "s1", "asset": "AAPL", "action": "BUY", "confidence": 0.9,
+                        "generated_at": "2026-01-01T09:00:00"})
+    backend.update_portfolio(95000.0, {"AAPL": 2.0})
+    backend.update_order("o1", {"status": "FILLED"})
+
+    assert backend.is_news_processed("n1") and backend.count_processed_news() == 1
+    assert backend.order_exists("o1") and not backend.order_exists("nope")
+    assert backend.get_order("o1")["status"] == "FILLED"
+    assert [o["order_id"] for o in backend.get_orders()] == ["o2", "o1"]
+    assert [o["order_id"] for o in backend.get_orders(symbol="AAPL")] == ["o1"]
+    assert [o["order_id"] for o in backend.get_orders(since="2026-01-02")] == ["o2"]
+    assert [o["order_id"] for o in backend.get_orders(until="2026-01-02")] == ["o1"]
+    assert backend.count_orders(status="FILLED") == 2
+    assert [s["id"] for s in backend.get_signals(asset="AAPL")] == ["s1"]
+    assert backend.get_portfolio() == {"cash": 95000.0, "positions": {"AAPL": 2.0}}
+    assert backend.get_last_run() is not None
+    assert backend.snapshot()["portfolio"]["cash"] == 95000.0
+
+def test_history_is_not_truncated(tmp_path):
+    sm = make(tmp_path)
+    with sm.transaction():
+        for i in range(1500):
+            sm.add_order({"order_id": f"o{i}", "status": "FILLED", "timestamp": f"2026-01-01T00:00:{i:05d}"})
+    assert sm.count_orders() == 1500
+    assert sm.order_exists("o0")
+    assert len(sm.get_orders(limit=None)) == 1500
+
+def test_rollback_discards_the_whole_transaction(tmp_path):
+    sm = make(tmp_path)
+    sm.update_portfolio(100000.0, {})
+    with pytest.raises(RuntimeError):
+        with sm.transaction():
+            sm.update_portfolio(90000.0, {"AAPL": 1.0})
+            sm.add_order({"order_id": "o1", "status": "FILLED"})
+            raise RuntimeError("boom")
+    assert not sm.order_exists("o1")
+    assert sm.get_portfolio() == {"cash": 100000.0, "positions": {}}
+
+def test_nested_rollback_keeps_outer_work(tmp_path):
+    sm = make(tmp_path)
+    with sm.transaction():
+        sm.mark_news_processed("n1")
+        with pytest.raises(RuntimeError):
+            with sm.transaction():
+                sm.add_order({"order_id": "o1", "status": "FILLED"})
+                raise RuntimeError("boom")
+    assert sm.is_news_processed("n1")
+    assert not sm.order_exists("o1")
+
+def test_state_survives_reopen(tmp_path):
+    sm = make(tmp_path)
+    sm.add_order({"order_id": "o1", "status": "FILLED"})
+    sm.update_portfolio(80000.0, {"BTC-USD": 0.5})
+    sm.set_emergency_stop(True)
+    sm.close()
+
+    reopened = make(tmp_path)
+    assert reopened.order_exists("o1")
+    assert reopened.get_portfolio()["cash"] == 80000.0
+    assert reopened.is_emergency_stop()
+
+def test_pages_follow_cursors_with_filters(backend):
+    for i in range(7):
+        backend.add_order({"order_id": f"o{i}", "symbol": "AAPL" if i % 2 else "MSFT", "action": "BUY",
+                           "status": "FILLED", "timestamp": f"2026-01-0{i + 1}T10:00:00"})
+        backend.add_signal({"id": f"s{i}", "asset": "AAPL", "action": "BUY", "confidence": i / 10,
+                            "generated_at": f"2026-01-0{i + 1}T09:00:00"})
+
+    pages, cursor = [], None
+    while True:
+        page = backend.page_orders(limit=2, cursor=cursor)
+        pages.append([o["order_id"] for o in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == [["o6", "o5"], ["o4", "o3"], ["o2", "o1"], ["o0"]]
+
+    first = backend.page_orders(limit=2, symbol="AAPL")
+    assert [o["order_id"] for o in first["items"]] == ["o5", "o3"]
+    rest = backend.page_orders(limit=2, symbol="AAPL", cursor=first["next_cursor"])
+    assert [o["order_id"] for o in rest["items"]] == ["o1"] and rest["next_cursor"] is None
+    assert backend.page_orders(limit=2, since="2026-01-06", until="2026-01-07")["items"][0]["order_id"] == "o5"
+
+    page = backend.page_signals(limit=10, min_confidence=0.45)
+    assert [s["id"] for s in page["items"]] == ["s6", "s5"] and page["next_cursor"] is None
+    with pytest.raises(ValueError):
+        backend.page_signals(cursor=first["next_cursor"])
+
+def test_json_cursor_survives_history_truncation(tmp_path):
+    sm = StateManager(state_file=str(tmp_path / "state.json"))
+    sm.max_order_history = 5
+    for i in range(5):
+        sm.add_order({"order_id": f"o{i}", "status": "FILLED"})
+    page = sm.page_orders(limit=2)
+    for i in range(5, 7):
+        sm.add_order({"order_id": f"o{i}", "status": "FILLED"})
+
+    older = sm.page_orders(limit=2, cursor=page["next_cursor"])
+    assert [o["order_id"] for o in older["items"]] == ["o2"] and older["next_cursor"] is None
+    sm.save_state()
+    reopened = StateManager(state_file=str(tmp_path / "state.json"))
+    assert [o["order_id"] for o in reopened.page_orders(limit=2, cursor=page["next_cursor"])["items"]] == ["o2"]
+
+def test_audit_entries_are_persisted(backend, tmp_path):
+    with backend.transaction():
+        backend.set_emergency_stop(False)
+        backend.add_audit({"action": "clear_emergency", "user": "ops"})
+    backend.add_audit({"action": "other", "user": "ops"})
+
+    reopened = StateManager(state_file=backend.state_file) if isinstance(backend, StateManager) else make(tmp_path)
+    assert [e["action"] for e in reopened.get_audit()] == ["other", "clear_emergency"]
@@ -0,0 +1,198 @@
+import json
+import os
+import threading
+import pytest
+from src.utils.state_manager import StateManager
+
+def make(tmp_path, **kwargs):
+    return StateManager(state_file=str(tmp_path / "state.json"), **kwargs)
+
+def test_mutations_append_to_journal_not_snapshot(tmp_path):
+    sm = make(tmp_path)
+    snapshot_mtime = os.stat(sm.state_file).st_mtime_ns
+
+    sm.mark_news_processed("n1")
+    sm.add_order({"order_id": "o1", "status": "FILLED"})
+    sm.update_portfolio(90000.0, {"AAPL": 5.0})
+
+    assert os.stat(sm.state_file).st_mtime_ns == snapshot_mtime
+    with open(sm.journal_file) as f:
+        lines = f.read().splitlines()
+    assert [json.loads(l).get("op") for l in lines[1:]] == ["news", "order", "portfolio"]
+
+def test_restart_replays_journal(tmp_path):
+    sm = make(tmp_path)
+    sm.mark_news_processed("n1")
+    sm.add_order({"order_id": "o1", "status": "FILLED"})
+    sm.update_portfolio(90000.0, {"AAPL": 5.0})
+    sm.set_emergency_stop(True)
+
+    restarted = make(tmp_path)
+    assert restarted.is_news_processed("n1")
+    assert restarted.order_exists("o1")
+    assert restarted.get_portfolio() == {"cash": 90000.0, "positions": {"AAPL": 5.0}}
+    assert restarted.is_emergency_stop()
+
+def test_torn_final_record_is_ignored(tmp_path):
+    sm = make(tmp_path)
+    sm.add_order({"order_id": "o1", "status": "FILLED"})
+    with open(sm.journal_file, "a") as f:
+        f.write('{"op":"order","order":{"order_id":"o2"')
+
+    restarted = make(tmp_path)
+    assert restarted.order_exists("o1")
+    assert not restarted.order_exists("o2")
+    restarted.add_order({"order_id": "o3", "status": "FILLED"})
+    assert make(tmp_path).order_exists("o3")
+
+def test_snapshot_compacts_journal(tmp_path):
+    sm = make(tmp_path, snapshot_every=3)
+    for i in range(4):
+        sm.mark_news_processed(f"n{i}")
+
+    with open(sm.state_file) as f:
+        snapshot = json.load(f)
+    assert list(snapshot["processed_news_ids"]) == ["n0", "n1", "n2"]
+    with open(sm.journal_file) as f:
+        lines = f.read().splitlines()
+    assert json.loads(lines[0]) == {"gen": snapshot["journal_gen"]}
+    assert len(lines) == 2
+    assert all(make(tmp_path).is_news_processed(f"n{i}") for i in range(4))
+
+def test_writers_in_other_processes_are_not_lost(tmp_path):
+    bot = make(tmp_path, snapshot_every=2)
+    api = make(tmp_path)
+
+    api.set_emergency_stop(True)
+    bot.add_order({"order_id": "o1", "status": "FILLED"})
+    bot.add_order({"order_id": "o2", "status": "FILLED"})  # triggers a snapshot
+
+    assert bot.is_emergency_stop()
+    reloaded = make(tmp_path)
+    assert reloaded.is_emergency_stop()
+    assert reloaded.order_exists("o2")
+
+def test_non_journal_mode_rewrites_snapshot(tmp_path):
+    sm = make(tmp_path, journal=False)
+    sm.add_order({"order_id": "o1", "status": "FILLED"})
+    assert not os.path.exists(sm.journal_file)
+    with open(sm.state_file) as f:
+        assert json.load(f)["order_history"][0]["order_id"] == "o1"
+
+def journal_lines(sm):
+    with open(sm.journal_file) as f:
+        return [json.loads(l) for l in f.read().splitlines()[1:]]
+
+def test_transaction_commits_once(tmp_path):
+    sm = make(tmp_path)
+    with sm.transaction():
+        sm.update_portfolio(95000.0, {"AAPL": 1.0})
+        sm.add_order({"order_id": "o1", "status": "FILLED"})
+        with sm.transaction():
+            sm.mark_news_processed("n1")
+        assert journal_lines(sm) == []
+        assert sm.order_exists("o1")
+
+    lines = journal_lines(sm)
+    assert len(lines) == 1 and lines[0]["op"] == "batch"
+    restarted = make(tmp_path)
+    assert restarted.order_exists("o1") and restarted.is_news_processed("n1")
+
+def test_failed_unit_is_rolled_back(tmp_path):
+    sm = make(tmp_path)
+    with sm.transaction():
+        sm.mark_news_processed("n1")
+        try:
+            with sm.transaction():
+                sm.get_portfolio()["cash"] -= 500.0  # in-place edit before the commit call
+                sm.update_portfolio(sm.get_portfolio()["cash"], {"AAPL": 1.0})
+                raise RuntimeError("order failed")
+        except RuntimeError:
+            pass
+        assert sm.get_portfolio() == {"cash": 100000.0, "positions": {}}
+        assert sm.is_news_processed("n1")
+
+    restarted = make(tmp_path)
+    assert restarted.get_portfolio()["cash"] == 100000.0
+    assert restarted.is_news_processed("n1")
+
+def test_inner_unit_flushes_after_max_latency(tmp_path):
+    sm = make(tmp_path, max_commit_latency_sec=0)
+    with sm.transaction():
+        with sm.transaction():
+            sm.mark_news_processed("n1")
+        assert len(journal_lines(sm)) == 1
+        with sm.transaction():
+            sm.mark_news_processed("n2")
+    assert len(journal_lines(sm)) == 2
+
+def test_reader_skips_reparse_when_unchanged(tmp_path, monkeypatch):
+    bot = make(tmp_path)
+    api = make(tmp_path)
+    first = api.snapshot()
+
+    def fail():
+        raise AssertionError("re-read unchanged state")
+    monkeypatch.setattr(api, "_read_from_disk", fail)
+    monkeypatch.setattr(api, "_replay_journal", fail)
+    api.load_state()
+    assert api.snapshot() is first
+
+    monkeypatch.undo()
+    bot.add_order({"order_id": "o1", "status": "FILLED"})
+    fresh = api.snapshot()
+    assert fresh is not first
+    assert fresh["order_history"][-1]["order_id"] == "o1"
+    with pytest.raises(TypeError):
+        fresh["emergency_stop"] = True
+
+def test_readers_share_the_lock(tmp_path):
+    bot = make(tmp_path)
+    reader = make(tmp_path)
+    bot.set_emergency_stop(True)
+    done = threading.Event()
+
+    with make(tmp_path)._lock(shared=True):
+        worker = threading.Thread(target=lambda: (reader.load_state(), done.set()))
+        worker.start()
+        worker.join(timeout=5)
+    assert done.is_set()
+    assert reader.is_emergency_stop()
+
+def test_snapshot_does_not_wait_for_open_transaction(tmp_path):
+    sm = make(tmp_path)
+    sm.snapshot()
+    in_txn, release = threading.Event(), threading.Event()
+
+    def tick():
+        with sm.transaction():
+            sm.add_order({"order_id": "o1", "status": "FILLED"})
+            in_txn.set()
+            release.wait(5)
+    worker = threading.Thread(target=tick)
+    worker.start()
+    in_txn.wait(5)
+    try:
+        assert sm.snapshot()["order_history"] == ()
+    finally:
+        release.set()
+        worker.join()
+    assert sm.snapshot()["order_history"][0]["order_id"] == "o1"
+
+def test_commits_do_not_rebuild_the_snapshot(tmp_path, monkeypatch):
+    from src.utils import state_manager
+    sm = make(tmp_path)
+    first = sm.snapshot()
+    freezes = []
+    real_freeze = state_manager.freeze
+    # Counts whole-state freezes (freeze recurses through the module global)
+    monkeypatch.setattr(state_manager, "freeze",
+                        lambda value: freezes.extend([1] if value is sm.state else []) or real_freeze(value))
+
+    for i in range(5):
+        sm.mark_news_processed(f"n{i}")
+    assert freezes == []
+    # The reader's next call rebuilds the view once
+    fresh = sm.snapshot()
+    assert fresh is not first and "n4" in fresh["processed_news_ids"]
+    assert sm.snapshot() is fresh and freezes == [1]
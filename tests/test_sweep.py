@@ -0,0 +1,44 @@
+import datetime
+import pandas as pd
+import pytest
+from src.analysis import extractor as extractor_module
+from src.analysis.sentiment import SentimentAnalyzer
+from src.backtest.data import PriceFeed
+from src.backtest.sweep import grid, random_search, run_sweep
+from src.models import NewsItem
+
+def bars():
+    days = pd.date_range("2026-01-01", periods=10, freq="D")
+    return pd.DataFrame([{"timestamp": d, "symbol": "AAPL", "close": 100.0 + i} for i, d in enumerate(days)])
+
+def news():
+    return [NewsItem(id=str(i), title=f"Apple posts excellent results {i}", content="", source="archive",
+                     url="", published_at=f"2026-01-0{i + 2}T15:00:00") for i in range(3)]
+
+def test_grid_and_random_search():
+    combos = grid({"min_confidence": [0.5, 0.9], "sentiment_buy_threshold": [0.2, 0.4]})
+    assert len(combos) == 4 and {"min_confidence": 0.9, "sentiment_buy_threshold": 0.2} in combos
+    sampled = random_search({"min_confidence": (0.5, 0.9), "risk_per_trade_pct": [0.5, 1.0]}, 5, seed=1)
+    assert len(sampled) == 5
+    assert all(0.5 <= c["min_confidence"] <= 0.9 and c["risk_per_trade_pct"] in (0.5, 1.0) for c in sampled)
+    assert sampled == random_search({"min_confidence": (0.5, 0.9), "risk_per_trade_pct": [0.5, 1.0]}, 5, seed=1)
+    with pytest.raises(ValueError):
+        grid({"not_a_setting": [1]})
+
+def test_sweep_analyzes_once_and_ranks(monkeypatch):
+    monkeypatch.setattr(extractor_module, "get_entities", lambda: {"Apple": "AAPL"})
+    calls = []
+    original = SentimentAnalyzer.analyze_batch
+    def counting(self, texts):
+        calls.append(len(texts))
+        return original(self, texts)
+    monkeypatch.setattr(SentimentAnalyzer, "analyze_batch", counting)
+
+    combos = grid({"sentiment_buy_threshold": [0.1, 1.5], "min_confidence": [0.0]})
+    results = run_sweep(news(), PriceFeed(bars()), combos, workers=2, hit_horizon=datetime.timedelta(days=2))
+
+    assert calls == [3]
+    assert list(results.index) == [1, 2]
+    # The low threshold buys into a rising market; the unreachable one never trades
+    assert results.loc[1, "sentiment_buy_threshold"] == 0.1 and results.loc[1, "pnl"] > 0
+    assert results.loc[2, "orders"] == 0 and results.loc[2, "pnl"] == 0
@@ -2,36 +2,24 @@
 """
 Emergency Stop Clearance Tool
 Requires token authentication via CLEAR_EMERGENCY_HASH environment variable.
+
+Usage (from the repository root):
+    python -m tools.clear_emergency --confirm <token>
 """
 import os
 import sys
 import argparse
 import hashlib
-from pathlib import Path
-import json
 from datetime import datetime, timezone
+from src.utils.config_loader import load_config
+from src.utils.state_manager import create_state_manager
 
-STATE_FILE = Path("data/state.json")
 ENV_HASH = os.getenv("CLEAR_EMERGENCY_HASH")  # expected SHA256 hex digest
 
 def sha256_hex(s: str) -> str:
     """Compute SHA256 hex digest of string."""
     return hashlib.sha256(s.encode("utf-8")).hexdigest()
 
-def load_state(path=STATE_FILE):
-    """Load state from JSON file."""
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
-
-def save_state(state, path=STATE_FILE):
-    """Save state atomically with fsync."""
-    tmp = path.with_suffix(".tmp")
-    with tmp.open("w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2)
-        f.flush()
-        os.fsync(f.fileno())
-    os.replace(tmp, path)
-
 def main():
     parser = argparse.ArgumentParser(
         description="Clear emergency_stop flag with token authentication"
@@ -57,33 +45,30 @@ def main():
         print("   The provided token does not match the expected hash.", file=sys.stderr)
         sys.exit(3)
 
-    # Load state
+    # Open the configured state backend (json or sqlite)
     try:
-        state = load_state()
+        load_config()
+        state_manager = create_state_manager()
     except Exception as e:
-        print(f"❌ ERROR: Failed to load state file: {e}", file=sys.stderr)
+        print(f"❌ ERROR: Failed to load state: {e}", file=sys.stderr)
         sys.exit(4)
 
     # Check if emergency stop is set
-    if not state.get("emergency_stop", False):
+    if not state_manager.is_emergency_stop():
         print("ℹ️  Emergency stop is not currently set. Nothing to clear.")
         sys.exit(0)
 
-    # Clear emergency stop
-    state["emergency_stop"] = False
-    
-    # Add audit trail
-    state.setdefault("audit", []).append({
-        "action": "clear_emergency",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "method": "cli",
-        "tool": "clear_emergency.py",
-        "user": os.getenv("USER", "unknown")
-    })
-    
-    # Save state
+    # Clear emergency stop and record who did it, committed together so running processes pick both up
     try:
-        save_state(state)
+        with state_manager.transaction():
+            state_manager.set_emergency_stop(False)
+            state_manager.add_audit({
+                "action": "clear_emergency",
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "method": "cli",
+                "tool": "clear_emergency.py",
+                "user": os.getenv("USER", "unknown")
+            })
     except Exception as e:
         print(f"❌ ERROR: Failed to save state: {e}", file=sys.stderr)
         sys.exit(5)